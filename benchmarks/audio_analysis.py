@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-track vs. single-pass audio analysis of one MKV.
+
+    per-track    one ffmpeg volumedetect run per audio stream (old behaviour)
+    single-pass  analyze_audio_streams(): all streams in one filter graph
+
+Usage:
+    python3 benchmarks/audio_analysis.py /path/to/title_t00.mkv
+    python3 benchmarks/audio_analysis.py --tracks 8 --duration 900
+
+Without an input file, a test MKV with --tracks audio streams (a video
+stream plus tones / noise) is generated with ffmpeg and removed again.
+Prints wall time per mode and checks that both modes measured the same
+volumes.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from includes.audio_analysis import analyze_audio_track, analyze_audio_streams
+
+
+def audio_stream_indexes(path):
+    out = subprocess.check_output(
+        ["ffprobe", "-v", "error", "-select_streams", "a", "-show_entries", "stream=index", "-of", "json", path],
+        text=True
+    )
+    return [s["index"] for s in json.loads(out)["streams"]]
+
+
+def make_fixture(path, tracks, duration):
+    """
+    Video + `tracks` audio streams: even tracks are tones, odd ones noise.
+    """
+    cmd = ["ffmpeg", "-v", "error", "-y",
+           "-f", "lavfi", "-i", f"testsrc=size=1280x720:rate=24:duration={duration}"]
+    for n in range(tracks):
+        src = f"sine=f={220 * (n + 1)}:d={duration}" if n % 2 == 0 else f"anoisesrc=d={duration}:a=0.{n}"
+        cmd += ["-f", "lavfi", "-i", src]
+    for n in range(tracks + 1):
+        cmd += ["-map", str(n)]
+    cmd += ["-c:v", "libx264", "-preset", "ultrafast", "-c:a", "ac3", "-ac", "2", path]
+    subprocess.run(cmd, check=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Audio analysis benchmark")
+    parser.add_argument("input", nargs="?", help="MKV with several audio tracks")
+    parser.add_argument("--tracks", type=int, default=8, help="Audio tracks in the generated file")
+    parser.add_argument("--duration", type=int, default=900, help="Length of the generated file (s)")
+    parser.add_argument("--skip", type=int, default=600, help="Seconds skipped before sampling")
+    parser.add_argument("--sample", type=int, default=120, help="Seconds sampled per track")
+    args = parser.parse_args()
+
+    tmpdir = None
+    path = args.input
+    if not path:
+        tmpdir = tempfile.mkdtemp(prefix="audio-bench-")
+        path = os.path.join(tmpdir, "fixture_t00.mkv")
+        print(f"Generating {args.tracks}-track fixture ({args.duration}s)…")
+        make_fixture(path, args.tracks, args.duration)
+
+    try:
+        indexes = audio_stream_indexes(path)
+
+        start = time.monotonic()
+        per_track = {i: analyze_audio_track(path, i, args.sample, args.skip) for i in indexes}
+        per_track_wall = time.monotonic() - start
+
+        start = time.monotonic()
+        single = analyze_audio_streams(path, indexes, args.sample, args.skip)
+        single_wall = time.monotonic() - start
+    finally:
+        if tmpdir:
+            for f in os.listdir(tmpdir):
+                os.remove(os.path.join(tmpdir, f))
+            os.rmdir(tmpdir)
+
+    print(f"\n{'stream':<8}{'per-track DR':>14}{'single-pass DR':>16}")
+    mismatches = 0
+    for i in indexes:
+        a, b = per_track.get(i), single.get(i)
+        dr_a = a["dynamic_range"] if a else None
+        dr_b = b["dynamic_range"] if b else None
+        # Same samples, same filter: only rounding in ffmpeg's output may differ
+        if (dr_a is None) != (dr_b is None) or (dr_a is not None and abs(dr_a - dr_b) > 0.2):
+            mismatches += 1
+        print(f"{i:<8}{str(dr_a):>14}{str(dr_b):>16}")
+
+    print(f"\n{'mode':<12}{'wall (s)':>10}{'speed-up':>10}")
+    print(f"{'per-track':<12}{per_track_wall:>10.2f}{1:>9.1f}x")
+    print(f"{'single-pass':<12}{single_wall:>10.2f}{per_track_wall / single_wall:>9.1f}x")
+
+    if mismatches:
+        print(f"\n⚠️  {mismatches} stream(s) measured differently")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Benchmark: commentary detection accuracy and throughput.
+
+    volumedetect   analyze_audio_streams(): dynamic range < 20 dB (old heuristic)
+    pcm-features   commentary_detector.detect_commentary() (needs numpy)
+
+Usage:
+    python3 benchmarks/commentary_detector.py
+    python3 benchmarks/commentary_detector.py --fixtures /path/to/clips
+
+Without --fixtures, labelled synthetic tracks are generated (and removed
+afterwards): two commentary styles (voice over a ducked mix, loud voice
+over the full mix) and three main-audio styles (action, quiet drama,
+music). They are muxed into one MKV as separate audio streams.
+
+A fixtures directory holds real clips plus a labels.json:
+
+    {"title_t00.mkv": {"1": "main", "2": "commentary"}}
+
+(keys are ffmpeg stream indexes). Clips are sampled from the start
+unless --skip is given.
+
+Prints per-track verdicts, accuracy per detector and throughput in
+seconds of audio analyzed per wall-clock second.
+"""
+
+import os
+import sys
+import json
+import time
+import wave
+import argparse
+import tempfile
+import subprocess
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from includes.audio_analysis import analyze_audio_streams
+from includes import commentary_detector
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+RATE = 48000
+
+
+# ----------------------------------------------------------
+# synthetic fixtures
+# ----------------------------------------------------------
+
+def _db(level):
+    return 10 ** (level / 20)
+
+
+def _voice(rng, seconds, level_db):
+    """
+    Harmonic voice-like signal: gliding f0 with formant-weighted
+    harmonics, 4-5 Hz syllable envelope and short pauses between phrases.
+    """
+    t = np.arange(int(seconds * RATE)) / RATE
+    f0 = 120 + 30 * np.sin(2 * np.pi * 0.3 * t) + 15 * np.sin(2 * np.pi * 1.7 * t)
+    phase = 2 * np.pi * np.cumsum(f0) / RATE
+    sig = np.zeros_like(t)
+    for h in range(1, 30):
+        f = 140 * h
+        weight = np.exp(-((f - 700) / 500) ** 2) + 0.6 * np.exp(-((f - 1800) / 700) ** 2) + 0.05
+        sig += weight / h ** 0.5 * np.sin(h * phase)
+    syllables = 0.5 + 0.5 * np.sin(2 * np.pi * 4.5 * t + rng.uniform(0, 6)) ** 2
+    phrases = (np.sin(2 * np.pi * 0.25 * t + rng.uniform(0, 6)) > -0.85).astype(float)
+    sig *= syllables * phrases
+    return sig / np.sqrt(np.mean(sig ** 2) + 1e-12) * _db(level_db)
+
+
+def _noise(rng, n, lowpass=None):
+    noise = rng.standard_normal(n)
+    if lowpass:
+        # Gentle one-pole low-pass in the frequency domain
+        spectrum = np.fft.rfft(noise)
+        freqs = np.fft.rfftfreq(n, 1 / RATE)
+        noise = np.fft.irfft(spectrum / np.sqrt(1 + (freqs / lowpass) ** 2), n)
+    return noise / np.sqrt(np.mean(noise ** 2))
+
+
+def _music(rng, seconds, level_db):
+    t = np.arange(int(seconds * RATE)) / RATE
+    sig = np.zeros_like(t)
+    for f in (110, 165, 220, 330, 440, 660, 880, 1320, 2640, 5280):
+        sig += np.sin(2 * np.pi * f * t * rng.uniform(0.99, 1.01)) / (1 + f / 500)
+    sig *= 0.6 + 0.4 * np.sin(2 * np.pi * 0.1 * t) ** 2
+    return sig / np.sqrt(np.mean(sig ** 2)) * _db(level_db)
+
+
+def _envelope(rng, seconds, low_db, high_db, segment=2.0):
+    """
+    Piecewise loudness envelope jumping between low_db and high_db.
+    """
+    n = int(seconds * RATE)
+    seg = int(segment * RATE)
+    levels = rng.uniform(low_db, high_db, size=n // seg + 1)
+    env = np.repeat(_db(levels), seg)[:n]
+    k = int(0.05 * RATE)
+    return np.convolve(env, np.ones(k) / k, mode="same")
+
+
+def film_mix(rng, seconds):
+    n = int(seconds * RATE)
+    effects = _noise(rng, n, lowpass=6000) * _envelope(rng, seconds, -60, -8, segment=1.5)
+    dialogue = _voice(rng, seconds, -26) * (_envelope(rng, seconds, -20, 0, segment=4) > _db(-8))
+    return effects + dialogue + _music(rng, seconds, -30)
+
+
+def fixture_tracks(rng, seconds):
+    n = int(seconds * RATE)
+    quiet = _voice(rng, seconds, -32) * (_envelope(rng, seconds, -30, 0, segment=3) > _db(-12))
+    quiet += _noise(rng, n, lowpass=2000) * _db(-58)
+    return [
+        ("commentary", "voice over ducked mix", _voice(rng, seconds, -20) + 0.12 * film_mix(rng, seconds)),
+        ("commentary", "loud voice over full mix", _voice(rng, seconds, -16) + 0.5 * film_mix(rng, seconds)),
+        ("main", "action", film_mix(rng, seconds)),
+        ("main", "quiet drama", quiet),
+        ("main", "music", _music(rng, seconds, -18) * _envelope(rng, seconds, -24, 0, segment=6)),
+    ]
+
+
+def write_wav(path, samples):
+    pcm = (np.clip(samples, -1, 1) * 32767).astype("<i2")
+    with wave.open(path, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(RATE)
+        w.writeframes(pcm.tobytes())
+
+
+def make_fixture(directory, seconds, seed):
+    """
+    Returns [(mkv_path, {stream_index: (label, name)})].
+    """
+    rng = np.random.default_rng(seed)
+    tracks = fixture_tracks(rng, seconds)
+    cmd = ["ffmpeg", "-v", "error", "-y"]
+    for n, (_, _, samples) in enumerate(tracks):
+        wav = os.path.join(directory, f"track{n}.wav")
+        write_wav(wav, samples)
+        cmd += ["-i", wav]
+    for n in range(len(tracks)):
+        cmd += ["-map", str(n)]
+    mkv = os.path.join(directory, "fixture_t00.mkv")
+    cmd += ["-c:a", "flac", mkv]
+    subprocess.run(cmd, check=True)
+    return [(mkv, {n: (label, name) for n, (label, name, _) in enumerate(tracks)})]
+
+
+def load_fixtures(directory):
+    with open(os.path.join(directory, "labels.json")) as f:
+        labels = json.load(f)
+    return [
+        (os.path.join(directory, name), {int(i): (label, f"{name}:{i}") for i, label in streams.items()})
+        for name, streams in labels.items()
+    ]
+
+
+# ----------------------------------------------------------
+# run
+# ----------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Commentary detector benchmark")
+    parser.add_argument("--fixtures", help="Directory with clips and labels.json")
+    parser.add_argument("--seconds", type=int, default=120, help="Length of generated tracks")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--skip", type=int, default=0, help="Seconds skipped before sampling")
+    parser.add_argument("--sample", type=int, default=120, help="Seconds sampled per track")
+    args = parser.parse_args()
+
+    if np is None:
+        print("❌ numpy is required (pip install numpy)")
+        sys.exit(1)
+
+    tmpdir = None
+    if args.fixtures:
+        fixtures = load_fixtures(args.fixtures)
+    else:
+        tmpdir = tempfile.mkdtemp(prefix="commentary-bench-")
+        print(f"Generating labelled fixtures ({args.seconds}s per track)…")
+        fixtures = make_fixture(tmpdir, args.seconds, args.seed)
+
+    detectors = {
+        "volumedetect": lambda path, idx: analyze_audio_streams(path, idx, args.sample, args.skip),
+        "pcm-features": lambda path, idx: commentary_detector.detect_commentary(path, idx, args.sample, args.skip),
+    }
+    correct = {name: 0 for name in detectors}
+    wall = {name: 0.0 for name in detectors}
+    total = 0
+    audio_seconds = 0.0
+
+    print(f"\n{'track':<28}{'label':<12}{'volumedetect':>14}{'pcm-features':>14}{'score':>7}")
+    try:
+        for path, streams in fixtures:
+            indexes = sorted(streams)
+            results = {}
+            for name, detect in detectors.items():
+                start = time.monotonic()
+                results[name] = detect(path, indexes)
+                wall[name] += time.monotonic() - start
+
+            for i in indexes:
+                label, track = streams[i]
+                total += 1
+                audio_seconds += args.sample
+                cells = []
+                for name in detectors:
+                    r = results[name].get(i)
+                    verdict = ("commentary" if r["is_likely_commentary"] else "main") if r else "-"
+                    correct[name] += verdict == label
+                    cells.append(verdict)
+                score = (results["pcm-features"].get(i) or {}).get("score", "-")
+                print(f"{track[:27]:<28}{label:<12}{cells[0]:>14}{cells[1]:>14}{score:>7}")
+    finally:
+        if tmpdir:
+            for f in os.listdir(tmpdir):
+                os.remove(os.path.join(tmpdir, f))
+            os.rmdir(tmpdir)
+
+    print(f"\n{'detector':<14}{'accuracy':>10}{'wall (s)':>10}{'audio s / s':>13}")
+    for name in detectors:
+        print(
+            f"{name:<14}{correct[name] / total * 100:>9.0f}%{wall[name]:>10.2f}"
+            f"{audio_seconds / wall[name]:>13.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
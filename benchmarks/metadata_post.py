@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Benchmark: posting scanned titles to the metadata layout.
+
+Starts a local stand-in for the DiscFinder items routes (with a fixed
+per-request latency) and posts N fake titles three ways:
+
+    serial       one POST per title, one after the other (old behaviour)
+    bulk         post_metadata_titles() against a server with /items/bulk
+    no-bulk      post_metadata_titles() against a server without it
+                 (404 -> bounded-parallel single POSTs)
+
+Usage:
+    python3 benchmarks/metadata_post.py --titles 200 --latency 0.15
+
+Every run checks that the stand-in ended up with exactly N items.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+
+class StandInApi:
+    """
+    In-memory POST /metadata-layout/<checksum>/items[/bulk].
+    """
+
+    def __init__(self, latency: float, bulk: bool):
+        self.latency = latency
+        self.bulk = bulk
+        self.items = {}
+        self.lock = threading.Lock()
+
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"null")
+                time.sleep(api.latency)
+                parts = self.path.strip("/").split("/")
+
+                if parts[-1] == "bulk" and api.bulk:
+                    for item in body:
+                        api.add(parts[1], item)
+                    self.reply(201)
+                elif parts[-1] == "items":
+                    self.reply(201 if api.add(parts[1], body) else 409)
+                else:
+                    self.reply(404)
+
+            def reply(self, status):
+                self.send_response(status)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def add(self, checksum, item) -> bool:
+        key = (checksum, item["title_index"])
+        with self.lock:
+            if key in self.items:
+                return False
+            self.items[key] = item
+            return True
+
+    def stop(self):
+        self.httpd.shutdown()
+
+
+def fake_titles(n):
+    return [
+        {"title_index": i, "duration_seconds": 600 + i, "audio_tracks": [], "subtitle_tracks": []}
+        for i in range(n)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Metadata title POST benchmark")
+    parser.add_argument("--titles", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.15, help="Server latency per request (s)")
+    args = parser.parse_args()
+
+    import moviedisc_ripper as ripper
+
+    titles = fake_titles(args.titles)
+    results = []
+
+    for name, bulk in (("serial", True), ("bulk", True), ("no-bulk", False)):
+        server = StandInApi(args.latency, bulk)
+        ripper.API._base_url = server.url
+        ripper.METADATA_BULK_ROUTE = True
+
+        start = time.monotonic()
+        if name == "serial":
+            for t in titles:
+                ripper.post_metadata_title("bench", t, {})
+        else:
+            ripper.post_metadata_titles("bench", titles)
+        wall = time.monotonic() - start
+
+        assert len(server.items) == args.titles, f"{name}: {len(server.items)} items stored"
+        results.append((name, wall))
+        server.stop()
+
+    serial = results[0][1]
+    print(f"\n{'mode':<10}{'wall (s)':>10}{'speed-up':>10}")
+    for name, wall in results:
+        print(f"{name:<10}{wall:>10.2f}{serial / wall:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark: monolithic vs. segmented HandBrake encode of one raw MKV.
+
+Usage:
+    python3 benchmarks/segmented_encode.py /path/to/title_t00.mkv \
+        --preset "HQ 1080p30 Surround" --workers 2 4 8
+
+Prints wall time, speed-up and output size for each run. Outputs are
+written next to the input as *.bench-*.mkv and removed afterwards unless
+--keep is given.
+"""
+
+import os
+import sys
+import time
+import argparse
+import subprocess
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from includes.segmented_encode import segmented_transcode
+
+
+def handbrake_cmd(handbrake, input_file, output_file, preset):
+    return [
+        handbrake,
+        "-i", input_file,
+        "-o", output_file,
+        "--preset", preset,
+        "--format", "mkv",
+        "--all-audio",
+        "--all-subtitles",
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Segmented encode benchmark")
+    parser.add_argument("input", help="Raw MKV from MakeMKV")
+    parser.add_argument("--preset", default="HQ 1080p30 Surround")
+    parser.add_argument("--handbrake", default="HandBrakeCLI")
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4])
+    parser.add_argument("--keep", action="store_true", help="Keep encoded outputs")
+    args = parser.parse_args()
+
+    base, _ = os.path.splitext(args.input)
+    results = []
+
+    out = f"{base}.bench-mono.mkv"
+    start = time.monotonic()
+    subprocess.run(
+        handbrake_cmd(args.handbrake, args.input, out, args.preset),
+        check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    results.append(("monolithic", time.monotonic() - start, os.path.getsize(out), out))
+
+    for workers in args.workers:
+        out = f"{base}.bench-seg{workers}.mkv"
+        cmd = handbrake_cmd(args.handbrake, args.input, out, args.preset)
+        start = time.monotonic()
+        if not segmented_transcode(args.input, out, cmd, workers):
+            print(f"⚠️  Title not split with {workers} workers (too short / no mkvmerge)")
+            continue
+        results.append((f"segmented x{workers}", time.monotonic() - start, os.path.getsize(out), out))
+
+    mono_time, mono_size = results[0][1], results[0][2]
+    print(f"\n{'mode':<16}{'wall (s)':>10}{'speed-up':>10}{'size (MB)':>12}{'size Δ':>9}")
+    for name, wall, size, _ in results:
+        print(
+            f"{name:<16}{wall:>10.1f}{mono_time / wall:>9.2f}x"
+            f"{size / 1e6:>12.1f}{(size - mono_size) / mono_size * 100:>8.1f}%"
+        )
+
+    if not args.keep:
+        for *_, path in results:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+if __name__ == "__main__":
+    main()
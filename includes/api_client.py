@@ -0,0 +1,293 @@
+# includes/api_client.py
+#
+# One shared HTTP client for the DiscFinder API:
+#   - keep-alive connection pool (one TLS handshake per connection, not per call)
+#   - uniform retry with exponential backoff
+#   - per-endpoint timeouts
+#   - per-endpoint call/latency/byte counters (print_report() at end of run)
+
+from __future__ import annotations
+
+import os
+import re
+import time
+import threading
+import urllib.parse
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+DEFAULT_DISCFINDER_API = "https://disc-api.bylund.cloud"
+
+USER_AGENT = "Keepedia-Ripper/2.0"
+
+# (connect, read) seconds, matched on the longest path prefix of the
+# normalized endpoint (ids/checksums replaced by "{}"). A "METHOD /path"
+# entry wins over the plain path.
+DEFAULT_TIMEOUT = (5, 15)
+ENDPOINT_TIMEOUTS = {
+    "/health": (3, 5),
+    "/lookup": (3, 5),
+    "/users/me": (3, 5),
+    "/assets/status": (3, 5),
+    "/assets/raw": (5, 30),
+    "/discs": (5, 10),
+    "/metadata-layout": (5, 10),
+    "/metadata-layout/{}/items": (5, 30),
+    "POST /metadata-layout/{}/items": (5, 60),
+    "/search": (5, 15),
+    "/tmdb": (5, 15),
+}
+
+# Safe to send again after a read timeout / dropped connection
+_IDEMPOTENT = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+_RETRY_STATUS = {429, 502, 503, 504}
+
+# Path segments that identify a resource (checksums, ids, imdb ids, ...)
+_ID_SEGMENT_RE = re.compile(r"/(?=[^/]*\d)[^/]+")
+
+
+def endpoint_key(path: str) -> str:
+    """
+    "/metadata-layout/3fa9…/items" -> "/metadata-layout/{}/items"
+    """
+    return _ID_SEGMENT_RE.sub("/{}", path) or "/"
+
+
+class ApiClient:
+    """
+    Thread-safe client around one pooled requests.Session.
+
+    Methods return the requests.Response (any status) and raise
+    requests.exceptions.RequestException once all retries failed, so call
+    sites keep their existing status/exception handling.
+
+    POST/PATCH are only retried when the connection could not be opened
+    (the request never reached the server); everything else is also
+    retried on read timeouts and 429/502/503/504.
+    """
+
+    def __init__(self, base_url: str = None, retries: int = 2, backoff: float = 0.5,
+                 pool_size: int = 10):
+        # None: read DISCFINDER_API on first use (after .env is loaded)
+        self._base_url = base_url
+        self.retries = retries
+        self.backoff = backoff
+
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = USER_AGENT
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self._write_listeners: List[Callable[[str, str], None]] = []
+
+    @property
+    def base_url(self) -> str:
+        return (self._base_url or os.getenv("DISCFINDER_API", DEFAULT_DISCFINDER_API)).rstrip("/")
+
+    def url(self, path: str) -> str:
+        if path.startswith(("http://", "https://")):
+            return path
+        return f"{self.base_url}{path}"
+
+    def api_path(self, url: str) -> str:
+        """
+        Endpoint path of url relative to the API base, so a base with a
+        path prefix ("https://host/api") still matches "/metadata-layout/...".
+        """
+        path = urllib.parse.urlparse(url).path
+        if not url.startswith(self.base_url):
+            return path
+        prefix = urllib.parse.urlparse(self.base_url).path.rstrip("/")
+        if prefix and (path == prefix or path.startswith(prefix + "/")):
+            path = path[len(prefix):]
+        return path or "/"
+
+    @staticmethod
+    def timeout_for(method: str, path: str):
+        key = endpoint_key(path)
+        best = None
+        for entry in ENDPOINT_TIMEOUTS:
+            entry_method, _, prefix = entry.rpartition(" ")
+            if entry_method and entry_method != method:
+                continue
+            if key == prefix or key.startswith(prefix + "/"):
+                # Longer prefix first, method-specific entry on a tie
+                rank = (len(prefix), bool(entry_method))
+                if best is None or rank > best[0]:
+                    best = (rank, entry)
+        return ENDPOINT_TIMEOUTS[best[1]] if best else DEFAULT_TIMEOUT
+
+    # ------------------------------------------------------
+    # requests
+    # ------------------------------------------------------
+
+    def on_write(self, listener: Callable[[str, str], None]):
+        """
+        Register listener(method, path), called after every POST/PUT/PATCH/
+        DELETE (whether it succeeded or not) so caches can drop stale data.
+        """
+        self._write_listeners.append(listener)
+
+    def request(self, method: str, path: str, timeout=None, retries: int = None,
+                **kwargs) -> requests.Response:
+        method = method.upper()
+        url = self.url(path)
+        url_path = self.api_path(url)
+        if method in ("GET", "HEAD", "OPTIONS"):
+            return self._send(method, url, url_path, timeout, retries, **kwargs)
+
+        try:
+            return self._send(method, url, url_path, timeout, retries, **kwargs)
+        finally:
+            for listener in self._write_listeners:
+                listener(method, url_path)
+
+    def _send(self, method: str, url: str, url_path: str, timeout, retries,
+              **kwargs) -> requests.Response:
+        key = f"{method} {endpoint_key(url_path)}"
+        timeout = timeout if timeout is not None else self.timeout_for(method, url_path)
+        retries = self.retries if retries is None else retries
+
+        attempt = 0
+        while True:
+            start = time.monotonic()
+            try:
+                r = self.session.request(method, url, timeout=timeout, **kwargs)
+            except requests.exceptions.RequestException as e:
+                self._record(key, time.monotonic() - start, error=True)
+                retryable = (
+                    isinstance(e, requests.exceptions.ConnectTimeout)
+                    or (method in _IDEMPOTENT and isinstance(
+                        e, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)))
+                )
+                if not retryable or attempt >= retries:
+                    raise
+            else:
+                self._record(
+                    key, time.monotonic() - start,
+                    bytes_in=_response_size(r, kwargs.get("stream")),
+                    bytes_out=_body_size(r.request.body),
+                    error=r.status_code >= 500,
+                    not_modified=r.status_code == 304,
+                )
+                if r.status_code not in _RETRY_STATUS or method not in _IDEMPOTENT or attempt >= retries:
+                    return r
+
+            attempt += 1
+            self._record_retry(key)
+            time.sleep(self.backoff * (2 ** (attempt - 1)))
+
+    def get(self, path: str, **kwargs) -> requests.Response:
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path: str, **kwargs) -> requests.Response:
+        return self.request("POST", path, **kwargs)
+
+    def put(self, path: str, **kwargs) -> requests.Response:
+        return self.request("PUT", path, **kwargs)
+
+    def patch(self, path: str, **kwargs) -> requests.Response:
+        return self.request("PATCH", path, **kwargs)
+
+    def delete(self, path: str, **kwargs) -> requests.Response:
+        return self.request("DELETE", path, **kwargs)
+
+    def get_json(self, path: str, **kwargs) -> Optional[Any]:
+        """
+        GET and parse JSON. Returns None on any failure (never raises,
+        so the script doesn't crash if the API is down).
+        """
+        try:
+            r = self.get(path, **kwargs)
+            if r.status_code != 200:
+                print(f"⚠️  API error: HTTP {r.status_code} ({r.reason})")
+                return None
+            return r.json()
+        except requests.exceptions.RequestException as e:
+            print(f"⚠️  API network error: {e}")
+            return None
+        except ValueError as e:
+            print(f"⚠️  API error: {e}")
+            return None
+
+    # ------------------------------------------------------
+    # instrumentation
+    # ------------------------------------------------------
+
+    def _entry(self, key: str) -> Dict[str, float]:
+        return self._stats.setdefault(key, {
+            "calls": 0, "errors": 0, "retries": 0, "not_modified": 0,
+            "seconds": 0.0, "max_seconds": 0.0,
+            "bytes_in": 0, "bytes_out": 0,
+        })
+
+    def _record(self, key: str, seconds: float, bytes_in: int = 0, bytes_out: int = 0,
+                error: bool = False, not_modified: bool = False):
+        with self._lock:
+            e = self._entry(key)
+            e["calls"] += 1
+            e["errors"] += int(error)
+            e["not_modified"] += int(not_modified)
+            e["seconds"] += seconds
+            e["max_seconds"] = max(e["max_seconds"], seconds)
+            e["bytes_in"] += bytes_in
+            e["bytes_out"] += bytes_out
+
+    def _record_retry(self, key: str):
+        with self._lock:
+            self._entry(key)["retries"] += 1
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Copy of the per-endpoint counters, keyed by "METHOD /path/{}".
+        """
+        with self._lock:
+            return {k: dict(v) for k, v in self._stats.items()}
+
+    def print_report(self):
+        stats = self.stats()
+        if not stats:
+            return
+
+        calls = sum(s["calls"] for s in stats.values())
+        seconds = sum(s["seconds"] for s in stats.values())
+        kb_in = sum(s["bytes_in"] for s in stats.values()) / 1024
+        kb_out = sum(s["bytes_out"] for s in stats.values()) / 1024
+
+        print(f"\n📊 API: {calls} calls, {seconds:.1f}s total, {kb_in:.1f} KB in / {kb_out:.1f} KB out")
+        print(f"   {'endpoint':<44}{'calls':>6}{'304':>5}{'err':>5}{'retry':>6}{'avg ms':>8}{'max ms':>8}{'KB in':>9}{'KB out':>8}")
+        for key, s in sorted(stats.items(), key=lambda kv: -kv[1]["seconds"]):
+            avg_ms = s["seconds"] / s["calls"] * 1000 if s["calls"] else 0
+            print(
+                f"   {key:<44}{s['calls']:>6}{s['not_modified']:>5}{s['errors']:>5}{s['retries']:>6}"
+                f"{avg_ms:>8.0f}{s['max_seconds'] * 1000:>8.0f}"
+                f"{s['bytes_in'] / 1024:>9.1f}{s['bytes_out'] / 1024:>8.1f}"
+            )
+
+
+def _response_size(r: requests.Response, stream: bool) -> int:
+    if stream:
+        # Don't consume a streamed body here
+        return int(r.headers.get("Content-Length") or 0)
+    return len(r.content)
+
+
+def _body_size(body) -> int:
+    if body is None:
+        return 0
+    if isinstance(body, str):
+        return len(body.encode())
+    try:
+        return len(body)
+    except TypeError:
+        return 0  # streamed upload
+
+
+# Shared by moviedisc_ripper.py and includes/metadata_layout.py
+API = ApiClient()
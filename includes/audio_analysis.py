@@ -0,0 +1,228 @@
+# includes/audio_analysis.py
+
+from __future__ import annotations
+
+import re
+import math
+import time
+import subprocess
+from typing import Dict, List, Optional, Tuple
+
+
+# volumedetect prints e.g. "[Parsed_volumedetect_2 @ 0x...] mean_volume: -21.1 dB";
+# the number is the filter's position in the graph
+_VOLUMEDETECT_RE = re.compile(r"Parsed_volumedetect_(\d+)\s*@[^\]]*\]\s*(mean|max)_volume:\s*(-?[\d.]+)\s*dB")
+
+# Part of the audio analysis cache key: bump when results would change
+ANALYZER_VERSION = "volumedetect/2"
+
+# Multi-window sampling (see sample_windows)
+WINDOW_SECONDS = 15
+MAX_WINDOWS = 8
+MIN_WINDOWS = 2          # windows analyzed before a stream may exit early
+LEGACY_WINDOW = (600, 120)  # (start, length) when the duration is unknown
+
+
+def _spread_order(n: int) -> List[int]:
+    """
+    0..n-1 reordered so any prefix is spread over the whole range
+    (bit-reversed / van der Corput order).
+    """
+    def reversed_fraction(i: int) -> float:
+        fraction, base = 0.0, 0.5
+        while i:
+            if i & 1:
+                fraction += base
+            i >>= 1
+            base /= 2
+        return fraction
+
+    return sorted(range(n), key=reversed_fraction)
+
+
+def sample_windows(duration_seconds: float, window_seconds: float = WINDOW_SECONDS,
+                   max_windows: int = MAX_WINDOWS) -> List[Tuple[float, float]]:
+    """
+    (start, length) sampling windows for a title of the given length.
+
+    Intro (5%, at most 2 min) and end credits (10%, at most 5 min) are
+    skipped; the rest gets 2..max_windows short windows, one more per
+    5 minutes, ordered so the first few already cover the whole title
+    (analysis may stop after any of them). Titles too short for two
+    windows are analyzed as a whole.
+    """
+    if not duration_seconds or duration_seconds <= 0:
+        return [LEGACY_WINDOW]
+
+    lo = min(duration_seconds * 0.05, 120)
+    hi = duration_seconds - min(duration_seconds * 0.10, 300)
+    usable = hi - lo
+    if usable < window_seconds * 2:
+        return [(0, math.ceil(duration_seconds))]
+
+    n = min(max_windows, int(usable // 300) + 2, int(usable // window_seconds))
+    slot = usable / n
+    starts = [lo + (i + 0.5) * slot - window_seconds / 2 for i in range(n)]
+    return [(round(starts[i], 1), window_seconds) for i in _spread_order(n)]
+
+
+def volume_result(mean_volume: float, max_volume: float) -> dict:
+    dynamic_range = max_volume - mean_volume
+
+    # Commentary typically has dynamic range < 20 dB
+    # Movie audio typically has dynamic range > 25 dB
+    is_likely_commentary = dynamic_range < 20
+
+    return {
+        "mean_volume": mean_volume,
+        "max_volume": max_volume,
+        "dynamic_range": round(dynamic_range, 1),
+        "is_likely_commentary": is_likely_commentary
+    }
+
+
+def analyze_audio_track(mkv_path: str, track_index: int, sample_duration: int = 120, skip_seconds: int = 600,
+                        log=print) -> dict:
+    """
+    Analyze an audio track using ffmpeg volumedetect.
+
+    Returns dict with:
+        - mean_volume: average volume in dB
+        - max_volume: peak volume in dB
+        - dynamic_range: difference between max and mean
+        - is_likely_commentary: True if dynamic range suggests commentary
+    """
+    try:
+        cmd = [
+            "ffmpeg",
+            "-ss", str(skip_seconds),  # Skip intro/credits
+            "-i", mkv_path,
+            "-map", f"0:{track_index}",
+            "-t", str(sample_duration),
+            "-af", "volumedetect",
+            "-f", "null",
+            "-"
+        ]
+
+        result = subprocess.run(
+            cmd,
+            capture_output=True,
+            text=True,
+            timeout=60
+        )
+
+        # Parse output
+        output = result.stderr
+        mean_match = re.search(r"mean_volume:\s*(-?[\d.]+)\s*dB", output)
+        max_match = re.search(r"max_volume:\s*(-?[\d.]+)\s*dB", output)
+
+        if not mean_match or not max_match:
+            return None
+
+        return volume_result(float(mean_match.group(1)), float(max_match.group(1)))
+
+    except subprocess.TimeoutExpired:
+        log(f"   ⚠️ Audio analysis timed out for track {track_index}")
+        return None
+    except Exception as e:
+        log(f"   ⚠️ Audio analysis failed for track {track_index}: {e}")
+        return None
+
+
+def analyze_audio_streams(mkv_path: str, stream_indexes: List[int], sample_duration: int = 120,
+                          skip_seconds: int = 600, log=print) -> Dict[int, Optional[dict]]:
+    """
+    Analyze several audio streams of one file with a single ffmpeg run:
+    every stream goes through its own volumedetect in one filter graph,
+    so the file is opened, seeked and demuxed once instead of per track.
+
+    Returns {stream_index: analyze_audio_track()-style dict or None}.
+    If the combined run fails as a whole (e.g. one undecodable stream
+    breaks the graph), each stream is analyzed on its own instead.
+    """
+    if not stream_indexes:
+        return {}
+    if len(stream_indexes) == 1:
+        index = stream_indexes[0]
+        return {index: analyze_audio_track(mkv_path, index, sample_duration, skip_seconds, log)}
+
+    graph = ";".join(f"[0:{index}]volumedetect[a{n}]" for n, index in enumerate(stream_indexes))
+    cmd = [
+        "ffmpeg",
+        "-ss", str(skip_seconds),  # Skip intro/credits
+        "-t", str(sample_duration),
+        "-i", mkv_path,
+        "-filter_complex", graph,
+    ]
+    for n in range(len(stream_indexes)):
+        cmd += ["-map", f"[a{n}]"]
+    cmd += ["-f", "null", "-"]
+
+    try:
+        result = subprocess.run(
+            cmd,
+            capture_output=True,
+            text=True,
+            timeout=60 + 15 * len(stream_indexes)
+        )
+    except subprocess.TimeoutExpired:
+        log(f"   ⚠️ Audio analysis timed out for {len(stream_indexes)} tracks")
+        return {index: None for index in stream_indexes}
+    except Exception as e:
+        log(f"   ⚠️ Audio analysis failed: {e}")
+        return {index: None for index in stream_indexes}
+
+    volumes: Dict[int, dict] = {}
+    for n, kind, value in _VOLUMEDETECT_RE.findall(result.stderr):
+        volumes.setdefault(int(n), {})[kind] = float(value)
+
+    if result.returncode != 0 and not volumes:
+        return {
+            index: analyze_audio_track(mkv_path, index, sample_duration, skip_seconds, log)
+            for index in stream_indexes
+        }
+
+    results = {}
+    for n, index in enumerate(stream_indexes):
+        v = volumes.get(n, {})
+        results[index] = volume_result(v["mean"], v["max"]) if "mean" in v and "max" in v else None
+    return results
+
+
+def analyze_audio_windows(mkv_path: str, stream_indexes: List[int], windows: List[Tuple[float, float]],
+                          timeout: float = 60, log=print) -> Dict[int, Optional[dict]]:
+    """
+    analyze_audio_streams() over several windows (input-seeked, one ffmpeg
+    run per window), combined per stream: mean power weighted by window
+    length, overall peak. A stream whose dynamic range is clearly on one
+    side of the commentary threshold after MIN_WINDOWS windows is left
+    out of the remaining ones; the loop ends when none is left or the
+    timeout is used up.
+    """
+    acc = {index: {"seconds": 0.0, "power": 0.0, "max": -math.inf} for index in stream_indexes}
+    undecided = list(stream_indexes)
+    deadline = time.monotonic() + timeout
+
+    def combined(index: int) -> Optional[dict]:
+        a = acc[index]
+        if not a["seconds"]:
+            return None
+        return volume_result(round(10 * math.log10(a["power"] / a["seconds"]), 1), a["max"])
+
+    for n, (start, length) in enumerate(windows):
+        if not undecided or time.monotonic() >= deadline:
+            break
+
+        for index, r in analyze_audio_streams(mkv_path, undecided, length, start, log).items():
+            if r:
+                acc[index]["seconds"] += length
+                acc[index]["power"] += 10 ** (r["mean_volume"] / 10) * length
+                acc[index]["max"] = max(acc[index]["max"], r["max_volume"])
+
+        if n + 1 >= MIN_WINDOWS:
+            for index in list(undecided):
+                r = combined(index)
+                if r and abs(r["dynamic_range"] - 20) >= 6:
+                    undecided.remove(index)
+
+    return {index: combined(index) for index in stream_indexes}
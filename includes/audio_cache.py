@@ -0,0 +1,104 @@
+# includes/audio_cache.py
+
+from __future__ import annotations
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Optional
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS analyses (
+    key TEXT PRIMARY KEY,
+    directory TEXT NOT NULL,
+    result TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS analyses_directory ON analyses (directory);
+"""
+
+# Bytes hashed at the start and at the end of a file
+EDGE_BYTES = 4 * 1024 * 1024
+
+
+def file_identity(path: str) -> str:
+    """
+    Cheap content identity of a (large) file: size, mtime and a hash of
+    its first and last EDGE_BYTES. Changes whenever MakeMKV rewrites it.
+    """
+    st = os.stat(path)
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        h.update(f.read(EDGE_BYTES))
+        if st.st_size > 2 * EDGE_BYTES:
+            f.seek(-EDGE_BYTES, os.SEEK_END)
+            h.update(f.read(EDGE_BYTES))
+    return f"{st.st_size}:{st.st_mtime_ns}:{h.hexdigest()}"
+
+
+class AudioAnalysisCache:
+    """
+    On-disk cache of per-stream audio analysis results, keyed by file
+    identity + stream index + analyzer version, so re-analyzing unchanged
+    temp files (resumed runs, re-analysis) costs no decoding.
+
+    Each entry remembers the temp directory its file lives in;
+    evict_directory() drops them when that directory is cleaned up.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._local = threading.local()
+        self._conn().executescript(_SCHEMA)
+        self.prune()
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 connections can't be shared between threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _key(identity: str, stream_index: int, version: str) -> str:
+        return f"{identity}:{stream_index}:{version}"
+
+    def get(self, identity: str, stream_index: int, version: str) -> Optional[dict]:
+        row = self._conn().execute(
+            "SELECT result FROM analyses WHERE key = ?", (self._key(identity, stream_index, version),)
+        ).fetchone()
+        return json.loads(row["result"]) if row else None
+
+    def put(self, identity: str, stream_index: int, version: str, directory: str, result: dict):
+        self._conn().execute(
+            "INSERT OR REPLACE INTO analyses (key, directory, result, created_at) VALUES (?, ?, ?, ?)",
+            (self._key(identity, stream_index, version), os.path.abspath(directory),
+             json.dumps(result), time.time()),
+        )
+
+    def evict_directory(self, directory: str) -> int:
+        cur = self._conn().execute(
+            "DELETE FROM analyses WHERE directory = ?", (os.path.abspath(directory),)
+        )
+        return cur.rowcount
+
+    def prune(self) -> int:
+        """
+        Drop entries whose temp directory no longer exists (removed by
+        hand or by an older version without eviction).
+        """
+        conn = self._conn()
+        directories = [r["directory"] for r in conn.execute("SELECT DISTINCT directory FROM analyses")]
+        removed = 0
+        for directory in directories:
+            if not os.path.isdir(directory):
+                removed += self.evict_directory(directory)
+        return removed
@@ -0,0 +1,278 @@
+# includes/commentary_detector.py
+#
+# Commentary detection on decoded audio. ffmpeg downmixes every analyzed
+# stream to mono 16 kHz PCM and writes each to its own pipe; the pipes are
+# read in fixed-size chunks and reduced to running per-stream statistics,
+# so memory stays constant however long the sample is.
+#
+# Features (64 ms blocks):
+#   RMS envelope      spread of the 1 s loudness envelope (p90 - p10)
+#   silence ratio     share of blocks below SILENCE_DB
+#   speech ratio      mean share of a block's 60-8000 Hz energy in 300-3400 Hz
+#   flatness          spectral flatness (noise-like vs. tonal/voiced)
+#
+# Opt-in (COMMENTARY_DETECTOR=pcm); ffmpeg volumedetect stays the default
+# until this has been checked against labelled real clips with
+# benchmarks/commentary_detector.py --fixtures. numpy is optional: without
+# it, available() is False and the ripper keeps using volumedetect.
+
+from __future__ import annotations
+
+import os
+import math
+import time
+import selectors
+import subprocess
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from includes.audio_analysis import MIN_WINDOWS
+
+
+# Part of the audio analysis cache key: bump when features or scoring change
+ANALYZER_VERSION = "pcm-features/1"
+
+SAMPLE_RATE = 16000
+BLOCK_SIZE = 1024            # samples per block (64 ms)
+CHUNK_BLOCKS = 64            # blocks processed per step (~4 s of audio)
+ENVELOPE_BLOCKS = 16         # blocks per loudness envelope point (~1 s)
+SILENCE_DB = -50.0
+CONFIDENT_LOW, CONFIDENT_HIGH = 0.2, 0.8   # scores that end sampling early
+
+# Loudness histogram of the envelope, 0.5 dB bins from -100 to 0 dBFS
+_HIST_MIN_DB = -100.0
+_HIST_BIN_DB = 0.5
+_HIST_BINS = int(-_HIST_MIN_DB / _HIST_BIN_DB)
+
+_SPEECH_BAND = (300.0, 3400.0)
+_FULL_BAND = (60.0, 8000.0)
+
+
+def available() -> bool:
+    return np is not None
+
+
+class BlockFeatures:
+    """
+    Running statistics of one audio stream, fed with float PCM.
+    """
+
+    def __init__(self):
+        self.blocks = 0
+        self.silent_blocks = 0
+        self.sum_squares = 0.0
+        self.samples = 0
+        self.peak = 0.0
+        self.speech_share_sum = 0.0
+        self.flatness_sum = 0.0
+        self.hist = np.zeros(_HIST_BINS, dtype=np.int64)
+
+        freqs = np.fft.rfftfreq(BLOCK_SIZE, 1 / SAMPLE_RATE)
+        self._window = np.hanning(BLOCK_SIZE).astype(np.float32)
+        self._speech = (freqs >= _SPEECH_BAND[0]) & (freqs < _SPEECH_BAND[1])
+        self._band = (freqs >= _FULL_BAND[0]) & (freqs < _FULL_BAND[1])
+
+    def add(self, samples: "np.ndarray"):
+        """
+        samples: 1-D float32 in [-1, 1], a whole number of blocks long.
+        """
+        blocks = samples.reshape(-1, BLOCK_SIZE)
+        power = np.mean(blocks * blocks, axis=1)
+        rms_db = 10 * np.log10(power + 1e-12)
+
+        self.blocks += len(blocks)
+        self.sum_squares += float(np.sum(power)) * BLOCK_SIZE
+        self.samples += blocks.size
+        self.peak = max(self.peak, float(np.max(np.abs(blocks))))
+
+        # Loudness envelope (complete ~1 s windows only)
+        windows = len(power) // ENVELOPE_BLOCKS
+        if windows:
+            envelope = 10 * np.log10(
+                power[:windows * ENVELOPE_BLOCKS].reshape(windows, ENVELOPE_BLOCKS).mean(axis=1) + 1e-12
+            )
+            envelope = envelope[envelope >= SILENCE_DB]
+            bins = ((envelope - _HIST_MIN_DB) / _HIST_BIN_DB).astype(np.int64)
+            self.hist += np.bincount(np.clip(bins, 0, _HIST_BINS - 1), minlength=_HIST_BINS)
+
+        voiced = rms_db >= SILENCE_DB
+        self.silent_blocks += int(len(blocks) - np.count_nonzero(voiced))
+        if not voiced.any():
+            return
+
+        spectrum = np.abs(np.fft.rfft(blocks[voiced] * self._window, axis=1)) ** 2
+        band = spectrum[:, self._band] + 1e-12
+        self.speech_share_sum += float(np.sum(np.sum(spectrum[:, self._speech], axis=1) / np.sum(band, axis=1)))
+        flatness = np.exp(np.mean(np.log(band), axis=1)) / np.mean(band, axis=1)
+        self.flatness_sum += float(np.sum(flatness))
+
+    def _percentile(self, q: float) -> float:
+        total = int(self.hist.sum())
+        index = int(np.searchsorted(np.cumsum(self.hist), q * total))
+        return _HIST_MIN_DB + (index + 0.5) * _HIST_BIN_DB
+
+    def result(self) -> Optional[dict]:
+        voiced = self.blocks - self.silent_blocks
+        if voiced < ENVELOPE_BLOCKS or not self.hist.any():
+            return None  # (almost) nothing but silence - no verdict
+
+        mean_volume = 10 * math.log10(self.sum_squares / self.samples + 1e-12)
+        max_volume = 20 * math.log10(self.peak + 1e-12)
+        features = {
+            "mean_volume": round(mean_volume, 1),
+            "max_volume": round(max_volume, 1),
+            "dynamic_range": round(max_volume - mean_volume, 1),
+            "loudness_range": round(self._percentile(0.90) - self._percentile(0.10), 1),
+            "silence_ratio": round(self.silent_blocks / self.blocks, 3),
+            "speech_ratio": round(self.speech_share_sum / voiced, 3),
+            "flatness": round(self.flatness_sum / voiced, 3),
+        }
+        features["score"] = commentary_score(features)
+        features["is_likely_commentary"] = features["score"] >= 0.5
+        return features
+
+
+def _clip(x: float) -> float:
+    return max(-1.0, min(1.0, x))
+
+
+def commentary_score(f: dict) -> float:
+    """
+    0..1, higher = more commentary-like. Commentary is a voice held at a
+    steady level over a ducked film mix: narrow loudness envelope, blocks
+    dominated by the speech band, voiced (low flatness), and - because the
+    film keeps running underneath - hardly ever silent. A quiet drama is
+    speech with a narrow range too, but keeps dropping to silence; loud
+    commentary over the full mix still has the steady speech-band voice.
+    """
+    z = (
+        1.5 * _clip((10.0 - f["loudness_range"]) / 5.0)
+        + 1.5 * _clip((f["speech_ratio"] - 0.62) / 0.10)
+        + 0.5 * _clip((0.15 - f["flatness"]) / 0.10)
+        - 5.0 * max(0.0, _clip((f["silence_ratio"] - 0.15) / 0.25))
+    )
+    return round(1 / (1 + math.exp(-z)), 3)
+
+
+def _decode_window(mkv_path: str, features: Dict[int, "BlockFeatures"], start: float, length: float,
+                   deadline: float) -> bool:
+    """
+    Decode one window of every stream in `features` (one ffmpeg run, one
+    pipe per stream) into its BlockFeatures. Returns False on timeout.
+    """
+    indexes = list(features)
+    pipes = [os.pipe() for _ in indexes]
+    cmd = [
+        "ffmpeg", "-v", "error", "-nostdin",
+        "-ss", str(start),  # Input seeking: jumps straight to the window
+        "-t", str(length),
+        "-i", mkv_path,
+    ]
+    for index, (_, write_fd) in zip(indexes, pipes):
+        cmd += ["-map", f"0:{index}", "-ac", "1", "-ar", str(SAMPLE_RATE), "-f", "s16le", f"pipe:{write_fd}"]
+
+    try:
+        proc = subprocess.Popen(
+            cmd,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            pass_fds=[w for _, w in pipes]
+        )
+    except Exception:
+        for r, _ in pipes:
+            os.close(r)
+        raise
+    finally:
+        for _, w in pipes:
+            os.close(w)
+
+    by_fd = {r: features[index] for index, (r, _) in zip(indexes, pipes)}
+    pending = {r: bytearray() for r, _ in pipes}
+    chunk_bytes = CHUNK_BLOCKS * BLOCK_SIZE * 2
+    block_bytes = BLOCK_SIZE * 2
+
+    def consume(fd: int, final: bool = False):
+        buf = pending[fd]
+        usable = len(buf) if final else len(buf) // chunk_bytes * chunk_bytes
+        usable -= usable % block_bytes
+        if usable:
+            samples = np.frombuffer(bytes(buf[:usable]), dtype="<i2").astype(np.float32) / 32768.0
+            by_fd[fd].add(samples)
+            del buf[:usable]
+
+    selector = selectors.DefaultSelector()
+    for r, _ in pipes:
+        selector.register(r, selectors.EVENT_READ)
+
+    timed_out = False
+    try:
+        while selector.get_map():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                timed_out = True
+                break
+            for key, _ in selector.select(timeout=remaining):
+                data = os.read(key.fd, 65536)
+                if not data:
+                    selector.unregister(key.fd)
+                    consume(key.fd, final=True)
+                    continue
+                pending[key.fd] += data
+                if len(pending[key.fd]) >= chunk_bytes:
+                    consume(key.fd)
+    finally:
+        selector.close()
+        if timed_out:
+            proc.kill()
+        proc.wait()
+        for r, _ in pipes:
+            os.close(r)
+
+    return not timed_out
+
+
+def detect_commentary(mkv_path: str, stream_indexes: List[int], sample_duration: int = 120,
+                      skip_seconds: int = 600, timeout: float = 60, log=print,
+                      windows: List[Tuple[float, float]] = None) -> Dict[int, Optional[dict]]:
+    """
+    Score each given audio stream. windows is a list of (start, length)
+    (see audio_analysis.sample_windows); default is one window of
+    sample_duration seconds after skip_seconds. Every window decodes all
+    still-undecided streams in one ffmpeg run. After MIN_WINDOWS windows,
+    a stream whose score is already clear (<= 0.2 or >= 0.8) is dropped
+    from the remaining windows.
+
+    Returns {stream_index: features dict (see BlockFeatures.result) or None}.
+    Raises RuntimeError if numpy is missing.
+    """
+    if np is None:
+        raise RuntimeError("numpy is not installed")
+
+    windows = windows or [(skip_seconds, sample_duration)]
+    features = {index: BlockFeatures() for index in stream_indexes}
+    undecided = list(stream_indexes)
+    deadline = time.monotonic() + timeout
+
+    for n, (start, length) in enumerate(windows):
+        if not undecided:
+            break
+        try:
+            completed = _decode_window(mkv_path, {i: features[i] for i in undecided}, start, length, deadline)
+        except Exception as e:
+            log(f"   ⚠️ Audio analysis failed: {e}")
+            break
+        if not completed:
+            log(f"   ⚠️ Audio analysis timed out for {len(undecided)} tracks")
+            break
+
+        if n + 1 >= MIN_WINDOWS:
+            for index in list(undecided):
+                r = features[index].result()
+                if r and not CONFIDENT_LOW < r["score"] < CONFIDENT_HIGH:
+                    undecided.remove(index)
+
+    return {index: features[index].result() for index in stream_indexes}
@@ -0,0 +1,230 @@
+# includes/disc_db.py
+
+from __future__ import annotations
+
+import os
+import json
+import time
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional
+
+import requests
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS discs (
+    checksum TEXT PRIMARY KEY,
+    legacy_checksum TEXT,
+    lookup TEXT,
+    movie TEXT,
+    disc_id INTEGER,
+    linked INTEGER NOT NULL DEFAULT 0,
+    layout_created INTEGER NOT NULL DEFAULT 0,
+    items TEXT,
+    assets TEXT,
+    checked_at REAL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS discs_legacy ON discs (legacy_checksum);
+
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    method TEXT NOT NULL,
+    path TEXT NOT NULL,
+    body TEXT,
+    auth INTEGER NOT NULL DEFAULT 0,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    created_at REAL NOT NULL
+);
+"""
+
+_JSON_COLUMNS = ("lookup", "movie", "items", "assets")
+
+
+class DiscDB:
+    """
+    Local SQLite copy of what the DiscFinder API told us about each disc:
+    lookup result, identified movie, item list, asset status, and whether
+    the disc was linked / its layout created.
+
+    Lookups and identified movies are consulted before the API, so a known
+    disc is identified without network calls. Item lists and asset status
+    change on the server (browser edits, uploads) and are only used as a
+    fallback when the API can't be reached.
+
+    Writes that fail because the API is unreachable go into an outbox and
+    are replayed in order by sync().
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._local = threading.local()
+        self._sync_lock = threading.Lock()
+        self._conn().executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 connections can't be shared between threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    # ------------------------------------------------------
+    # discs
+    # ------------------------------------------------------
+
+    def get(self, checksum: str) -> Optional[Dict[str, Any]]:
+        row = self._conn().execute("SELECT * FROM discs WHERE checksum = ?", (checksum,)).fetchone()
+        if row is None:
+            return None
+        disc = dict(row)
+        for col in _JSON_COLUMNS:
+            if disc[col] is not None:
+                disc[col] = json.loads(disc[col])
+        return disc
+
+    def _set(self, checksum: str, **fields):
+        now = time.time()
+        for col in _JSON_COLUMNS:
+            if col in fields and fields[col] is not None:
+                fields[col] = json.dumps(fields[col])
+        fields["updated_at"] = now
+
+        cols = ", ".join(fields)
+        marks = ", ".join("?" for _ in fields)
+        updates = ", ".join(f"{c} = excluded.{c}" for c in fields)
+        self._conn().execute(
+            f"INSERT INTO discs (checksum, {cols}) VALUES (?, {marks}) "
+            f"ON CONFLICT (checksum) DO UPDATE SET {updates}",
+            (checksum, *fields.values()),
+        )
+
+    def lookup(self, checksum: str) -> Optional[dict]:
+        disc = self.get(checksum)
+        return disc["lookup"] if disc else None
+
+    def lookup_age(self, checksum: str) -> float:
+        """
+        Seconds since the lookup was last confirmed by the API.
+        """
+        disc = self.get(checksum)
+        if not disc or not disc["checked_at"]:
+            return float("inf")
+        return time.time() - disc["checked_at"]
+
+    def remember_lookup(self, checksum: str, lookup: dict, legacy_checksum: str = None):
+        fields = {"lookup": lookup, "checked_at": time.time()}
+        if legacy_checksum:
+            fields["legacy_checksum"] = legacy_checksum
+        self._set(checksum, **fields)
+
+    def is_known_legacy(self, legacy_checksum: str) -> bool:
+        """
+        True if a disc with this volume-name checksum is already stored
+        under its fingerprint checksum (no legacy migration needed).
+        """
+        row = self._conn().execute(
+            "SELECT 1 FROM discs WHERE legacy_checksum = ? AND lookup IS NOT NULL LIMIT 1",
+            (legacy_checksum,),
+        ).fetchone()
+        return row is not None
+
+    def movie(self, checksum: str) -> Optional[dict]:
+        disc = self.get(checksum)
+        return disc["movie"] if disc else None
+
+    def remember_movie(self, checksum: str, movie: dict, disc_id: int = None):
+        fields = {"movie": movie}
+        if disc_id is not None:
+            fields["disc_id"] = disc_id
+        self._set(checksum, **fields)
+
+    def flag(self, checksum: str, name: str) -> bool:
+        """
+        Read a boolean column ("linked", "layout_created").
+        """
+        disc = self.get(checksum)
+        return bool(disc and disc[name])
+
+    def set_flag(self, checksum: str, name: str, value: bool = True):
+        if name not in ("linked", "layout_created"):
+            raise ValueError(name)
+        self._set(checksum, **{name: int(value)})
+
+    def items(self, checksum: str) -> Optional[List[dict]]:
+        disc = self.get(checksum)
+        return disc["items"] if disc else None
+
+    def remember_items(self, checksum: str, items: List[dict]):
+        self._set(checksum, items=items)
+
+    def assets(self, checksum: str) -> Optional[dict]:
+        disc = self.get(checksum)
+        return disc["assets"] if disc else None
+
+    def remember_assets(self, checksum: str, assets: dict):
+        self._set(checksum, assets=assets)
+
+    # ------------------------------------------------------
+    # offline writes
+    # ------------------------------------------------------
+
+    def queue_write(self, method: str, path: str, body: Any = None, auth: bool = False) -> int:
+        """
+        Store a write for later. auth=True adds the user token on replay
+        (the token itself is never stored).
+        """
+        cur = self._conn().execute(
+            "INSERT INTO outbox (method, path, body, auth, created_at) VALUES (?, ?, ?, ?, ?)",
+            (method.upper(), path, json.dumps(body) if body is not None else None, int(auth), time.time()),
+        )
+        return cur.lastrowid
+
+    def pending_writes(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) AS n FROM outbox").fetchone()["n"]
+
+    def sync(self, client, token: str = None) -> int:
+        """
+        Replay queued writes oldest first. Stops at the first network
+        error (still offline); writes the server rejects with a 4xx are
+        dropped (409 = already there). Returns the number sent.
+        """
+        if not self._sync_lock.acquire(blocking=False):
+            return 0  # Another thread is already syncing
+
+        sent = 0
+        try:
+            conn = self._conn()
+            rows = conn.execute("SELECT * FROM outbox ORDER BY id").fetchall()
+            for row in rows:
+                headers = {"Authorization": f"Bearer {token}"} if row["auth"] and token else {}
+                body = json.loads(row["body"]) if row["body"] is not None else None
+                try:
+                    r = client.request(row["method"], row["path"], json=body, headers=headers)
+                except requests.exceptions.RequestException as e:
+                    conn.execute(
+                        "UPDATE outbox SET attempts = attempts + 1, last_error = ? WHERE id = ?",
+                        (str(e), row["id"]),
+                    )
+                    break
+
+                if r.status_code >= 500:
+                    conn.execute(
+                        "UPDATE outbox SET attempts = attempts + 1, last_error = ? WHERE id = ?",
+                        (f"HTTP {r.status_code}", row["id"]),
+                    )
+                    break
+
+                if r.status_code >= 400 and r.status_code != 409:
+                    print(f"⚠️  Dropped queued {row['method']} {row['path']}: HTTP {r.status_code}")
+                conn.execute("DELETE FROM outbox WHERE id = ?", (row["id"],))
+                sent += 1
+        finally:
+            self._sync_lock.release()
+        return sent
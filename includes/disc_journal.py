@@ -0,0 +1,88 @@
+# includes/disc_journal.py
+
+from __future__ import annotations
+
+import os
+import json
+import threading
+from typing import Any
+
+
+JOURNAL_FILENAME = "disc_journal.json"
+
+
+class DiscJournal:
+    """
+    Per-disc record of finished phases, stored as JSON in the disc's temp
+    directory. A rerun for the same disc reads it and skips straight to the
+    first unfinished phase (no lookups, no prompts for finished ones).
+
+    Phases used by the ripper:
+        identified   {"movie": {...}, "disc_id": 123}
+        layout       True once the metadata layout exists
+        titles       True once titles are scanned and posted
+        cover_art    {"initial_asset_state": {...}}
+        rip_titles   {"<file>.mkv": True, ...} (titles fully written)
+        rip_tracks   {"<title_index>": {"audio": [...], "subtitle": [...]}, ...}
+                     (stream indexes kept by a track selection profile)
+        rip          True once MakeMKV finished the whole disc
+        analysis     True once audio analysis is done
+        encoded      {"<title_index>": "<output path>", ...}
+
+    The file is removed with clear() when the disc is finished.
+    """
+
+    def __init__(self, disc_temp_dir: str):
+        self.path = os.path.join(disc_temp_dir, JOURNAL_FILENAME)
+        self._lock = threading.Lock()
+        self._data = {}
+
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                self._data = data
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Ignoring unreadable disc journal: {e}")
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self._data, f, indent=2)
+        os.replace(tmp, self.path)
+
+    def get(self, phase: str, default: Any = None) -> Any:
+        with self._lock:
+            return self._data.get(phase, default)
+
+    def done(self, phase: str) -> bool:
+        with self._lock:
+            return bool(self._data.get(phase))
+
+    def record(self, phase: str, data: Any = True):
+        with self._lock:
+            self._data[phase] = data
+            self._save()
+
+    def update(self, phase: str, key: str, value: Any = True):
+        """
+        Set one entry of a per-title phase (rip_titles, encoded).
+        """
+        with self._lock:
+            entries = self._data.get(phase)
+            if not isinstance(entries, dict):
+                entries = {}
+            entries[str(key)] = value
+            self._data[phase] = entries
+            self._save()
+
+    def clear(self):
+        with self._lock:
+            self._data = {}
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,275 @@
+# includes/encode_queue.py
+
+from __future__ import annotations
+
+import os
+import json
+import time
+import socket
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional
+
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS encode_jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    checksum TEXT NOT NULL,
+    label TEXT,
+    raw_path TEXT NOT NULL,
+    output_path TEXT NOT NULL,
+    preset TEXT NOT NULL,
+    disc_type TEXT NOT NULL,
+    audio_tracks TEXT NOT NULL,
+    subtitle_tracks TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    lease_expires REAL,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    UNIQUE (raw_path, output_path)
+);
+CREATE INDEX IF NOT EXISTS encode_jobs_status ON encode_jobs (status, id);
+"""
+
+
+def _worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class EncodeQueue:
+    """
+    Durable encode job queue in a local SQLite file.
+
+    The ripper enqueues one job per enabled metadata item and exits;
+    "--encode-worker" processes claim and run the jobs. A job that was
+    RUNNING when its worker died is picked up again by the next worker
+    started on the same host.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.executescript(_SCHEMA)
+            # Queues created before leases existed
+            columns = {r["name"] for r in conn.execute("PRAGMA table_info(encode_jobs)")}
+            if "lease_expires" not in columns:
+                conn.execute("ALTER TABLE encode_jobs ADD COLUMN lease_expires REAL")
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 connections can't be shared between threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _row_to_job(row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        job["audio_tracks"] = json.loads(job["audio_tracks"])
+        job["subtitle_tracks"] = json.loads(job["subtitle_tracks"])
+        return job
+
+    def enqueue(self, checksum: str, raw_path: str, output_path: str, preset: str, disc_type: str,
+                audio_tracks: list, subtitle_tracks: list, label: str = None) -> int:
+        """
+        Add (or re-queue) the job for raw_path -> output_path. Returns the job id.
+        """
+        now = time.time()
+        conn = self._conn()
+        conn.execute(
+            """
+            INSERT INTO encode_jobs (checksum, label, raw_path, output_path, preset, disc_type,
+                                     audio_tracks, subtitle_tracks, status, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (raw_path, output_path) DO UPDATE SET
+                checksum = excluded.checksum,
+                label = excluded.label,
+                preset = excluded.preset,
+                disc_type = excluded.disc_type,
+                audio_tracks = excluded.audio_tracks,
+                subtitle_tracks = excluded.subtitle_tracks,
+                status = excluded.status,
+                attempts = 0,
+                worker = NULL,
+                lease_expires = NULL,
+                error = NULL,
+                updated_at = excluded.updated_at
+            """,
+            (checksum, label, raw_path, output_path, preset, disc_type,
+             json.dumps(audio_tracks or []), json.dumps(subtitle_tracks or []),
+             QUEUED, now, now),
+        )
+        row = conn.execute(
+            "SELECT id FROM encode_jobs WHERE raw_path = ? AND output_path = ?",
+            (raw_path, output_path),
+        ).fetchone()
+        return row["id"]
+
+    def claim(self, worker: str = None, lease_seconds: float = None) -> Optional[Dict[str, Any]]:
+        """
+        Atomically take the oldest queued job and mark it RUNNING.
+        Returns the job dict, or None if nothing is queued.
+
+        With lease_seconds the job is leased: it goes back to the queue
+        unless the worker calls heartbeat() before the lease runs out.
+        """
+        worker = worker or _worker_id()
+        lease_expires = time.time() + lease_seconds if lease_seconds else None
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT * FROM encode_jobs WHERE status = ? ORDER BY id LIMIT 1",
+                (QUEUED,),
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                """
+                UPDATE encode_jobs
+                SET status = ?, worker = ?, lease_expires = ?, attempts = attempts + 1, updated_at = ?
+                WHERE id = ?
+                """,
+                (RUNNING, worker, lease_expires, time.time(), row["id"]),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        job = self._row_to_job(row)
+        job["status"] = RUNNING
+        job["worker"] = worker
+        job["lease_expires"] = lease_expires
+        job["attempts"] += 1
+        return job
+
+    def get(self, job_id: int) -> Optional[Dict[str, Any]]:
+        row = self._conn().execute("SELECT * FROM encode_jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def _set_status(self, job_id: int, status: str, error: str = None, worker: str = None) -> bool:
+        """
+        Finish a RUNNING job. If worker is given, only that worker's lease
+        counts (a job re-queued after a lost lease can't be finished twice).
+        """
+        sql = "UPDATE encode_jobs SET status = ?, error = ?, lease_expires = NULL, updated_at = ? WHERE id = ?"
+        params = [status, error, time.time(), job_id]
+        if worker:
+            sql += " AND worker = ? AND status = ?"
+            params += [worker, RUNNING]
+        cur = self._conn().execute(sql, params)
+        return cur.rowcount == 1
+
+    def complete(self, job_id: int, worker: str = None) -> bool:
+        return self._set_status(job_id, DONE, worker=worker)
+
+    def fail(self, job_id: int, error: str, worker: str = None) -> bool:
+        return self._set_status(job_id, FAILED, error, worker=worker)
+
+    def requeue(self, job_id: int):
+        self._conn().execute(
+            "UPDATE encode_jobs SET status = ?, worker = NULL, lease_expires = NULL, updated_at = ? WHERE id = ?",
+            (QUEUED, time.time(), job_id),
+        )
+
+    def heartbeat(self, job_id: int, worker: str, lease_seconds: float) -> bool:
+        """
+        Extend a lease. Returns False if the worker no longer holds the job.
+        """
+        cur = self._conn().execute(
+            """
+            UPDATE encode_jobs SET lease_expires = ?, updated_at = ?
+            WHERE id = ? AND worker = ? AND status = ?
+            """,
+            (time.time() + lease_seconds, time.time(), job_id, worker, RUNNING),
+        )
+        return cur.rowcount == 1
+
+    def expire_leases(self) -> int:
+        """
+        Re-queue leased jobs whose worker stopped sending heartbeats.
+        Returns the number of jobs re-queued.
+        """
+        cur = self._conn().execute(
+            """
+            UPDATE encode_jobs SET status = ?, worker = NULL, lease_expires = NULL, updated_at = ?
+            WHERE status = ? AND lease_expires IS NOT NULL AND lease_expires < ?
+            """,
+            (QUEUED, time.time(), RUNNING, time.time()),
+        )
+        return cur.rowcount
+
+    def recover_orphaned(self) -> int:
+        """
+        Re-queue RUNNING jobs whose worker process on this host is gone.
+        Returns the number of jobs re-queued.
+        """
+        host = socket.gethostname()
+        recovered = 0
+        rows = self._conn().execute(
+            "SELECT id, worker FROM encode_jobs WHERE status = ? AND lease_expires IS NULL",
+            (RUNNING,),
+        ).fetchall()
+        for row in rows:
+            w_host, _, w_pid = (row["worker"] or "").rpartition(":")
+            if w_host != host:
+                continue
+            try:
+                alive = _pid_alive(int(w_pid))
+            except ValueError:
+                alive = False
+            if not alive:
+                self.requeue(row["id"])
+                recovered += 1
+        return recovered
+
+    def pending_for_checksum(self, checksum: str) -> int:
+        """
+        Number of jobs for a disc that are still queued or running.
+        """
+        row = self._conn().execute(
+            "SELECT COUNT(*) AS n FROM encode_jobs WHERE checksum = ? AND status IN (?, ?)",
+            (checksum, QUEUED, RUNNING),
+        ).fetchone()
+        return row["n"]
+
+    def counts(self) -> Dict[str, int]:
+        rows = self._conn().execute(
+            "SELECT status, COUNT(*) AS n FROM encode_jobs GROUP BY status"
+        ).fetchall()
+        return {r["status"]: r["n"] for r in rows}
+
+    def jobs(self, status: str = None) -> List[Dict[str, Any]]:
+        if status:
+            rows = self._conn().execute(
+                "SELECT * FROM encode_jobs WHERE status = ? ORDER BY id", (status,)
+            ).fetchall()
+        else:
+            rows = self._conn().execute("SELECT * FROM encode_jobs ORDER BY id").fetchall()
+        return [self._row_to_job(r) for r in rows]
@@ -0,0 +1,272 @@
+# includes/job_server.py
+#
+# Small HTTP front-end for the encode queue, so encode workers on other
+# machines can lease jobs from the ripping station:
+#
+#   POST /jobs/lease             {"worker": "..."}          -> 200 job | 204
+#   POST /jobs/<id>/heartbeat    {"worker": "..."}          -> 200 | 409 lease lost
+#   POST /jobs/<id>/complete     {"worker": "..."}          -> 200 | 409
+#   POST /jobs/<id>/fail         {"worker": "...", "error"} -> 200 | 409
+#   GET  /jobs/<id>/raw          ?worker=...                -> raw MKV bytes
+#   PUT  /jobs/<id>/output       ?worker=...                -> store encoded MKV | 409
+
+from __future__ import annotations
+
+import os
+import re
+import json
+import shutil
+import tempfile
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Optional
+
+from includes.encode_queue import EncodeQueue, RUNNING
+
+
+_JOB_PATH_RE = re.compile(r"^/jobs/(\d+)/(heartbeat|complete|fail|raw|output)$")
+
+_CHUNK = 1024 * 1024
+
+
+class JobServer:
+    """
+    Serves an EncodeQueue over HTTP and re-queues jobs whose lease ran out
+    (worker crashed, machine went away).
+
+    on_complete(job) is called in the server process after a worker
+    reported success (remove raw file, notify, ...).
+
+    Without a token the server only listens on 127.0.0.1: raw downloads
+    and output uploads are not exposed to the LAN unauthenticated.
+    """
+
+    def __init__(self, encode_queue: EncodeQueue, host: Optional[str] = None, port: int = 8766,
+                 lease_seconds: int = 120, token: str = None,
+                 on_complete: Optional[Callable[[dict], None]] = None):
+        if host is None:
+            host = "0.0.0.0" if token else "127.0.0.1"
+        elif not token and host not in ("127.0.0.1", "localhost", "::1"):
+            raise ValueError(f"refusing to serve jobs on {host} without a token")
+
+        self.queue = encode_queue
+        self.lease_seconds = lease_seconds
+        self.token = token
+        self.on_complete = on_complete
+        self._stop = threading.Event()
+
+        server = self
+
+        class Handler(_JobHandler):
+            job_server = server
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+
+    @property
+    def host(self) -> str:
+        return self.httpd.server_address[0]
+
+    @property
+    def port(self) -> int:
+        return self.httpd.server_address[1]
+
+    def start(self):
+        threading.Thread(target=self.httpd.serve_forever, name="job-server", daemon=True).start()
+        threading.Thread(target=self._reap_leases, name="job-lease-reaper", daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def _reap_leases(self):
+        while not self._stop.wait(max(self.lease_seconds / 4, 1)):
+            expired = self.queue.expire_leases()
+            if expired:
+                print(f"\n♻️ Re-queued {expired} job(s) from unresponsive workers")
+
+
+class _JobHandler(BaseHTTPRequestHandler):
+    job_server: JobServer = None
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass  # Keep the ripper console clean
+
+    # ------------------------------------------------------
+    # helpers
+    # ------------------------------------------------------
+
+    def _send_json(self, status: int, payload=None):
+        body = json.dumps(payload).encode() if payload is not None else b""
+        self.send_response(status)
+        if body:
+            self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def _read_json(self) -> Optional[dict]:
+        """
+        Returns the JSON object body ({} if empty), or None if the body is
+        not a JSON object.
+        """
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        try:
+            body = json.loads(self.rfile.read(length))
+        except ValueError:
+            return None
+        return body if isinstance(body, dict) else None
+
+    def _authorized(self) -> bool:
+        token = self.job_server.token
+        if not token:
+            return True
+        if self.headers.get("Authorization") == f"Bearer {token}":
+            return True
+        self._send_json(401, {"error": "unauthorized"})
+        return False
+
+    def _route(self):
+        parsed = urllib.parse.urlparse(self.path)
+        query = urllib.parse.parse_qs(parsed.query)
+        m = _JOB_PATH_RE.match(parsed.path)
+        if not m:
+            return parsed.path, None, None, query
+        return parsed.path, int(m.group(1)), m.group(2), query
+
+    def _leased_job(self, job_id: int, worker: str):
+        """
+        Returns the job if `worker` currently holds its lease, else sends 409.
+        """
+        job = self.job_server.queue.get(job_id)
+        if not job or job["status"] != RUNNING or job["worker"] != worker:
+            self._send_json(409, {"error": "lease lost"})
+            return None
+        return job
+
+    # ------------------------------------------------------
+    # verbs
+    # ------------------------------------------------------
+
+    def do_POST(self):
+        if not self._authorized():
+            return
+        path, job_id, action, _ = self._route()
+        body = self._read_json()
+        if body is None:
+            self._send_json(400, {"error": "JSON object expected"})
+            return
+        worker = body.get("worker")
+        queue = self.job_server.queue
+        lease = self.job_server.lease_seconds
+
+        if path == "/jobs/lease":
+            if not worker:
+                self._send_json(400, {"error": "worker required"})
+                return
+            job = queue.claim(worker=worker, lease_seconds=lease)
+            if job is None:
+                self._send_json(204)
+                return
+            job["lease_seconds"] = lease
+            self._send_json(200, job)
+            return
+
+        if job_id is None or not worker:
+            self._send_json(404, {"error": "not found"})
+            return
+
+        if action == "heartbeat":
+            ok = queue.heartbeat(job_id, worker, lease)
+            self._send_json(200 if ok else 409, {"ok": ok})
+        elif action == "complete":
+            job = self._leased_job(job_id, worker)
+            if job is None:
+                return
+            if not os.path.isfile(job["output_path"]):
+                self._send_json(409, {"error": "output missing"})
+                return
+            queue.complete(job_id, worker=worker)
+            self._send_json(200, {"ok": True})
+            if self.job_server.on_complete:
+                self.job_server.on_complete(job)
+        elif action == "fail":
+            ok = queue.fail(job_id, body.get("error") or "unknown error", worker=worker)
+            self._send_json(200 if ok else 409, {"ok": ok})
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_GET(self):
+        if not self._authorized():
+            return
+        _, job_id, action, query = self._route()
+        if action != "raw":
+            self._send_json(404, {"error": "not found"})
+            return
+
+        job = self._leased_job(job_id, (query.get("worker") or [None])[0])
+        if job is None:
+            return
+
+        raw_path = job["raw_path"]
+        try:
+            size = os.path.getsize(raw_path)
+        except OSError:
+            self._send_json(404, {"error": "raw file missing"})
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "video/x-matroska")
+        self.send_header("Content-Length", str(size))
+        self.end_headers()
+        with open(raw_path, "rb") as f:
+            shutil.copyfileobj(f, self.wfile, _CHUNK)
+
+    def do_PUT(self):
+        if not self._authorized():
+            return
+        _, job_id, action, query = self._route()
+        if action != "output":
+            self._send_json(404, {"error": "not found"})
+            return
+
+        worker = (query.get("worker") or [None])[0]
+        job = self._leased_job(job_id, worker)
+        if job is None:
+            return
+
+        length = int(self.headers.get("Content-Length") or 0)
+        out_path = job["output_path"]
+        out_dir = os.path.dirname(out_path)
+        os.makedirs(out_dir, exist_ok=True)
+
+        # One part file per upload: a worker whose lease ran out may still
+        # be sending while the new lease holder uploads
+        fd, part_path = tempfile.mkstemp(dir=out_dir, prefix=f".{os.path.basename(out_path)}.", suffix=".part")
+        remaining = length
+        with os.fdopen(fd, "wb") as f:
+            while remaining > 0:
+                chunk = self.rfile.read(min(_CHUNK, remaining))
+                if not chunk:
+                    break
+                f.write(chunk)
+                remaining -= len(chunk)
+
+        if remaining:
+            os.remove(part_path)
+            self._send_json(400, {"error": "incomplete upload"})
+            return
+
+        # The lease may have expired (and the job been re-leased) mid-upload
+        if self._leased_job(job_id, worker) is None:
+            os.remove(part_path)
+            return
+
+        os.replace(part_path, out_path)
+        self._send_json(200, {"ok": True})
@@ -0,0 +1,263 @@
+# includes/layout_watcher.py
+#
+# One background loop that waits for metadata layouts to become READY,
+# for any number of discs at once. Uses the best mechanism the server has:
+#
+#   1. GET /metadata-layout/events?checksums=a,b   server-sent events
+#        data: {"checksum": "a", "status": "ready"}
+#   2. GET /metadata-layout/status?checksums=a,b&wait=N
+#        {"a": {"status": "editing", ...}, "b": "ready"}   (long-poll if the
+#        server honours `wait`, otherwise a plain batched poll)
+#   3. GET /metadata-layout/<checksum>   per disc (always available)
+#
+# Polling is adaptive: fast right after a disc is added or something on
+# a layout changed, backing off while nobody touches it.
+
+from __future__ import annotations
+
+import json
+import time
+import threading
+from typing import Callable, Dict, List, Optional
+
+import requests
+
+from includes.api_client import ApiClient
+
+
+LONG_POLL_SECONDS = 30
+
+
+class LayoutReadyWatcher:
+    """
+    Multiplexes READY detection for every watched checksum over one
+    request loop (one event stream or one batched status request for all
+    discs, instead of one poll per disc).
+
+    watch() starts the loop on first use; a layout that reached READY
+    stays READY, so it is not polled again.
+    """
+
+    def __init__(self, client: ApiClient, min_interval: float = 2, max_interval: float = 60,
+                 backoff: float = 1.5):
+        self.client = client
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+
+        # None = not tried yet, False = server doesn't have it
+        self._sse: Optional[bool] = None
+        self._batch: Optional[bool] = None
+
+        self._events: Dict[str, threading.Event] = {}
+        self._callbacks: Dict[str, List[Callable[[], None]]] = {}
+        self._status: Dict[str, str] = {}
+        self._seen: Dict[str, str] = {}  # checksum -> last layout payload (activity detection)
+        self._interval = min_interval
+
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stream: Optional[requests.Response] = None
+
+    # ------------------------------------------------------
+    # public
+    # ------------------------------------------------------
+
+    def watch(self, checksum: str, on_ready: Callable[[], None] = None) -> threading.Event:
+        """
+        Start watching a layout. Returns an Event that is set once it is
+        READY; on_ready (if given) is called from the watcher thread.
+        """
+        with self._lock:
+            event = self._events.setdefault(checksum, threading.Event())
+            if on_ready:
+                if event.is_set():
+                    ready_now = True
+                else:
+                    self._callbacks.setdefault(checksum, []).append(on_ready)
+                    ready_now = False
+            else:
+                ready_now = False
+
+            self._interval = self.min_interval
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="layout-watcher", daemon=True)
+                self._thread.start()
+            stream = self._stream
+
+        if ready_now:
+            on_ready()
+
+        # Reconnect the event stream / cut the sleep short so the new disc is included
+        if stream is not None:
+            stream.close()
+        self._wake.set()
+        return event
+
+    def unwatch(self, checksum: str):
+        with self._lock:
+            self._events.pop(checksum, None)
+            self._callbacks.pop(checksum, None)
+            self._status.pop(checksum, None)
+            self._seen.pop(checksum, None)
+
+    def status(self, checksum: str) -> Optional[str]:
+        """
+        Last status seen for a watched layout (None until the first answer).
+        """
+        with self._lock:
+            return self._status.get(checksum)
+
+    # ------------------------------------------------------
+    # loop
+    # ------------------------------------------------------
+
+    def _pending(self) -> List[str]:
+        with self._lock:
+            return sorted(c for c, e in self._events.items() if not e.is_set())
+
+    def _run(self):
+        while True:
+            checksums = self._pending()
+            if not checksums:
+                self._wake.wait()
+                self._wake.clear()
+                continue
+
+            if self._sse is not False:
+                start = time.monotonic()
+                try:
+                    if self._follow_events(checksums):
+                        if time.monotonic() - start < 1:
+                            # Server keeps closing the stream right away
+                            self._wake.wait(self.min_interval)
+                            self._wake.clear()
+                        continue
+                except Exception:
+                    pass  # Dropped, or closed for a reconnect: fall through to one poll
+
+            waited = False
+            try:
+                if self._batch is not False:
+                    waited = self._poll_batch(checksums)
+                if self._batch is False:
+                    self._poll_each(checksums)
+            except requests.exceptions.RequestException:
+                pass
+
+            if waited:
+                continue  # Long-poll already did the waiting
+
+            self._wake.wait(self._interval)
+            self._wake.clear()
+            self._interval = min(self._interval * self.backoff, self.max_interval)
+
+    def _update(self, checksum: str, status: str, payload=None):
+        """
+        Record a status; a changed payload counts as activity.
+        """
+        status = (status or "unknown").lower()
+        fingerprint = json.dumps(payload if payload is not None else status, sort_keys=True, default=str)
+
+        with self._lock:
+            if checksum not in self._events:
+                return
+            previous = self._seen.get(checksum)
+            self._seen[checksum] = fingerprint
+            self._status[checksum] = status
+            if previous is not None and previous != fingerprint:
+                self._interval = self.min_interval
+
+            if status != "ready" or self._events[checksum].is_set():
+                return
+            self._events[checksum].set()
+            callbacks = self._callbacks.pop(checksum, [])
+
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"\n⚠️  Layout READY callback failed: {e}")
+
+    def _follow_events(self, checksums: List[str]) -> bool:
+        """
+        Follow the event stream until it ends or the watch list changes.
+        Returns False if the server has no event stream.
+        """
+        r = self.client.get(
+            "/metadata-layout/events",
+            params={"checksums": ",".join(checksums)},
+            headers={"Accept": "text/event-stream"},
+            stream=True,
+            timeout=(5, LONG_POLL_SECONDS + 15),
+            retries=0,
+        )
+        if r.status_code != 200 or "text/event-stream" not in r.headers.get("Content-Type", ""):
+            r.close()
+            self._sse = False
+            return False
+
+        self._sse = True
+        with self._lock:
+            self._stream = r
+        try:
+            if self._pending() != checksums:
+                return True  # Watch list changed while connecting
+
+            data = []
+            for line in r.iter_lines(chunk_size=1, decode_unicode=True):
+                if line:
+                    if line.startswith("data:"):
+                        data.append(line[5:].strip())
+                    continue
+
+                # Blank line: dispatch the event
+                if data:
+                    try:
+                        event = json.loads("\n".join(data))
+                        self._update(event.get("checksum"), event.get("status"), event)
+                    except (ValueError, AttributeError):
+                        pass
+                    data = []
+                if not self._pending():
+                    break
+        finally:
+            with self._lock:
+                self._stream = None
+            r.close()
+        return True
+
+    def _poll_batch(self, checksums: List[str]) -> bool:
+        """
+        One batched status request. Returns True if the server held it
+        open (long-poll), i.e. no extra sleep is needed.
+        """
+        start = time.monotonic()
+        r = self.client.get(
+            "/metadata-layout/status",
+            params={"checksums": ",".join(checksums), "wait": LONG_POLL_SECONDS},
+            timeout=(5, LONG_POLL_SECONDS + 15),
+            retries=0,
+        )
+        if r.status_code in (404, 405):
+            self._batch = False
+            return False
+        if r.status_code != 200:
+            return False
+
+        self._batch = True
+        for checksum, value in (r.json() or {}).items():
+            if isinstance(value, dict):
+                self._update(checksum, value.get("status"), value)
+            else:
+                self._update(checksum, value)
+
+        return time.monotonic() - start >= LONG_POLL_SECONDS / 2
+
+    def _poll_each(self, checksums: List[str]):
+        for checksum in checksums:
+            r = self.client.get(f"/metadata-layout/{checksum}", retries=0)
+            if r.status_code == 200:
+                layout = r.json()
+                self._update(checksum, layout.get("status"), layout)
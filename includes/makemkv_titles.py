@@ -5,7 +5,8 @@ from __future__ import annotations
 import re
 import sys
 import subprocess
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
+from xml.sax.saxutils import escape
 
 
 # MakeMKV error signatures we treat as "disc is scratched/unreadable"
@@ -37,6 +38,11 @@ _TINFO_RE = re.compile(r"^TINFO:(\d+),(\d+),(\d+),\"(.*)\"$")
 #   SINFO:0,2,1,6202,"Subtitles"
 _SINFO_RE = re.compile(r"^SINFO:(\d+),(\d+),(\d+),(\d+),\"(.*)\"$")
 
+# DRV: drive_index, visible, enabled, flags, "drive name", "disc name", "device"
+#   DRV:0,2,999,1,"BD-RE HL-DT-ST BD-RE WH16NS60","ALIEN_RESURRECTION","/dev/rdisk4"
+#   DRV:1,256,999,0,"","",""
+_DRV_RE = re.compile(r'^DRV:(\d+),(\d+),(\d+),(\d+),"(.*)","(.*)","(.*)"$')
+
 # Stream type codes from MakeMKV
 STREAM_TYPE_VIDEO = 6206
 STREAM_TYPE_AUDIO = 6201
@@ -396,7 +402,7 @@ def _run_makemkv_info(make_mkv_path: str, disc_spec: str = "disc:0", timeout: in
     return lines
 
 
-def scan_titles_with_makemkv(make_mkv_path: str) -> List[Dict[str, Any]]:
+def scan_titles_with_makemkv(make_mkv_path: str, disc_spec: str = "disc:0") -> List[Dict[str, Any]]:
     """
     Scan titles on the disc including audio and subtitle tracks.
 
@@ -448,7 +454,7 @@ def scan_titles_with_makemkv(make_mkv_path: str) -> List[Dict[str, Any]]:
         ...
       ]
     """
-    output_lines = _run_makemkv_info(make_mkv_path)
+    output_lines = _run_makemkv_info(make_mkv_path, disc_spec)
 
     # Aggregate TINFO by title_index
     titles_tinfo: Dict[int, Dict[int, str]] = {}
@@ -586,3 +592,149 @@ def scan_titles_with_makemkv(make_mkv_path: str) -> List[Dict[str, Any]]:
         return filtered_results
 
     return results
+
+
+def list_makemkv_drives(make_mkv_path: str, timeout: int = 60) -> List[Dict[str, Any]]:
+    """
+    Lists optical drives known to MakeMKV that have a disc inserted.
+
+    Uses "info disc:9999", which makes MakeMKV print its drive list
+    without opening any disc.
+
+    Returns list of dicts: {"index", "drive_name", "disc_name", "device"}
+    """
+    cmd = [make_mkv_path, "-r", "--cache=1", "info", "disc:9999"]
+    try:
+        result = subprocess.run(
+            cmd,
+            capture_output=True,
+            text=True,
+            errors="replace",
+            timeout=timeout,
+        )
+    except (OSError, subprocess.TimeoutExpired) as e:
+        print(f"⚠️  Could not list MakeMKV drives: {e}")
+        return []
+
+    drives: List[Dict[str, Any]] = []
+    for line in result.stdout.splitlines():
+        m = _DRV_RE.match(line.strip())
+        if not m:
+            continue
+        device = m.group(7)
+        if not device:
+            continue  # Empty slot / no disc
+        drives.append({
+            "index": int(m.group(1)),
+            "drive_name": m.group(5),
+            "disc_name": m.group(6),
+            "device": device,
+        })
+    return drives
+
+
+def _volume_device_node(volume_name: str) -> Optional[str]:
+    """
+    Returns the device node ("/dev/disk4") backing /Volumes/<volume_name>.
+    """
+    try:
+        result = subprocess.run(
+            ["diskutil", "info", f"/Volumes/{volume_name}"],
+            capture_output=True,
+            text=True,
+            timeout=10,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+
+    m = re.search(r"Device Node:\s*(\S+)", result.stdout)
+    return m.group(1) if m else None
+
+
+def makemkv_drive_index_for_volume(make_mkv_path: str, volume_name: str) -> Optional[int]:
+    """
+    Maps a mounted volume to the MakeMKV drive index (for "disc:N").
+
+    Matches on the device node first (MakeMKV reports the raw device,
+    /dev/rdiskN), then falls back to the disc label.
+    """
+    drives = list_makemkv_drives(make_mkv_path)
+
+    device = _volume_device_node(volume_name)
+    if device:
+        for drive in drives:
+            if drive["device"].replace("/dev/r", "/dev/") == device:
+                return drive["index"]
+
+    for drive in drives:
+        if drive["disc_name"] == volume_name:
+            return drive["index"]
+
+    return None
+
+
+# MakeMKV conversion profile carrying a selection rule (makemkvcon --profile=).
+# Built on the structure of MakeMKV's shipped default.mmcp.xml: the rule is
+# the app_DefaultSelectionString setting the default track rule refers to.
+_PROFILE_TEMPLATE = """<?xml version="1.0" encoding="utf-8"?>
+<profile>
+    <name>{name}</name>
+    <profileSettings>
+        <setting name="app_DefaultSelectionString" value="{rule}"/>
+    </profileSettings>
+    <outputSettings name="copy" options="-codec_copy">
+        <extension>mkv</extension>
+    </outputSettings>
+    <trackSettings input="default">
+        <output outputSettingsName="copy" defaultSelection="$app_DefaultSelectionString">
+        </output>
+    </trackSettings>
+</profile>
+"""
+
+def _selection_language(track: Dict[str, Any]) -> str:
+    code = (track.get("language_code") or "").lower()
+    return code if re.fullmatch(r"[a-z]{3}", code) and code != "und" else "nolang"
+
+
+def track_selection(audio_tracks: List[Dict[str, Any]],
+                    subtitle_tracks: List[Dict[str, Any]]) -> Tuple[str, List[int], List[int]]:
+    """
+    MakeMKV selection rule for one title: the video, plus every audio and
+    subtitle track in a language that has an enabled track of that type.
+
+    MakeMKV rules select by type and language, not by stream, so a
+    disabled track sharing its language with an enabled one (e.g. an
+    English commentary) is still ripped. Without any enabled audio track
+    all audio is kept (the encode falls back to audio track 1).
+
+    Returns (rule, kept audio stream_indexes, kept subtitle stream_indexes).
+    """
+    rule = ["-sel:all", "+sel:video"]
+    kept = []
+
+    for kind, tracks in (("audio", audio_tracks), ("subtitle", subtitle_tracks)):
+        languages = []
+        for t in tracks:
+            lang = _selection_language(t)
+            if t.get("enabled", True) and lang not in languages:
+                languages.append(lang)
+
+        if not languages and kind == "audio":
+            rule.append("+sel:audio")
+            kept.append([t.get("stream_index") for t in tracks])
+            continue
+        if languages:
+            rule.append(f"+sel:({kind}&({'|'.join(languages)}))")
+        kept.append([t.get("stream_index") for t in tracks if _selection_language(t) in languages])
+
+    return ",".join(rule), kept[0], kept[1]
+
+
+def write_selection_profile(path: str, rule: str, name: str = "track selection"):
+    """
+    Write a MakeMKV profile (.mmcp.xml) applying the selection rule.
+    """
+    attr = {'"': "&quot;"}
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(_PROFILE_TEMPLATE.format(name=escape(name), rule=escape(rule, attr)))
@@ -0,0 +1,102 @@
+# includes/metadata_items.py
+
+from __future__ import annotations
+
+import re
+import copy
+import threading
+from typing import Dict, List, Optional
+
+from includes.api_client import ApiClient
+
+
+# Writes that change a disc's item list
+_LAYOUT_PATH_RE = re.compile(r"^/metadata-layout/([^/]+)(?:/items(?:/.*)?)?$")
+_ITEM_PATH_RE = re.compile(r"^/metadata-layout/items/([^/]+)")
+
+
+class MetadataItemsCache:
+    """
+    Per-checksum cache of GET /metadata-layout/<checksum>/items.
+
+    Revalidates with If-None-Match / If-Modified-Since, so an unchanged
+    list costs a 304 without a body. Our own POST/PATCH/DELETE on a
+    disc's layout or items drop its entry (via ApiClient.on_write).
+
+    If the server sends neither ETag nor Last-Modified, every get() is a
+    full fetch: the layout is edited in the browser as well, so a list
+    without validators can't be trusted to be current.
+    """
+
+    def __init__(self, client: ApiClient):
+        self.client = client
+        self._entries: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        client.on_write(self._on_write)
+
+    def get(self, checksum: str) -> Optional[List[dict]]:
+        """
+        Returns a copy of the item list, or None if the API answered with
+        an error status. Network errors raise requests.RequestException.
+        """
+        with self._lock:
+            entry = self._entries.get(checksum)
+
+        headers = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        r = self.client.get(f"/metadata-layout/{checksum}/items", headers=headers)
+
+        if r.status_code == 304 and entry:
+            return copy.deepcopy(entry["items"])
+
+        if r.status_code != 200:
+            return None
+
+        items = r.json()
+        if not isinstance(items, list):
+            return None
+
+        etag = r.headers.get("ETag")
+        last_modified = r.headers.get("Last-Modified")
+        with self._lock:
+            if etag or last_modified:
+                self._entries[checksum] = {
+                    "items": copy.deepcopy(items),
+                    "etag": etag,
+                    "last_modified": last_modified,
+                    "item_ids": {str(i.get("id")) for i in items if isinstance(i, dict)},
+                }
+            else:
+                self._entries.pop(checksum, None)
+
+        return items
+
+    def invalidate(self, checksum: str = None):
+        """
+        Drop one disc's cached items, or all of them.
+        """
+        with self._lock:
+            if checksum is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(checksum, None)
+
+    def _on_write(self, method: str, path: str):
+        m = _ITEM_PATH_RE.match(path)
+        if m:
+            # PATCH /metadata-layout/items/<id> doesn't name the disc
+            item_id = m.group(1)
+            with self._lock:
+                for checksum, entry in list(self._entries.items()):
+                    if item_id in entry["item_ids"]:
+                        del self._entries[checksum]
+            return
+
+        m = _LAYOUT_PATH_RE.match(path)
+        if m:
+            self.invalidate(m.group(1))
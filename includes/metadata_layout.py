@@ -1,15 +1,18 @@
 # includes/metadata_layout.py
-import time
 import requests
 
-import os
-DISCFINDER_API = os.getenv("DISCFINDER_API", "https://disc-api.bylund.cloud")
+from includes.api_client import API
+from includes.layout_watcher import LayoutReadyWatcher
 
+# One watcher for every disc this process waits on
+LAYOUT_WATCHER = LayoutReadyWatcher(API)
 
-def wait_for_metadata_layout_ready(checksum: str, poll_interval: int = 5):
+
+def wait_for_metadata_layout_ready(checksum: str):
     """
     Blocks indefinitely until metadata_layout.status == 'ready'.
-    Will retry forever on network errors - user can Ctrl+C to abort.
+    Waits on the shared LAYOUT_WATCHER (event stream / long-poll /
+    adaptive polling) - user can Ctrl+C to abort.
     """
     print("\n⏳ Waiting for metadata layout to become READY...")
     print("   Edit in browser, then mark as READY when done.")
@@ -17,61 +20,38 @@ def wait_for_metadata_layout_ready(checksum: str, poll_interval: int = 5):
 
     spinner = ["⠋", "⠙", "⠹", "⠸", "⠼", "⠴", "⠦", "⠧", "⠇", "⠏"]
     i = 0
-    error_count = 0
-
-    while True:
-        try:
-            r = requests.get(
-                f"{DISCFINDER_API}/metadata-layout/{checksum}",
-                timeout=10,
-            )
-
-            if r.status_code != 200:
-                error_count += 1
-                print(f"\r⚠️  API returned {r.status_code} (retry {error_count})...", end="", flush=True)
-                time.sleep(poll_interval)
-                continue
-
-            error_count = 0
-            status = r.json().get("status", "unknown")
+    ready = LAYOUT_WATCHER.watch(checksum)
 
+    try:
+        while not ready.wait(0.5):
+            status = LAYOUT_WATCHER.status(checksum) or "…"
             print(
                 f"\r{spinner[i % len(spinner)]} status = {status}   ",
                 end="",
                 flush=True
             )
             i += 1
+    except KeyboardInterrupt:
+        LAYOUT_WATCHER.unwatch(checksum)
+        print("\n\n❌ Aborted by user")
+        raise SystemExit(1)
 
-            if status == "ready":
-                print("\n✅ Metadata layout is READY")
-                return
-
-        except requests.exceptions.Timeout:
-            error_count += 1
-            print(f"\r⚠️  Request timeout (retry {error_count})...     ", end="", flush=True)
-        except requests.exceptions.RequestException as e:
-            error_count += 1
-            print(f"\r⚠️  Network error (retry {error_count})...       ", end="", flush=True)
-        except KeyboardInterrupt:
-            print("\n\n❌ Aborted by user")
-            raise SystemExit(1)
+    print("\n✅ Metadata layout is READY")
 
-        time.sleep(poll_interval)
 
-
-def ensure_metadata_layout(checksum: str, disc_type: str, movie: dict):
-    payload = {
+def metadata_layout_payload(disc_type: str, movie: dict) -> dict:
+    return {
         "disc_type": disc_type,
         "imdb_id": movie.get("imdbID"),
         "title": movie.get("Title"),
         "year": movie.get("Year"),
     }
 
-    r = requests.post(
-        f"{DISCFINDER_API}/metadata-layout/{checksum}",
-        json=payload,
-        timeout=5,
-    )
+
+def ensure_metadata_layout(checksum: str, disc_type: str, movie: dict):
+    payload = metadata_layout_payload(disc_type, movie)
+
+    r = API.post(f"/metadata-layout/{checksum}", json=payload)
 
     if r.status_code in (200, 201):
         print("🆕 Metadata layout created")
@@ -83,4 +63,18 @@ def ensure_metadata_layout(checksum: str, disc_type: str, movie: dict):
 
     print("❌ Failed to ensure metadata layout")
     print(r.status_code, r.text)
-    raise SystemExit(1)
\ No newline at end of file
+    raise SystemExit(1)
+
+
+def metadata_layout_is_ready(checksum: str) -> bool:
+    """
+    Single, quiet status check. Returns True if the layout is marked READY,
+    False otherwise (including on network errors).
+    """
+    try:
+        r = API.get(f"/metadata-layout/{checksum}")
+        if r.status_code != 200:
+            return False
+        return r.json().get("status", "").lower() == "ready"
+    except requests.exceptions.RequestException:
+        return False
@@ -0,0 +1,96 @@
+# includes/review_watcher.py
+
+from __future__ import annotations
+
+import time
+import threading
+from typing import Callable, Dict, List
+
+from includes.layout_watcher import LayoutReadyWatcher
+
+
+class ReviewWatcher:
+    """
+    Keeps track of discs whose rip is finished but whose metadata layout
+    hasn't been reviewed yet ("parked"), so the station can take the next
+    disc instead of blocking on wait_for_metadata_layout_ready().
+
+    READY detection for all parked discs is shared through one
+    LayoutReadyWatcher. When a layout turns READY, the disc is removed from
+    the list and its on_ready() callback (encode, cover art, notify) runs
+    in its own thread.
+    """
+
+    def __init__(self, layouts: LayoutReadyWatcher):
+        self.layouts = layouts
+
+        self._parked: Dict[str, dict] = {}
+        self._running: List[threading.Thread] = []
+        self._lock = threading.Lock()
+
+    def park(self, checksum: str, label: str, on_ready: Callable[[], None]):
+        """
+        Park a disc until its layout is READY. Parking the same checksum
+        again replaces the callback.
+        """
+        with self._lock:
+            self._parked[checksum] = {"label": label, "on_ready": on_ready, "since": time.time()}
+        self.layouts.watch(checksum, lambda: self._ready(checksum))
+
+    def parked(self) -> List[str]:
+        """
+        Labels of the discs still waiting for review, oldest first.
+        """
+        with self._lock:
+            entries = sorted(self._parked.values(), key=lambda e: e["since"])
+            return [e["label"] for e in entries]
+
+    def pending(self) -> int:
+        """
+        Number of discs parked or still encoding after review.
+        """
+        with self._lock:
+            self._running = [t for t in self._running if t.is_alive()]
+            return len(self._parked) + len(self._running)
+
+    def wait(self, timeout: float = None) -> bool:
+        """
+        Block until every parked disc was reviewed and finished.
+        Returns False if the timeout ran out first.
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while self.pending():
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            # Short sleeps keep Ctrl+C responsive in the main thread
+            time.sleep(1)
+        return True
+
+    def _ready(self, checksum: str):
+        # One critical section from parked to running (and started, since
+        # pending() drops threads that aren't alive), so wait() never sees
+        # the disc in neither list
+        with self._lock:
+            entry = self._parked.pop(checksum, None)
+            if entry is None:
+                return
+
+            print(f"\n✅ {entry['label']}: metadata layout is READY – releasing encodes")
+            t = threading.Thread(
+                target=self._release,
+                args=(entry,),
+                name=f"review-{checksum[:8]}",
+                daemon=True,
+            )
+            self._running.append(t)
+            t.start()
+
+    @staticmethod
+    def _release(entry: dict):
+        try:
+            entry["on_ready"]()
+        except SystemExit as e:
+            if e.code:
+                print(f"\n❌ {entry['label']}: encode after review stopped")
+        except Exception as e:
+            print(f"\n❌ {entry['label']}: encode after review crashed: {e}")
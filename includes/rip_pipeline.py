@@ -0,0 +1,251 @@
+# includes/rip_pipeline.py
+
+from __future__ import annotations
+
+import os
+import re
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+
+# MakeMKV names ripped titles like "Movie_t03.mkv"
+_TITLE_FILE_RE = re.compile(r"_t(\d{2,3})\.mkv$")
+
+_STOP = object()
+
+
+def title_index_from_filename(filename: str) -> Optional[int]:
+    """
+    Extract the MakeMKV title index from a ripped file name.
+    Returns None for files that don't follow the *_tXX.mkv pattern.
+    """
+    m = _TITLE_FILE_RE.search(filename)
+    return int(m.group(1)) if m else None
+
+
+class TitleFileWatcher:
+    """
+    Watches a MakeMKV output directory and reports each title file once
+    MakeMKV has finished writing it.
+
+    MakeMKV writes titles one at a time, so a title is complete as soon as
+    the next *_tXX.mkv file shows up. The last title is reported by finish(),
+    which must be called after MakeMKV exited successfully.
+    """
+
+    def __init__(self, directory: str, on_complete: Callable[[str], None], poll_interval: float = 2.0):
+        self.directory = directory
+        self.on_complete = on_complete
+        self.poll_interval = poll_interval
+
+        self._seen: List[str] = []
+        self._emitted: Set[str] = set()
+        self._lock = threading.Lock()
+        # Held while titles are reported, so a poll() returns only after
+        # every title found so far has been handed to on_complete
+        self._emit_lock = threading.RLock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="title-watcher", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.poll_interval):
+            self.poll()
+
+    def poll(self):
+        """
+        Scan the directory and emit every title that has been superseded
+        by a newer file.
+        """
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return
+
+        with self._emit_lock:
+            with self._lock:
+                for name in sorted(names):
+                    if name.startswith("._") or title_index_from_filename(name) is None:
+                        continue
+                    if name not in self._seen:
+                        self._seen.append(name)
+
+                # Everything except the newest file is finished
+                ready = [n for n in self._seen[:-1] if n not in self._emitted]
+                self._emitted.update(ready)
+
+            for name in ready:
+                self.on_complete(os.path.join(self.directory, name))
+
+    def reset(self):
+        """
+        Forget files that haven't been reported yet (MakeMKV is restarting
+        and will write them again). Already reported titles stay reported.
+        """
+        with self._lock:
+            self._seen = [n for n in self._seen if n in self._emitted]
+
+    def finish(self):
+        """
+        Stop watching and report all remaining titles as complete.
+        """
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+        with self._emit_lock:
+            self.poll()
+            with self._lock:
+                remaining = [n for n in self._seen if n not in self._emitted]
+                self._emitted.update(remaining)
+
+            for name in remaining:
+                self.on_complete(os.path.join(self.directory, name))
+
+    def stop(self):
+        """
+        Stop watching without reporting anything else (rip aborted).
+        """
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+
+class TitlePipeline:
+    """
+    Runs ripped title files through a chain of stages, one thread per stage.
+
+    Each stage is a callable taking the raw MKV path. A stage returns True
+    to pass the title on to the next stage, or False to drop it. While a
+    slow stage (encoding) works on one title, earlier stages keep going on
+    titles MakeMKV finishes in the meantime.
+    """
+
+    def __init__(self, stages: List[Callable[[str], bool]]):
+        self._queues = [queue.Queue() for _ in stages]
+        self._threads: List[threading.Thread] = []
+        self._submitted: Set[str] = set()
+        self._lock = threading.Lock()
+        self._file_access = threading.Condition()
+        self._active: Dict[str, int] = {}   # path -> running reads
+        self._held: Set[str] = set()
+        self._held_all = False
+        self.completed: List[str] = []
+        self.failed: List[str] = []
+        self.cancelled = threading.Event()
+
+        for i, stage in enumerate(stages):
+            t = threading.Thread(
+                target=self._run_stage,
+                args=(i, stage),
+                name=f"pipeline-stage-{i}",
+                daemon=True,
+            )
+            self._threads.append(t)
+            t.start()
+
+    def _run_stage(self, i: int, stage: Callable[[str], bool]):
+        q = self._queues[i]
+        while True:
+            path = q.get()
+            try:
+                if path is _STOP:
+                    if i + 1 < len(self._queues):
+                        self._queues[i + 1].put(_STOP)
+                    return
+                if self.cancelled.is_set():
+                    continue
+
+                try:
+                    keep = stage(path)
+                except (Exception, SystemExit) as e:
+                    print(f"\n⚠️  Pipeline stage failed for {os.path.basename(path)}: {e}")
+                    with self._lock:
+                        self.failed.append(path)
+                    continue
+
+                if not keep:
+                    continue
+                if i + 1 < len(self._queues):
+                    self._queues[i + 1].put(path)
+                else:
+                    with self._lock:
+                        self.completed.append(path)
+            finally:
+                q.task_done()
+
+    @contextmanager
+    def reading(self, path: str):
+        """
+        Wrap the part of a stage that reads the raw MKV at path. Blocks
+        while that file is held (MakeMKV is rewriting it).
+        """
+        with self._file_access:
+            while self._held_all or path in self._held:
+                self._file_access.wait()
+            self._active[path] = self._active.get(path, 0) + 1
+        try:
+            yield
+        finally:
+            with self._file_access:
+                self._active[path] -= 1
+                if not self._active[path]:
+                    del self._active[path]
+                self._file_access.notify_all()
+
+    def hold(self, paths: Iterable[str] = None):
+        """
+        Wait for running reads of paths (None = every file) to finish and
+        keep new ones from starting until release(). Reads of other files
+        (e.g. an encode of a title that isn't ripped again) go on.
+        """
+        with self._file_access:
+            if paths is None:
+                self._held_all = True
+                while self._active:
+                    self._file_access.wait()
+                return
+
+            paths = set(paths)
+            self._held |= paths
+            while paths & set(self._active):
+                self._file_access.wait()
+
+    def release(self):
+        with self._file_access:
+            self._held_all = False
+            self._held.clear()
+            self._file_access.notify_all()
+
+    def submit(self, path: str):
+        """
+        Hand a finished title to the first stage. Duplicate paths are ignored.
+        """
+        with self._lock:
+            if path in self._submitted:
+                return
+            self._submitted.add(path)
+        self._queues[0].put(path)
+
+    def close(self):
+        """
+        Finish all queued work and stop the stage threads.
+        """
+        self._queues[0].put(_STOP)
+        for t in self._threads:
+            t.join()
+
+    def cancel(self):
+        """
+        Abort (the disc job failed): queued titles are dropped and the stage
+        threads exit once their current title is done. Stages that wait on
+        something else should give up when `cancelled` is set. Doesn't block.
+        """
+        self.cancelled.set()
+        self.release()
+        self._queues[0].put(_STOP)
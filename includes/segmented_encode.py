@@ -0,0 +1,183 @@
+# includes/segmented_encode.py
+
+from __future__ import annotations
+
+import os
+import json
+import glob
+import shutil
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+
+# Titles shorter than this are not worth splitting
+MIN_SEGMENTED_SECONDS = 20 * 60
+
+# Don't cut segments shorter than this (seek/GOP overhead dominates)
+MIN_SEGMENT_SECONDS = 5 * 60
+
+
+def _probe_duration_and_chapters(path: str):
+    """
+    Returns (duration_seconds, [chapter_start_seconds, ...]) via ffprobe.
+    """
+    try:
+        out = subprocess.check_output(
+            [
+                "ffprobe", "-v", "error",
+                "-show_entries", "format=duration",
+                "-show_chapters",
+                "-of", "json",
+                path
+            ],
+            text=True
+        )
+        data = json.loads(out)
+    except Exception:
+        return 0.0, []
+
+    duration = float(data.get("format", {}).get("duration") or 0.0)
+    chapters = []
+    for ch in data.get("chapters", []):
+        try:
+            start = float(ch.get("start_time"))
+        except (TypeError, ValueError):
+            continue
+        if start > 0:
+            chapters.append(start)
+    return duration, sorted(chapters)
+
+
+def plan_split_points(duration: float, chapters: List[float], segments: int) -> List[float]:
+    """
+    Pick split timestamps that divide the title into `segments` roughly
+    equal parts. Chapter starts close to an even split point are preferred
+    (clean scene change), otherwise the even point itself is used and
+    mkvmerge moves it to the next keyframe.
+    """
+    if segments < 2 or duration <= 0:
+        return []
+
+    segments = min(segments, int(duration // MIN_SEGMENT_SECONDS))
+    if segments < 2:
+        return []
+
+    step = duration / segments
+    tolerance = step / 4
+    points: List[float] = []
+
+    for k in range(1, segments):
+        target = k * step
+        best = None
+        for ch in chapters:
+            if abs(ch - target) <= tolerance and (best is None or abs(ch - target) < abs(best - target)):
+                best = ch
+        point = best if best is not None else target
+        if not points or point - points[-1] >= MIN_SEGMENT_SECONDS:
+            points.append(point)
+
+    return points
+
+
+def _fmt_ts(seconds: float) -> str:
+    h = int(seconds // 3600)
+    m = int((seconds % 3600) // 60)
+    s = seconds - h * 3600 - m * 60
+    return f"{h:02d}:{m:02d}:{s:06.3f}"
+
+
+def split_at(raw_path: str, points: List[float], work_dir: str) -> List[str]:
+    """
+    Losslessly split raw_path with mkvmerge (cuts land on the next keyframe).
+    Returns the segment paths in order.
+    """
+    pattern = os.path.join(work_dir, "segment.mkv")
+    cmd = [
+        "mkvmerge", "-q", "-o", pattern,
+        "--split", "timestamps:" + ",".join(_fmt_ts(p) for p in points),
+        raw_path
+    ]
+    print("\n>>>", " ".join(cmd))
+    subprocess.run(cmd, check=True)
+
+    # mkvmerge names the parts segment-001.mkv, segment-002.mkv, ...
+    return sorted(glob.glob(os.path.join(work_dir, "segment-*.mkv")))
+
+
+def _swap_io(handbrake_cmd: List[str], input_file: str, output_file: str) -> List[str]:
+    cmd = list(handbrake_cmd)
+    cmd[cmd.index("-i") + 1] = input_file
+    cmd[cmd.index("-o") + 1] = output_file
+    return cmd
+
+
+def _encode_segment(cmd: List[str]):
+    subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def concat_segments(segment_paths: List[str], output_file: str):
+    """
+    Append encoded segments into one MKV with mkvmerge (no re-encode).
+    Track order and properties come from the first segment.
+    """
+    cmd = ["mkvmerge", "-q", "-o", output_file]
+    for i, path in enumerate(segment_paths):
+        if i > 0:
+            cmd.append("+")
+        cmd.append(path)
+    print("\n>>>", " ".join(cmd))
+    subprocess.run(cmd, check=True)
+
+
+def segmented_transcode(input_file: str, output_file: str, handbrake_cmd: List[str],
+                        workers: int, work_dir: Optional[str] = None) -> bool:
+    """
+    Encode one title as `workers` segments in parallel, then join them.
+
+    handbrake_cmd is the complete monolithic HandBrakeCLI command; each
+    segment runs the same command (same preset and track selection) with
+    only -i/-o swapped, so the joined file has the same track layout that
+    apply_track_metadata() expects.
+
+    Returns False if the title is too short, has no usable split points,
+    mkvmerge is missing or any split/encode/join step fails; segments and
+    a partial output_file are removed and the caller should then encode
+    it in one piece.
+    """
+    if workers < 2 or not shutil.which("mkvmerge"):
+        return False
+
+    duration, chapters = _probe_duration_and_chapters(input_file)
+    if duration < MIN_SEGMENTED_SECONDS:
+        return False
+
+    points = plan_split_points(duration, chapters, workers)
+    if not points:
+        return False
+
+    work_dir = work_dir or f"{input_file}.segments"
+    os.makedirs(work_dir, exist_ok=True)
+
+    try:
+        print(f"   ✂️  Splitting into {len(points) + 1} segments ({workers} parallel encodes)")
+        segments = split_at(input_file, points, work_dir)
+        if len(segments) < 2:
+            return False
+
+        encoded = [os.path.join(work_dir, f"encoded-{i:03d}.mkv") for i in range(1, len(segments) + 1)]
+        cmds = [_swap_io(handbrake_cmd, seg, out) for seg, out in zip(segments, encoded)]
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            # list() re-raises the first failed segment
+            list(pool.map(_encode_segment, cmds))
+
+        concat_segments(encoded, output_file)
+        return True
+    except (subprocess.CalledProcessError, OSError) as e:
+        print(f"   ⚠️ Segmented encode failed ({e})")
+        if os.path.exists(output_file):
+            os.remove(output_file)
+        return False
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
@@ -0,0 +1,131 @@
+# includes/settings_cache.py
+
+from __future__ import annotations
+
+import os
+import json
+import time
+import hashlib
+import threading
+from typing import Callable, Optional
+
+
+class SettingsCache:
+    """
+    Run-scoped cache for the user settings endpoint.
+
+    fetch() returns the settings dict, or None if the request failed.
+    get() calls it at most once per `ttl` seconds; concurrent callers
+    (daemon jobs, pipeline threads) wait for the same request instead of
+    each sending their own.
+
+    With `path` set, the last good settings are also written to disk
+    (owner-only, they contain API keys). On a cold start the saved copy is
+    returned right away and refreshed in the background, so a slow API
+    doesn't hold up the disc. If a refresh fails, the last known settings
+    are used.
+
+    `owner` identifies whose settings these are (the user token); a saved
+    copy for a different owner is ignored.
+    """
+
+    def __init__(self, fetch: Callable[[], Optional[dict]], ttl: float = 300,
+                 path: str = None, owner: str = ""):
+        self.fetch = fetch
+        self.ttl = ttl
+        self.path = path
+        self._owner = hashlib.sha256((owner or "").encode()).hexdigest()[:16]
+
+        self._settings: Optional[dict] = None
+        self._fetched_at = 0.0
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self._disk_checked = False
+
+    def _fresh(self) -> bool:
+        return self._settings is not None and time.monotonic() - self._fetched_at < self.ttl
+
+    def get(self) -> dict:
+        if self._fresh():
+            return self._settings
+
+        with self._lock:
+            if self._fresh():
+                return self._settings
+
+            if self._settings is None and not self._disk_checked:
+                self._disk_checked = True
+                saved = self._load()
+                if saved is not None:
+                    # Use the last known settings now, refresh behind the scenes
+                    self._settings = saved
+                    self._fetched_at = time.monotonic()
+                    self._refresh_in_background()
+                    return saved
+
+            settings = self.fetch()
+            if settings is not None:
+                self._store(settings)
+            elif self._settings is not None:
+                # API unreachable: keep the last known settings for another TTL
+                self._fetched_at = time.monotonic()
+
+            return self._settings if self._settings is not None else {}
+
+    def invalidate(self):
+        """
+        Forget the cached settings; the next get() asks the API again.
+        """
+        with self._lock:
+            self._fetched_at = 0.0
+
+    def _store(self, settings: dict):
+        self._settings = settings
+        self._fetched_at = time.monotonic()
+        self._save(settings)
+
+    def _refresh_in_background(self):
+        if self._refreshing:
+            return
+        self._refreshing = True
+
+        def refresh():
+            try:
+                settings = self.fetch()
+                if settings is not None:
+                    with self._lock:
+                        self._store(settings)
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=refresh, name="settings-refresh", daemon=True).start()
+
+    # ------------------------------------------------------
+    # disk
+    # ------------------------------------------------------
+
+    def _load(self) -> Optional[dict]:
+        if not self.path:
+            return None
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(data, dict) or data.get("owner") != self._owner:
+            return None
+        settings = data.get("settings")
+        return settings if isinstance(settings, dict) else None
+
+    def _save(self, settings: dict):
+        if not self.path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp = f"{self.path}.tmp"
+            fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w") as f:
+                json.dump({"owner": self._owner, "saved_at": time.time(), "settings": settings}, f)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"⚠️  Could not save settings cache: {e}")
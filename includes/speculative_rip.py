@@ -0,0 +1,139 @@
+# includes/speculative_rip.py
+
+from __future__ import annotations
+
+import subprocess
+import threading
+from collections import deque
+from typing import Any, Callable, List, Optional
+
+
+# Same markers run_makemkv() treats as read errors
+_READ_ERRORS = ("medium error", "uncorrectable error", "scsi error")
+
+
+class SpeculativeRip:
+    """
+    Scan + rip a disc in the background while the operator is still
+    answering the identification / cover art prompts.
+
+    The thread first runs scan() (MakeMKV title scan; may return None if
+    no scan is needed), then every command rip_cmds(scan result) returns,
+    one after another. MakeMKV output is kept in a small
+    ring buffer instead of being printed, so it doesn't run through the
+    prompts.
+
+    Nothing here retries: on a read error or a non-zero exit the rip is
+    marked failed and the normal (interactive, retrying) rip takes over.
+    """
+
+    def __init__(self, scan: Callable[[], Any], rip_cmds: Callable[[Any], List[List[str]]],
+                 before: Callable[[], None] = None):
+        self.scan = scan
+        self.rip_cmds = rip_cmds
+        self.before = before
+
+        self.output = deque(maxlen=40)
+        self.error: Optional[str] = None
+
+        self._titles = None
+        self._scan_error: Optional[BaseException] = None
+        self._scanned = threading.Event()
+        self._done = threading.Event()
+        self._cancelled = threading.Event()
+        self._proc: Optional[subprocess.Popen] = None
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="speculative-rip", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        try:
+            if self.before:
+                self.before()
+            try:
+                self._titles = self.scan()
+            except BaseException as e:
+                self._scan_error = e
+            finally:
+                self._scanned.set()
+
+            if self._cancelled.is_set():
+                self.error = "cancelled"
+                return
+            for cmd in self.rip_cmds(self._titles):
+                self._rip(cmd)
+                if self.error:
+                    return
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            self._scanned.set()
+            self._done.set()
+
+    def _rip(self, cmd: List[str]):
+        with self._lock:
+            if self._cancelled.is_set():
+                self.error = "cancelled"
+                return
+            self._proc = subprocess.Popen(
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                errors="replace"
+            )
+
+        for line in self._proc.stdout:
+            self.output.append(line.rstrip("\n"))
+            if any(marker in line.lower() for marker in _READ_ERRORS):
+                self.error = "read error"
+                self._stop_process()
+                return
+
+        self._proc.wait()
+        if self._cancelled.is_set():
+            self.error = "cancelled"
+        elif self._proc.returncode != 0:
+            self.error = f"MakeMKV exited with code {self._proc.returncode}"
+
+    def _stop_process(self):
+        proc = self._proc
+        if proc is None or proc.poll() is not None:
+            return
+        proc.terminate()
+        try:
+            proc.wait(timeout=2)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+    def titles(self):
+        """
+        Result of scan(); waits for the scan if it is still running.
+        Re-raises whatever the scan raised.
+        """
+        self._scanned.wait()
+        if self._scan_error is not None:
+            raise self._scan_error
+        return self._titles
+
+    def running(self) -> bool:
+        return not self._done.is_set()
+
+    def wait(self) -> bool:
+        """
+        Block until the rip ended. True if MakeMKV finished without errors.
+        """
+        self._done.wait()
+        return self.error is None
+
+    def cancel(self):
+        """
+        Stop the rip (disc rejected / job aborted). Waits for MakeMKV to exit.
+        """
+        with self._lock:
+            self._cancelled.set()
+            self._stop_process()
+        self._done.wait()
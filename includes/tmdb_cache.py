@@ -0,0 +1,131 @@
+# includes/tmdb_cache.py
+
+from __future__ import annotations
+
+import os
+import re
+import json
+import time
+import sqlite3
+import threading
+from typing import Any, Callable, Dict
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    value TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    used_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_used ON responses (used_at);
+"""
+
+# Search results change as movies are added to TMDB; details and
+# IMDb -> TMDB mappings practically never do
+DEFAULT_TTLS = {
+    "search": 24 * 3600,
+    "find": 30 * 24 * 3600,
+    "movie": 30 * 24 * 3600,
+}
+
+
+def normalize_query(query: str) -> str:
+    return re.sub(r"\s+", " ", (query or "").strip().lower())
+
+
+class TmdbCache:
+    """
+    On-disk cache of TMDB proxy responses (search, find-by-IMDb, movie
+    details), keyed by kind + normalized query / IMDb ID / TMDB ID.
+
+    Entries expire after their kind's TTL. The table is kept at no more
+    than max_entries rows by dropping the least recently used ones.
+    Failed fetches (None) are not cached.
+    """
+
+    def __init__(self, db_path: str, max_entries: int = 5000, ttls: Dict[str, float] = None):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._conn().executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 connections can't be shared between threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def _count(self, kind: str, what: str):
+        with self._stats_lock:
+            stats = self._stats.setdefault(kind, {"hits": 0, "misses": 0, "evictions": 0})
+            stats[what] += 1
+
+    def get(self, kind: str, key: str, fetch: Callable[[], Any]) -> Any:
+        """
+        Cached value for (kind, key), or fetch() on a miss / expired entry.
+        """
+        if kind == "search":
+            key = normalize_query(key)
+        cache_key = f"{kind}:{key}"
+        now = time.time()
+        conn = self._conn()
+
+        row = conn.execute("SELECT value, fetched_at FROM responses WHERE key = ?", (cache_key,)).fetchone()
+        if row is not None and now - row["fetched_at"] < self.ttls.get(kind, 0):
+            conn.execute("UPDATE responses SET used_at = ? WHERE key = ?", (now, cache_key))
+            self._count(kind, "hits")
+            return json.loads(row["value"])
+
+        self._count(kind, "misses")
+        value = fetch()
+        if value is None:
+            return None
+
+        conn.execute(
+            "INSERT OR REPLACE INTO responses (key, kind, value, fetched_at, used_at) VALUES (?, ?, ?, ?, ?)",
+            (cache_key, kind, json.dumps(value), now, now),
+        )
+        self._evict()
+        return value
+
+    def _evict(self):
+        conn = self._conn()
+        excess = conn.execute("SELECT COUNT(*) AS n FROM responses").fetchone()["n"] - self.max_entries
+        if excess <= 0:
+            return
+        rows = conn.execute(
+            "SELECT key, kind FROM responses ORDER BY used_at LIMIT ?", (excess,)
+        ).fetchall()
+        conn.executemany("DELETE FROM responses WHERE key = ?", [(r["key"],) for r in rows])
+        for r in rows:
+            self._count(r["kind"], "evictions")
+
+    def clear(self):
+        self._conn().execute("DELETE FROM responses")
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self._stats_lock:
+            return {kind: dict(s) for kind, s in self._stats.items()}
+
+    def print_report(self):
+        stats = self.stats()
+        if not stats:
+            return
+
+        print("\n📊 TMDB cache")
+        print(f"   {'kind':<8}{'hits':>7}{'misses':>8}{'hit rate':>10}{'evicted':>9}")
+        for kind, s in sorted(stats.items()):
+            total = s["hits"] + s["misses"]
+            rate = s["hits"] / total * 100 if total else 0
+            print(f"   {kind:<8}{s['hits']:>7}{s['misses']:>8}{rate:>9.0f}%{s['evictions']:>9}")
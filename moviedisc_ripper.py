@@ -7,18 +7,43 @@ import time
 import hashlib
 import subprocess
 import shutil
-import urllib.parse
-import urllib.request
-import urllib.error
+import tempfile
 import requests
 import select
 import argparse
+import atexit
 import re
-from includes.makemkv_titles import scan_titles_with_makemkv
+import threading
+import socket
+from concurrent.futures import ThreadPoolExecutor
+from includes.makemkv_titles import (
+    scan_titles_with_makemkv,
+    makemkv_drive_index_for_volume,
+    track_selection,
+    write_selection_profile,
+)
+from includes.encode_queue import EncodeQueue
+from includes.job_server import JobServer
+from includes.segmented_encode import segmented_transcode
+from includes.disc_journal import DiscJournal, JOURNAL_FILENAME
+from includes.rip_pipeline import TitleFileWatcher, TitlePipeline, title_index_from_filename
+from includes.review_watcher import ReviewWatcher
+from includes.api_client import API
+from includes.settings_cache import SettingsCache
+from includes.metadata_items import MetadataItemsCache
+from includes.disc_db import DiscDB
+from includes.tmdb_cache import TmdbCache
+from includes.speculative_rip import SpeculativeRip
+from includes import audio_analysis, commentary_detector
+from includes.audio_analysis import analyze_audio_windows, sample_windows
+from includes.audio_cache import AudioAnalysisCache, file_identity
 from dotenv import load_dotenv
 from includes.metadata_layout import (
     ensure_metadata_layout,
     wait_for_metadata_layout_ready,
+    metadata_layout_is_ready,
+    metadata_layout_payload,
+    LAYOUT_WATCHER,
 )
 
 # ==========================================================
@@ -48,6 +73,79 @@ def parse_args():
         help="Check that all dependencies are installed and working"
     )
 
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Keep running and rip every inserted disc, one job per drive"
+    )
+
+    parser.add_argument(
+        "--queue",
+        action="store_true",
+        help="Queue encodes for --encode-worker instead of encoding in this process"
+    )
+
+    parser.add_argument(
+        "--encode-worker",
+        action="store_true",
+        help="Run queued encode jobs (resumes unfinished jobs on startup)"
+    )
+
+    parser.add_argument(
+        "--job-server",
+        action="store_true",
+        help="Serve the encode queue to remote workers over HTTP (combine with --daemon to rip too)"
+    )
+
+    parser.add_argument(
+        "--remote-worker",
+        metavar="URL",
+        help="Encode jobs leased from a job server, e.g. http://ripper.local:8766"
+    )
+
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of concurrent encodes for --encode-worker / --remote-worker (default: 1)"
+    )
+
+    parser.add_argument(
+        "--segments",
+        type=int,
+        help="Split long titles into N parts and encode them in parallel"
+    )
+
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="Analyze and encode each title as soon as MakeMKV has written it"
+    )
+
+    parser.add_argument(
+        "--speculative-rip",
+        action="store_true",
+        help="Start scanning and ripping as soon as the disc is fingerprinted, while the prompts run"
+    )
+
+    parser.add_argument(
+        "--selective-rip",
+        action="store_true",
+        help="Rip only the enabled titles and languages (reviewed layout) or titles of at least SELECTIVE_RIP_MIN_SECONDS"
+    )
+
+    parser.add_argument(
+        "--defer-review",
+        action="store_true",
+        help="Don't wait for the metadata review: park the disc and accept the next one"
+    )
+
+    parser.add_argument(
+        "--api-stats",
+        action="store_true",
+        help="Print per-endpoint API call counts, latency and bytes (and TMDB cache hits) at exit"
+    )
+
     return parser.parse_args()
 
 # ==========================================================
@@ -59,7 +157,7 @@ load_dotenv()
 # Optional: User token for linking rips to your Keepedia account
 USER_TOKEN = os.getenv("USER_TOKEN")
 
-DISCFINDER_API = os.getenv("DISCFINDER_API", "https://disc-api.bylund.cloud")
+# DISCFINDER_API is read by includes/api_client.py (shared API client)
 KEEPEDIA_WEB = os.getenv("KEEPEDIA_WEB", "https://keepedia.org")
 
 # ==========================================================
@@ -67,7 +165,11 @@ KEEPEDIA_WEB = os.getenv("KEEPEDIA_WEB", "https://keepedia.org")
 # ==========================================================
 
 MAKE_MKV_PATH = "/Applications/MakeMKV.app/Contents/MacOS/makemkvcon"
-HANDBRAKE_CLI_PATH = "/opt/homebrew/bin/HandBrakeCLI"
+HANDBRAKE_CLI_PATH = (
+    os.getenv("HANDBRAKE_PATH")
+    or shutil.which("HandBrakeCLI")
+    or "/opt/homebrew/bin/HandBrakeCLI"
+)
 
 TEMP_BASE_DIR = "/Volumes/Jonte/rip/tmp"
 PREVIEW_PORT = 8765
@@ -93,10 +195,144 @@ HANDBRAKE_AUDIO_PASSTHROUGH = [
 
 ASSET_KINDS = ("wrap", "poster", "banner")
 
-API_TIMEOUT = 15  # seconds for API requests
-
 MIN_MAIN_MOVIE_SECONDS = 45 * 60  # 45 minutes
 
+# --selective-rip: shortest title ripped while the layout isn't reviewed yet
+SELECTIVE_RIP_MIN_SECONDS = int(os.getenv("SELECTIVE_RIP_MIN_SECONDS", str(MIN_MAIN_MOVIE_SECONDS)))
+
+# Per-disc subdirectory for MakeMKV track selection profiles (removed after the rip)
+RIP_PROFILE_DIR = "rip_profiles"
+
+# Daemon mode: how many HandBrake encodes may run at once across all drives
+ENCODE_CONCURRENCY = int(os.getenv("ENCODE_CONCURRENCY", "1"))
+DAEMON_POLL_SECONDS = 5
+
+ENCODE_SLOTS = threading.BoundedSemaphore(ENCODE_CONCURRENCY)
+
+# Audio analysis: titles analyzed at once (each runs its own ffmpeg)
+AUDIO_ANALYSIS_WORKERS = max(1, int(os.getenv("AUDIO_ANALYSIS_WORKERS", "2")))
+
+# Commentary detector: "volumedetect" (default) or "pcm" (experimental, needs numpy)
+COMMENTARY_DETECTOR = os.getenv("COMMENTARY_DETECTOR", "volumedetect").strip().lower()
+
+# Segmented encode: split long titles and encode the parts in parallel (1 = off)
+SEGMENT_WORKERS = int(os.getenv("SEGMENT_WORKERS", "1"))
+
+# Persistent encode queue (--queue / --encode-worker)
+ENCODE_QUEUE_DB = os.path.join(TEMP_BASE_DIR, "encode_queue.sqlite3")
+WORKER_POLL_SECONDS = 10
+
+# Distributed encoding (--job-server / --remote-worker)
+JOB_SERVER_PORT = int(os.getenv("JOB_SERVER_PORT", "8766"))
+JOB_SERVER_TOKEN = os.getenv("JOB_SERVER_TOKEN")
+JOB_LEASE_SECONDS = 120
+WORKER_WORK_DIR = os.getenv("WORKER_WORK_DIR", os.path.join(tempfile.gettempdir(), "moviedisc-worker"))
+
+# Deferred review (--defer-review): parked discs are encoded once their layout is READY
+REVIEW_WATCHER = ReviewWatcher(LAYOUT_WATCHER)
+
+# User settings cache (optionally persisted for cold starts with a slow API)
+SETTINGS_TTL_SECONDS = int(os.getenv("SETTINGS_TTL_SECONDS", "300"))
+SETTINGS_CACHE_FILE = os.getenv("SETTINGS_CACHE_FILE")
+
+# Metadata items: bulk POST chunk size, concurrency of single POST/DELETE fallbacks
+METADATA_BULK_CHUNK = 50
+METADATA_WRITE_CONCURRENCY = int(os.getenv("METADATA_WRITE_CONCURRENCY", "8"))
+METADATA_BULK_ROUTE = True         # cleared when the server lacks /items/bulk
+METADATA_BULK_DELETE_ROUTE = True  # cleared when the server lacks /items/bulk-delete
+
+# Local disc DB: known discs are identified without the API; offline writes queue here
+# (opened on first use, see disc_db())
+DISC_DB_REFRESH_SECONDS = 7 * 24 * 3600  # re-check known discs in the background after this
+
+# TMDB search / find / details responses, LRU-bounded on disk (see tmdb_cache())
+TMDB_CACHE_MAX_ENTRIES = int(os.getenv("TMDB_CACHE_MAX_ENTRIES", "5000"))
+
+# Signatures of item lists already cleaned of angle duplicates (discs in progress)
+ANGLE_CLEANUP_FILE = os.path.join(TEMP_BASE_DIR, "angle_cleanup.json")
+ANGLE_CLEANUP_LOCK = threading.Lock()
+
+# Only one disc job at a time may prompt the operator
+CONSOLE_LOCK = threading.RLock()
+
+# --speculative-rip: background rips by disc spec, cancelled if the job aborts
+SPECULATIVE_RIPS = {}
+
+# ==========================================================
+# LOCAL STORES (opened on first use, not at import)
+# ==========================================================
+
+_STORES = {}
+_STORES_LOCK = threading.Lock()
+
+
+def ensure_temp_base_dir():
+    """
+    Create TEMP_BASE_DIR if needed. Exits instead if it lives on a volume
+    that isn't mounted - creating /Volumes/<disk>/... then would leave a
+    directory the real disk mounts beside ("<disk> 1") - or if it can't
+    be written.
+    """
+    if os.path.isdir(TEMP_BASE_DIR) and os.access(TEMP_BASE_DIR, os.W_OK):
+        return
+
+    parts = os.path.abspath(TEMP_BASE_DIR).split(os.sep)
+    if len(parts) > 2 and parts[1] == "Volumes":
+        volume = os.sep.join(parts[:3])
+        if not os.path.ismount(volume):
+            print(f"❌ {volume} is not mounted (temp directory {TEMP_BASE_DIR})")
+            sys.exit(1)
+
+    try:
+        os.makedirs(TEMP_BASE_DIR, exist_ok=True)
+    except OSError as e:
+        print(f"❌ Could not create temp directory {TEMP_BASE_DIR}: {e}")
+        sys.exit(1)
+    if not os.access(TEMP_BASE_DIR, os.W_OK):
+        print(f"❌ Temp directory {TEMP_BASE_DIR} is not writable")
+        sys.exit(1)
+
+
+def _store_path(env_name: str, filename: str) -> str:
+    # Explicit paths are used as given; the default lives in the checked temp dir
+    path = os.getenv(env_name)
+    if path:
+        return path
+    ensure_temp_base_dir()
+    return os.path.join(TEMP_BASE_DIR, filename)
+
+
+def _store(name: str, create):
+    with _STORES_LOCK:
+        if name not in _STORES:
+            _STORES[name] = create()
+        return _STORES[name]
+
+
+def disc_db() -> DiscDB:
+    return _store("disc_db", lambda: DiscDB(_store_path("DISC_DB_PATH", "discs.sqlite3")))
+
+
+def tmdb_cache() -> TmdbCache:
+    return _store("tmdb_cache", lambda: TmdbCache(
+        _store_path("TMDB_CACHE_PATH", "tmdb_cache.sqlite3"), max_entries=TMDB_CACHE_MAX_ENTRIES
+    ))
+
+
+def audio_cache() -> AudioAnalysisCache:
+    # Results per temp file + stream, dropped when the disc's temp dir is cleaned
+    def create():
+        ensure_temp_base_dir()
+        return AudioAnalysisCache(os.path.join(TEMP_BASE_DIR, "audio_analysis.sqlite3"))
+    return _store("audio_cache", create)
+
+
+def print_tmdb_cache_report():
+    # Nothing to report (and nothing to open) if TMDB was never asked
+    if "tmdb_cache" in _STORES:
+        _STORES["tmdb_cache"].print_report()
+
+
 def get_duration_seconds(path: str) -> float:
     """
     Uses ffprobe to return duration in seconds for an MKV.
@@ -121,66 +357,6 @@ def get_duration_seconds(path: str) -> float:
 # AUDIO ANALYSIS (Commentary Detection)
 # ==========================================================
 
-def analyze_audio_track(mkv_path: str, track_index: int, sample_duration: int = 120, skip_seconds: int = 600) -> dict:
-    """
-    Analyze an audio track using ffmpeg volumedetect.
-
-    Returns dict with:
-        - mean_volume: average volume in dB
-        - max_volume: peak volume in dB
-        - dynamic_range: difference between max and mean
-        - is_likely_commentary: True if dynamic range suggests commentary
-    """
-    try:
-        cmd = [
-            "ffmpeg",
-            "-ss", str(skip_seconds),  # Skip intro/credits
-            "-i", mkv_path,
-            "-map", f"0:{track_index}",
-            "-t", str(sample_duration),
-            "-af", "volumedetect",
-            "-f", "null",
-            "-"
-        ]
-
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=60
-        )
-
-        # Parse output
-        output = result.stderr
-        mean_match = re.search(r"mean_volume:\s*(-?[\d.]+)\s*dB", output)
-        max_match = re.search(r"max_volume:\s*(-?[\d.]+)\s*dB", output)
-
-        if not mean_match or not max_match:
-            return None
-
-        mean_volume = float(mean_match.group(1))
-        max_volume = float(max_match.group(1))
-        dynamic_range = max_volume - mean_volume
-
-        # Commentary typically has dynamic range < 20 dB
-        # Movie audio typically has dynamic range > 25 dB
-        is_likely_commentary = dynamic_range < 20
-
-        return {
-            "mean_volume": mean_volume,
-            "max_volume": max_volume,
-            "dynamic_range": round(dynamic_range, 1),
-            "is_likely_commentary": is_likely_commentary
-        }
-
-    except subprocess.TimeoutExpired:
-        print(f"   ⚠️ Audio analysis timed out for track {track_index}")
-        return None
-    except Exception as e:
-        print(f"   ⚠️ Audio analysis failed for track {track_index}: {e}")
-        return None
-
-
 def get_audio_track_score(track: dict) -> int:
     """
     Score an audio track for quality comparison.
@@ -213,7 +389,7 @@ def get_audio_track_score(track: dict) -> int:
     return score
 
 
-def apply_audio_track_preferences(audio_tracks: list, settings: dict) -> list:
+def apply_audio_track_preferences(audio_tracks: list, settings: dict, log=print) -> list:
     """
     Apply user preferences to select which audio tracks should be enabled.
 
@@ -247,7 +423,7 @@ def apply_audio_track_preferences(audio_tracks: list, settings: dict) -> list:
             main_tracks_sorted = sorted(main_tracks, key=get_audio_track_score, reverse=True)
             best_track = main_tracks_sorted[0]
             best_track["enabled"] = True
-            print(f"   🎧 Selected best audio: {best_track.get('channel_format', 'Unknown')} {best_track.get('codec_name', '')}")
+            log(f"   🎧 Selected best audio: {best_track.get('channel_format', 'Unknown')} {best_track.get('codec_name', '')}")
         elif audio_quality == "lossless":
             # Enable only lossless tracks
             for track in main_tracks:
@@ -269,16 +445,58 @@ def apply_audio_track_preferences(audio_tracks: list, settings: dict) -> list:
     return audio_tracks
 
 
-def analyze_audio_tracks_for_title(mkv_path: str, audio_tracks: list) -> list:
+def analyze_audio_tracks_for_title(mkv_path: str, audio_tracks: list, log=print,
+                                   duration_seconds: float = None) -> list:
     """
     Analyze all audio tracks in an MKV file and update is_commentary flag.
+    Samples several short windows spread over the title's duration
+    (ffprobed if not given) and stops early once the verdict is clear.
 
     Returns updated audio_tracks list with analysis results.
+    Progress goes to log() (print by default).
     """
     if not audio_tracks:
         return audio_tracks
 
-    print(f"\n🔊 Analyzing audio tracks for commentary detection...")
+    log(f"\n🔊 Analyzing audio tracks for commentary detection...")
+
+    # One ffmpeg pass per window for all tracks of the title: volumedetect's
+    # dynamic range, or PCM features with COMMENTARY_DETECTOR=pcm
+    stream_indexes = [t["stream_index"] for t in audio_tracks if t.get("stream_index") is not None]
+    use_pcm = COMMENTARY_DETECTOR == "pcm" and commentary_detector.available()
+    version = commentary_detector.ANALYZER_VERSION if use_pcm else audio_analysis.ANALYZER_VERSION
+
+    # Unchanged file + stream + analyzer: reuse the earlier result
+    try:
+        identity = file_identity(mkv_path)
+    except OSError:
+        identity = None
+    analyses = {}
+    if identity:
+        for index in stream_indexes:
+            cached = audio_cache().get(identity, index, version)
+            if cached:
+                analyses[index] = cached
+        if analyses:
+            log(f"   ♻️  {len(analyses)} track(s) unchanged since the last analysis")
+
+    todo = [i for i in stream_indexes if i not in analyses]
+    if todo:
+        windows = sample_windows(duration_seconds or get_duration_seconds(mkv_path))
+        timeout = 60 + 15 * len(todo)
+        if use_pcm:
+            fresh = commentary_detector.detect_commentary(
+                mkv_path, todo, timeout=timeout, log=log, windows=windows
+            )
+        else:
+            fresh = analyze_audio_windows(mkv_path, todo, windows, timeout=timeout, log=log)
+
+        for index, result in fresh.items():
+            if result is None:
+                continue
+            analyses[index] = result
+            if identity:
+                audio_cache().put(identity, index, version, os.path.dirname(mkv_path), result)
 
     updated_tracks = []
     for track in audio_tracks:
@@ -287,7 +505,7 @@ def analyze_audio_tracks_for_title(mkv_path: str, audio_tracks: list) -> list:
             updated_tracks.append(track)
             continue
 
-        analysis = analyze_audio_track(mkv_path, stream_index)
+        analysis = analyses.get(stream_index)
 
         if analysis:
             # Update the track with analysis results
@@ -295,11 +513,14 @@ def analyze_audio_tracks_for_title(mkv_path: str, audio_tracks: list) -> list:
             track_copy["dynamic_range"] = analysis["dynamic_range"]
 
             # Only flag as commentary if not already detected and analysis suggests it
+            detail = f"dynamic range: {analysis['dynamic_range']} dB"
+            if "score" in analysis:
+                detail = f"score {analysis['score']:.2f}, {detail}"
             if not track_copy.get("is_commentary") and analysis["is_likely_commentary"]:
                 track_copy["is_commentary"] = True
-                print(f"   🎤 Track {stream_index}: Likely COMMENTARY (dynamic range: {analysis['dynamic_range']} dB)")
+                log(f"   🎤 Track {stream_index}: Likely COMMENTARY ({detail})")
             else:
-                print(f"   🎵 Track {stream_index}: Main audio (dynamic range: {analysis['dynamic_range']} dB)")
+                log(f"   🎵 Track {stream_index}: Main audio ({detail})")
 
             updated_tracks.append(track_copy)
         else:
@@ -322,7 +543,7 @@ def analyze_and_update_metadata(checksum: str, temp_dir: str):
 
     # Check if metadata layout is already marked READY - skip analysis to preserve user changes
     try:
-        r = requests.get(f"{DISCFINDER_API}/metadata-layout/{checksum}", timeout=10)
+        r = API.get(f"/metadata-layout/{checksum}")
         if r.status_code == 200:
             layout = r.json()
             status = layout.get("status", "").lower()
@@ -340,59 +561,67 @@ def analyze_and_update_metadata(checksum: str, temp_dir: str):
 
     # Get current metadata items from API
     try:
-        r = requests.get(
-            f"{DISCFINDER_API}/metadata-layout/{checksum}/items",
-            timeout=(5, 30)
-        )
-        if r.status_code != 200:
+        items = fetch_metadata_items(checksum)
+        if items is None:
             print("⚠️ Could not fetch metadata items for analysis")
             return
-
-        items = r.json()
     except Exception as e:
         print(f"⚠️ Failed to fetch metadata items: {e}")
         return
 
-    # Analyze each item's MKV file
-    for item in items:
-        title_index = item.get("title_index")
-        source_file = item.get("source_file")
-        audio_tracks = item.get("audio_tracks", [])
+    # Titles are analyzed in parallel (each PATCHed as soon as it's done);
+    # output is buffered per title and printed in item order
+    def analyze(item):
+        lines = []
+        analyze_metadata_item(item, temp_dir, settings, log=lines.append)
+        return lines
 
-        if not audio_tracks:
-            continue
+    with ThreadPoolExecutor(max_workers=AUDIO_ANALYSIS_WORKERS, thread_name_prefix="analysis") as pool:
+        futures = [pool.submit(analyze, item) for item in items]
+        for future in futures:
+            for line in future.result():
+                print(line)
+
+    print("\n" + "=" * 50)
 
-        # Find the MKV file
-        pattern = f"_t{title_index:02d}.mkv"
-        matches = [f for f in os.listdir(temp_dir) if f.endswith(pattern)]
 
-        if not matches:
-            continue
+def analyze_metadata_item(item: dict, temp_dir: str, settings: dict, log=print):
+    """
+    Analyze the ripped MKV for a single metadata item and PATCH the results.
+    Does nothing if the item has no audio tracks or its file isn't ripped yet.
+    Output goes to log() (print by default).
+    """
+    audio_tracks = item.get("audio_tracks", [])
+    if not audio_tracks:
+        return
 
-        mkv_path = os.path.join(temp_dir, matches[0])
-        print(f"\n📀 Analyzing: {matches[0]}")
+    mkv_path = find_raw_title_file(temp_dir, item.get("title_index"))
+    if not mkv_path:
+        return
 
-        # Analyze audio tracks for commentary detection
-        updated_tracks = analyze_audio_tracks_for_title(mkv_path, audio_tracks)
+    log(f"\n📀 Analyzing: {os.path.basename(mkv_path)}")
 
-        # Apply user preferences for track selection
-        updated_tracks = apply_audio_track_preferences(updated_tracks, settings)
+    # Analyze audio tracks for commentary detection
+    updated_tracks = analyze_audio_tracks_for_title(mkv_path, audio_tracks, log, item.get("duration_seconds"))
 
-        # Update API with analysis results
-        try:
-            r = requests.patch(
-                f"{DISCFINDER_API}/metadata-layout/items/{item['id']}",
-                json={"audio_tracks": updated_tracks},
-                timeout=10
-            )
-            if r.status_code == 200:
-                print(f"   ✅ Updated metadata with analysis results")
-            else:
-                print(f"   ⚠️ Failed to update metadata: {r.status_code}")
-        except Exception as e:
-            print(f"   ⚠️ Failed to update metadata: {e}")
+    # Apply user preferences for track selection
+    updated_tracks = apply_audio_track_preferences(updated_tracks, settings, log)
 
-    print("\n" + "=" * 50)
+    # Update API with analysis results
+    try:
+        r = API.patch(
+            f"/metadata-layout/items/{item['id']}",
+            json={"audio_tracks": updated_tracks}
+        )
+        if r.status_code == 200:
+            log(f"   ✅ Updated metadata with analysis results")
+        else:
+            log(f"   ⚠️ Failed to update metadata: {r.status_code}")
+    except requests.exceptions.ConnectionError:
+        disc_db().queue_write("PATCH", f"/metadata-layout/items/{item['id']}", {"audio_tracks": updated_tracks})
+        log("   📥 API unreachable – analysis results queued for sync")
+    except Exception as e:
+        log(f"   ⚠️ Failed to update metadata: {e}")
 
 
 # ==========================================================
@@ -453,28 +682,29 @@ def ensure_preview_server(temp_dir: str = None):
     time.sleep(0.5)
 
 
-def legacy_checksum_exists(legacy_checksum: str) -> bool:
-    # 1️⃣ Finns i DiscFinder API / DB?
+def legacy_disc_lookup(legacy_checksum: str):
+    """
+    Looks up the legacy (volume-name based) checksum.
+    Returns the API disc dict, or None if unknown / API unreachable.
+    """
+    if disc_db().is_known_legacy(legacy_checksum):
+        return None  # Already stored under its fingerprint checksum
+
     try:
-        r = requests.get(
-            f"{DISCFINDER_API}/lookup",
-            params={"checksum": legacy_checksum},
-            timeout=3
-        )
+        r = API.get("/lookup", params={"checksum": legacy_checksum})
         if r.status_code == 200:
-            return True
+            return r.json()
     except Exception:
         pass
 
- 
-    return False
+    return None
 
 def run(cmd):
     print("\n>>>", " ".join(cmd))
     subprocess.run(cmd, check=True)
     
 
-def run_makemkv(cmd, volume_name: str = None, max_retries: int = 3):
+def run_makemkv(cmd, volume_name: str = None, max_retries: int = 3, on_retry=None):
     """
     Runs MakeMKV with retry logic for transient read errors.
 
@@ -484,6 +714,10 @@ def run_makemkv(cmd, volume_name: str = None, max_retries: int = 3):
     2. Eject the disc to reset the drive
     3. Wait for user to re-insert
     4. Retry up to max_retries times
+
+    on_retry (optional) is called right before MakeMKV is started again,
+    so a pipelined encoder can get out of the way of files being rewritten.
+    If it returns a command, that one is run instead of cmd.
     """
     attempt = 0
 
@@ -491,6 +725,8 @@ def run_makemkv(cmd, volume_name: str = None, max_retries: int = 3):
         attempt += 1
         if attempt > 1:
             print(f"\n🔄 Retry attempt {attempt}/{max_retries}")
+            if on_retry:
+                cmd = on_retry() or cmd
 
         print("\n>>>", " ".join(cmd))
 
@@ -596,6 +832,23 @@ def sanitize_filename(name: str) -> str:
         name = name.replace(b, '')
     return name.strip()
 
+def find_raw_title_file(temp_dir: str, title_index: int):
+    """
+    Returns the path of the ripped MKV for title_index (MakeMKV names
+    files *_tXX.mkv), or None if it doesn't exist.
+    """
+    if title_index is None:
+        return None
+    pattern = f"_t{title_index:02d}.mkv"
+    try:
+        matches = [
+            f for f in os.listdir(temp_dir)
+            if f.endswith(pattern) and not f.startswith("._")
+        ]
+    except FileNotFoundError:
+        return None
+    return os.path.join(temp_dir, matches[0]) if matches else None
+
 def wait_space_enter(seconds: int) -> bool:
     """
     Returns True if user pressed SPACE+ENTER (any line) within timeout.
@@ -719,7 +972,7 @@ def check_dependencies():
 
     # 6. API connection
     try:
-        r = requests.get(f"{DISCFINDER_API}/health", timeout=5)
+        r = API.get("/health")
         if r.status_code == 200:
             print("✅ API connection OK")
         else:
@@ -732,7 +985,7 @@ def check_dependencies():
     if USER_TOKEN:
         try:
             headers = {"Authorization": f"Bearer {USER_TOKEN}"}
-            r = requests.get(f"{DISCFINDER_API}/users/me", headers=headers, timeout=5)
+            r = API.get("/users/me", headers=headers)
             if r.status_code == 200:
                 user = r.json()
                 print(f"✅ Logged in as: {user.get('email', 'Unknown')}")
@@ -745,7 +998,7 @@ def check_dependencies():
 
     # 8. TMDB API (via disc-api - server-side key)
     try:
-        r = requests.get(f"{DISCFINDER_API}/search/movie?query=test", timeout=5)
+        r = API.get("/search/movie?query=test")
         if r.status_code == 200:
             print("✅ TMDB API available (server-side)")
         else:
@@ -823,8 +1076,12 @@ def ensure_mount_or_die():
 # DISC DETECTION
 # ==========================================================
 
-def detect_disc():
-    for name in os.listdir("/Volumes"):
+def detect_discs():
+    """
+    Returns [(volume_name, disc_type), ...] for every mounted DVD/Blu-ray.
+    """
+    discs = []
+    for name in sorted(os.listdir("/Volumes")):
         path = os.path.join("/Volumes", name)
         if not os.path.ismount(path):
             continue
@@ -835,11 +1092,15 @@ def detect_disc():
             continue
 
         if "BDMV" in contents:
-            return name, "BLURAY"
-        if "VIDEO_TS" in contents:
-            return name, "DVD"
+            discs.append((name, "BLURAY"))
+        elif "VIDEO_TS" in contents:
+            discs.append((name, "DVD"))
+
+    return discs
 
-    return None, None
+def detect_disc():
+    discs = detect_discs()
+    return discs[0] if discs else (None, None)
 
 def normalize_title(volume):
     title = volume.replace("_", " ").replace("-", " ").title()
@@ -851,33 +1112,12 @@ def normalize_title(volume):
 # TMDB (via disc-api proxy)
 # ==========================================================
 
-def _api_get(endpoint: str):
-    """
-    Call disc-api endpoint. Returns parsed JSON on success, None on failure.
-    Never raises (so script doesn't crash if API is down).
-    """
-    try:
-        url = f"{DISCFINDER_API}{endpoint}"
-        req = urllib.request.Request(
-            url,
-            headers={"User-Agent": "Keepedia-Ripper/2.0"}
-        )
-        with urllib.request.urlopen(req, timeout=API_TIMEOUT) as r:
-            return json.loads(r.read().decode())
-    except urllib.error.HTTPError as e:
-        print(f"⚠️  API error: HTTP {e.code} ({e.reason})")
-        return None
-    except urllib.error.URLError as e:
-        print(f"⚠️  API network error: {e.reason}")
-        return None
-    except Exception as e:
-        print(f"⚠️  API error: {e}")
-        return None
-
 def tmdb_search(query):
     """Search for movies via TMDB. Returns list of results."""
-    q = urllib.parse.quote(query)
-    data = _api_get(f"/search/movie?query={q}")
+    data = tmdb_cache().get(
+        "search", query,
+        lambda: API.get_json("/search/movie", params={"query": query}),
+    )
     if not data:
         return None
     return data.get("results", [])
@@ -886,7 +1126,7 @@ def tmdb_find_by_imdb(imdb_id):
     """Find movie by IMDb ID via TMDB. Returns movie dict or None."""
     if not imdb_id:
         return None
-    data = _api_get(f"/tmdb/find/{imdb_id}")
+    data = tmdb_cache().get("find", imdb_id, lambda: API.get_json(f"/tmdb/find/{imdb_id}"))
     if not data:
         return None
     movies = data.get("movie_results", [])
@@ -907,7 +1147,7 @@ def tmdb_get_movie(tmdb_id):
     """Get full movie details from TMDB, including IMDb ID."""
     if not tmdb_id:
         return None
-    data = _api_get(f"/tmdb/movie/{tmdb_id}")
+    data = tmdb_cache().get("movie", str(tmdb_id), lambda: API.get_json(f"/tmdb/movie/{tmdb_id}"))
     if not data:
         return None
     return {
@@ -1075,26 +1315,170 @@ def unresolved_menu():
 # DISC FINDER API
 # ==========================================================
 
+# Revalidated per checksum (ETag), dropped by our own writes
+METADATA_ITEMS = MetadataItemsCache(API)
+
+
+def fetch_metadata_items(checksum: str):
+    """
+    METADATA_ITEMS.get() with a local copy in disc_db() for when the API
+    can't be reached. Returns the list, or None on an API error status.
+    """
+    try:
+        items = METADATA_ITEMS.get(checksum)
+    except requests.exceptions.ConnectionError:
+        items = disc_db().items(checksum)
+        if items is None:
+            raise
+        print("📴 API unreachable – using last known metadata items")
+        return items
+
+    if items is not None:
+        disc_db().remember_items(checksum, items)
+    return items
+
+
+def sync_disc_db():
+    """
+    Send writes queued in disc_db() while the API was unreachable.
+    """
+    if not disc_db().pending_writes():
+        return
+    sent = disc_db().sync(API, USER_TOKEN)
+    if sent:
+        print(f"\n📤 Synced {sent} queued Disc Finder write(s)")
+
 def metadata_items_exist(checksum: str) -> bool:
     """
     Returns True if metadata layout already has items for this checksum.
     Used to avoid reposting MakeMKV titles when layout already exists.
     """
     try:
-        r = requests.get(
-            f"{DISCFINDER_API}/metadata-layout/{checksum}/items",
-            timeout=10
-        )
-        if r.status_code != 200:
-            return False
-
-        items = r.json()
-        return isinstance(items, list) and len(items) > 0
+        return bool(fetch_metadata_items(checksum))
 
     except Exception:
         return False
 
 
+def find_angle_duplicates(items: list[dict]) -> list[dict]:
+    """
+    DVDs with multiple angles have titles with identical durations.
+    Returns every item after the lowest title_index per duration (items
+    may come back from the API in any order, e.g. after parallel POSTs).
+    """
+    seen_durations: set[int] = set()
+    duplicates: list[dict] = []
+
+    ordered = sorted(items, key=lambda i: (i.get("title_index") is None, i.get("title_index") or 0))
+    for item in ordered:
+        duration = item.get("duration_seconds")
+        if duration is None:
+            continue
+
+        if duration in seen_durations:
+            # This is a duplicate (likely an angle)
+            duplicates.append(item)
+        else:
+            seen_durations.add(duration)
+
+    return duplicates
+
+
+def _items_signature(items: list[dict]) -> str:
+    pairs = sorted((str(i.get("id")), i.get("duration_seconds") or 0) for i in items)
+    return hashlib.sha256(json.dumps(pairs).encode()).hexdigest()
+
+
+def _load_angle_cleanup_state() -> dict:
+    try:
+        with open(ANGLE_CLEANUP_FILE, "r") as f:
+            state = json.load(f)
+        return state if isinstance(state, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_angle_cleanup_state(state: dict):
+    try:
+        if not state:
+            if os.path.exists(ANGLE_CLEANUP_FILE):
+                os.remove(ANGLE_CLEANUP_FILE)
+            return
+        os.makedirs(os.path.dirname(ANGLE_CLEANUP_FILE), exist_ok=True)
+        tmp = f"{ANGLE_CLEANUP_FILE}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp, ANGLE_CLEANUP_FILE)
+    except OSError:
+        pass  # Only costs a recomputation next time
+
+
+def _remember_clean_items(checksum: str, items: list[dict]):
+    """
+    Store the signature of a duplicate-free item list, so the next run
+    for the same (unfinished) disc can tell nothing changed without
+    grouping or deleting anything.
+    """
+    with ANGLE_CLEANUP_LOCK:
+        state = _load_angle_cleanup_state()
+        state[checksum] = _items_signature(items)
+        _save_angle_cleanup_state(state)
+
+
+def forget_clean_items(checksum: str):
+    """
+    Drop a finished disc's signature: the file only holds discs in progress.
+    """
+    with ANGLE_CLEANUP_LOCK:
+        state = _load_angle_cleanup_state()
+        if state.pop(checksum, None) is not None:
+            _save_angle_cleanup_state(state)
+
+
+def delete_metadata_items(checksum: str, items: list[dict]) -> set:
+    """
+    Delete metadata items with one bulk request, or METADATA_WRITE_CONCURRENCY
+    single DELETEs at a time if the server has no bulk route.
+    Returns the ids that were removed.
+    """
+    global METADATA_BULK_DELETE_ROUTE
+
+    ids = [item.get("id") for item in items]
+
+    if METADATA_BULK_DELETE_ROUTE:
+        try:
+            r = API.post(f"/metadata-layout/{checksum}/items/bulk-delete", json={"ids": ids})
+            if r.status_code in (200, 204):
+                return set(ids)
+            if r.status_code in (404, 405):
+                # Older server: remember for the rest of the run
+                METADATA_BULK_DELETE_ROUTE = False
+            else:
+                print(f"   ⚠️ Bulk delete returned HTTP {r.status_code} – deleting one by one")
+        except requests.exceptions.RequestException as e:
+            print(f"   ⚠️ Bulk delete failed: {e} – deleting one by one")
+
+    def delete_one(item_id):
+        try:
+            r = API.delete(f"/metadata-layout/{checksum}/items/{item_id}")
+            if r.status_code in (200, 204):
+                return None
+            return f"HTTP {r.status_code}"
+        except Exception as e:
+            return str(e)
+
+    with ThreadPoolExecutor(max_workers=METADATA_WRITE_CONCURRENCY) as pool:
+        errors = list(pool.map(delete_one, ids))
+
+    removed = set()
+    for item_id, error in zip(ids, errors):
+        if error:
+            print(f"   ✗ Failed to remove item {item_id}: {error}")
+        else:
+            removed.add(item_id)
+    return removed
+
+
 def cleanup_angle_duplicates(checksum: str) -> int:
     """
     Remove angle duplicate metadata items.
@@ -1106,74 +1490,55 @@ def cleanup_angle_duplicates(checksum: str) -> int:
     Returns number of duplicates removed.
     """
     try:
-        r = requests.get(
-            f"{DISCFINDER_API}/metadata-layout/{checksum}/items",
-            timeout=10
-        )
-        if r.status_code != 200:
+        items = fetch_metadata_items(checksum)
+        if not items or len(items) <= 1:
             return 0
 
-        items = r.json()
-        if not isinstance(items, list) or len(items) <= 1:
+        # Same items as after the last cleanup - nothing to do
+        if _load_angle_cleanup_state().get(checksum) == _items_signature(items):
             return 0
 
-        # Group items by duration - duplicates have same duration
-        seen_durations: dict[int, dict] = {}  # duration -> first item
-        duplicates: list[dict] = []
-
-        for item in items:
-            duration = item.get("duration_seconds")
-            if duration is None:
-                continue
-
-            if duration in seen_durations:
-                # This is a duplicate (likely an angle)
-                duplicates.append(item)
-            else:
-                seen_durations[duration] = item
-
+        duplicates = find_angle_duplicates(items)
         if not duplicates:
+            _remember_clean_items(checksum, items)
             return 0
 
         print(f"\n🧹 Found {len(duplicates)} angle duplicate(s) to clean up...")
 
-        removed = 0
+        removed = delete_metadata_items(checksum, duplicates)
         for dup in duplicates:
-            item_id = dup.get("id")
-            title_idx = dup.get("title_index")
-            duration = dup.get("duration_seconds")
-
-            try:
-                del_r = requests.delete(
-                    f"{DISCFINDER_API}/metadata-layout/{checksum}/items/{item_id}",
-                    timeout=10
+            if dup.get("id") in removed:
+                print(
+                    f"   ✓ Removed duplicate item {dup.get('id')} "
+                    f"(title_index={dup.get('title_index')}, duration={dup.get('duration_seconds')}s)"
                 )
-                if del_r.status_code in (200, 204):
-                    print(f"   ✓ Removed duplicate item {item_id} (title_index={title_idx}, duration={duration}s)")
-                    removed += 1
-                else:
-                    print(f"   ✗ Failed to remove item {item_id}: HTTP {del_r.status_code}")
-            except Exception as e:
-                print(f"   ✗ Error removing item {item_id}: {e}")
 
-        return removed
+        if len(removed) == len(duplicates):
+            _remember_clean_items(checksum, [i for i in items if i.get("id") not in removed])
+
+        return len(removed)
 
     except Exception as e:
         print(f"⚠️  Could not check for angle duplicates: {e}")
         return 0
 
-def get_enabled_metadata_items(checksum: str) -> list[dict]:
+def get_metadata_items(checksum: str) -> list[dict]:
+    """
+    Returns all metadata items (enabled or not), or [] on failure.
+    """
     try:
-        r = requests.get(
-            f"{DISCFINDER_API}/metadata-layout/{checksum}/items",
-            timeout=(5, 30)
-        )
-    except requests.exceptions.RequestException as e:
+        return fetch_metadata_items(checksum) or []
+    except Exception:
+        return []
+
+def get_enabled_metadata_items(checksum: str) -> list[dict]:
+    try:
+        items = fetch_metadata_items(checksum) or []
+    except requests.exceptions.RequestException as e:
         print("❌ Failed to fetch metadata layout items")
         print(e)
         sys.exit(1)
 
-    items = r.json()
     return [i for i in items if i.get("enabled")]
 
 
@@ -1189,11 +1554,7 @@ def build_output_path(movie_dir: str, item: dict) -> str:
     return out
 
 def discfinder_lookup(checksum):
-    r = requests.get(
-        f"{DISCFINDER_API}/lookup",
-        params={"checksum": checksum},
-        timeout=5
-    )
+    r = API.get("/lookup", params={"checksum": checksum})
     return r.json() if r.status_code == 200 else None
 
 def discfinder_post(disc_label, disc_type, checksum, movie):
@@ -1214,11 +1575,10 @@ def discfinder_post(disc_label, disc_type, checksum, movie):
         headers["Authorization"] = f"Bearer {USER_TOKEN}"
 
     try:
-        r = requests.post(
-            f"{DISCFINDER_API}/discs",
+        r = API.post(
+            "/discs",
             json=payload,
-            headers=headers,
-            timeout=5
+            headers=headers
         )
 
         print(f"📡 POST /discs → HTTP {r.status_code}")
@@ -1238,6 +1598,11 @@ def discfinder_post(disc_label, disc_type, checksum, movie):
         lookup = discfinder_lookup(checksum)
         return lookup.get("id") if lookup else None
 
+    except requests.exceptions.ConnectionError:
+        disc_db().queue_write("POST", "/discs", payload, auth=True)
+        print("📥 API unreachable – disc queued for sync")
+        return None
+
     except Exception as e:
         print("❌ FAILED to post to DiscFinder API")
         print(e)
@@ -1252,47 +1617,58 @@ def link_disc_to_user(checksum: str):
     if not USER_TOKEN:
         return  # No token, no linking
 
+    if disc_db().flag(checksum, "linked"):
+        return  # Linked on an earlier run
+
     headers = {"Authorization": f"Bearer {USER_TOKEN}"}
 
     try:
-        r = requests.post(
-            f"{DISCFINDER_API}/users/me/discs/{checksum}",
-            headers=headers,
-            timeout=5
-        )
+        r = API.post(f"/users/me/discs/{checksum}", headers=headers)
 
         if r.status_code == 200:
             print("📎 Disc linked to your account")
+            disc_db().set_flag(checksum, "linked")
         elif r.status_code == 404:
             pass  # Disc doesn't exist yet, will be created by discfinder_post
         else:
             print(f"⚠️ Link disc returned HTTP {r.status_code}")
 
+    except requests.exceptions.ConnectionError:
+        disc_db().queue_write("POST", f"/users/me/discs/{checksum}", auth=True)
+        disc_db().set_flag(checksum, "linked")
+        print("📥 API unreachable – account link queued for sync")
+
     except Exception as e:
         print(f"⚠️ Failed to link disc to account: {e}")
 
 
-def get_user_settings() -> dict:
+def _fetch_user_settings():
     """
-    Fetch user settings from the API.
-    Returns empty dict if no token or request fails.
+    Fetch user settings from the API. Returns None if the request fails.
     """
-    if not USER_TOKEN:
-        return {}
-
     headers = {"Authorization": f"Bearer {USER_TOKEN}"}
 
     try:
-        r = requests.get(
-            f"{DISCFINDER_API}/users/me/settings",
-            headers=headers,
-            timeout=5
-        )
+        r = API.get("/users/me/settings", headers=headers)
         if r.status_code == 200:
             return r.json()
-        return {}
+        return None
     except Exception:
+        return None
+
+
+USER_SETTINGS = SettingsCache(_fetch_user_settings, SETTINGS_TTL_SECONDS, SETTINGS_CACHE_FILE, USER_TOKEN)
+
+
+def get_user_settings() -> dict:
+    """
+    User settings, fetched at most once per SETTINGS_TTL_SECONDS and shared
+    by all callers. Returns empty dict if no token or nothing could be fetched.
+    Call USER_SETTINGS.invalidate() to force a fresh fetch.
+    """
+    if not USER_TOKEN:
         return {}
+    return USER_SETTINGS.get()
 
 
 def send_notification(title: str, message: str, success: bool = True):
@@ -1452,11 +1828,17 @@ def asset_status_all(checksum):
     or {} if nothing exists.
     """
     try:
-        r = requests.get(f"{DISCFINDER_API}/assets/status/{checksum}", timeout=5)
+        r = API.get(f"/assets/status/{checksum}")
         if r.status_code != 200:
             return {}
         data = r.json()
-        return data if isinstance(data, dict) else {}
+        if not isinstance(data, dict):
+            return {}
+        disc_db().remember_assets(checksum, data)
+        return data
+    except requests.exceptions.ConnectionError:
+        # Offline: last known status
+        return disc_db().assets(checksum) or {}
     except Exception:
         return {}
 
@@ -1542,11 +1924,11 @@ def choose_language_for_download(status: dict, disc_id: int):
 
 def raw_asset_url(checksum: str, lang_code: str, kind: str) -> str:
     # server serves /assets/raw/<checksum>/<lang>/<kind>.jpg
-    return f"{DISCFINDER_API}/assets/raw/{checksum}/{lang_code}/{kind}.jpg"
+    return API.url(f"/assets/raw/{checksum}/{lang_code}/{kind}.jpg")
 
 def download_file(url: str, dest_path: str) -> bool:
     try:
-        r = requests.get(url, timeout=15)
+        r = API.get(url)
         if r.status_code != 200:
             return False
         with open(dest_path, "wb") as f:
@@ -1655,6 +2037,24 @@ def transcode(input_file, output_file, preset, disc_type, audio_tracks=None, sub
 
     audio_tracks/subtitle_tracks: lists of track dicts with 'enabled' flag.
     Only enabled tracks will be included in the output.
+
+    With SEGMENT_WORKERS > 1, long titles are split and the parts are
+    encoded in parallel (see includes/segmented_encode.py).
+    """
+    cmd = build_handbrake_cmd(input_file, output_file, preset, disc_type, audio_tracks, subtitle_tracks)
+
+    if SEGMENT_WORKERS > 1:
+        print("\n>>>", " ".join(cmd))
+        if segmented_transcode(input_file, output_file, cmd, SEGMENT_WORKERS):
+            return
+        print("   ℹ️ Encoding this title in one piece")
+
+    run(cmd)
+
+
+def build_handbrake_cmd(input_file, output_file, preset, disc_type, audio_tracks=None, subtitle_tracks=None):
+    """
+    Build the HandBrakeCLI command for one title.
     """
     cmd = [
         HANDBRAKE_CLI_PATH,
@@ -1703,7 +2103,7 @@ def transcode(input_file, output_file, preset, disc_type, audio_tracks=None, sub
     if disc_type == "BLURAY":
         cmd.extend(HANDBRAKE_AUDIO_PASSTHROUGH)
 
-    run(cmd)
+    return cmd
 
 
 def get_track_info_from_mkv(mkv_path: str) -> dict:
@@ -1875,6 +2275,154 @@ def apply_track_metadata(output_file: str, audio_tracks: list, subtitle_tracks:
             print(f"   ⚠️ Failed to apply track metadata: {e}")
 
 
+def confirm_output_overwrite(out_path: str, confirm_overwrite: bool = True) -> bool:
+    """
+    Returns True if out_path may be written.
+
+    If the output already exists the user is asked before overwriting;
+    with confirm_overwrite=False (background encodes) the item is skipped
+    instead so the prompt can be shown later from the main thread.
+    """
+    if not os.path.isfile(out_path):
+        return True
+
+    print(f"\n⚠️  Output file already exists: {os.path.basename(out_path)}")
+    if not confirm_overwrite:
+        print("   ⏭️  Leaving it for the final encode pass...")
+        return False
+    with CONSOLE_LOCK:
+        answer = input("   Overwrite? [y/N]: ").strip().lower()
+    if answer != 'y':
+        print("   ⏭️  Skipping...")
+        return False
+    print("   🗑️  Will overwrite existing file")
+    return True
+
+
+def encode_raw_file(raw_path: str, out_path: str, preset: str, disc_type: str,
+                    audio_tracks: list, subtitle_tracks: list):
+    """
+    Transcode a raw MKV, apply track metadata and remove the raw file.
+    Raises subprocess.CalledProcessError if HandBrake fails.
+    """
+    print(f"\n🎬 Transcoding: {os.path.basename(raw_path)}")
+    print(f"   → {out_path}")
+
+    # Bounded across all concurrent disc jobs
+    with ENCODE_SLOTS:
+        transcode(raw_path, out_path, preset, disc_type, audio_tracks, subtitle_tracks)
+
+    # Apply track metadata (language, commentary labels) to final MKV
+    # Only pass enabled tracks since those are the ones in the output
+    enabled_audio = [t for t in audio_tracks if t.get("enabled", True)]
+    enabled_subs = [t for t in subtitle_tracks if t.get("enabled", True)]
+    apply_track_metadata(out_path, enabled_audio, enabled_subs)
+
+    try:
+        os.remove(raw_path)
+    except FileNotFoundError:
+        pass
+
+
+def encode_metadata_item(item: dict, raw_path: str, movie_dir: str, preset: str, disc_type: str,
+                         confirm_overwrite: bool = True) -> bool:
+    """
+    Transcode one enabled metadata item right away.
+    Returns True if the item was encoded.
+    """
+    out_path = build_output_path(movie_dir, item)
+    if not confirm_output_overwrite(out_path, confirm_overwrite):
+        return False
+
+    encode_raw_file(
+        raw_path, out_path, preset, disc_type,
+        item.get("audio_tracks", []), item.get("subtitle_tracks", [])
+    )
+    return True
+
+
+def enqueue_metadata_item(encode_queue: EncodeQueue, item: dict, raw_path: str, movie_dir: str,
+                          preset: str, disc_type: str, checksum: str, label: str,
+                          confirm_overwrite: bool = True) -> bool:
+    """
+    Add one enabled metadata item to the persistent encode queue
+    (--queue). Returns True if a job was queued.
+    """
+    out_path = build_output_path(movie_dir, item)
+    if not confirm_output_overwrite(out_path, confirm_overwrite):
+        return False
+
+    job_id = encode_queue.enqueue(
+        checksum=checksum,
+        raw_path=raw_path,
+        output_path=out_path,
+        preset=preset,
+        disc_type=disc_type,
+        audio_tracks=item.get("audio_tracks", []),
+        subtitle_tracks=item.get("subtitle_tracks", []),
+        label=label,
+    )
+    print(f"📥 Queued encode job #{job_id}: {os.path.basename(out_path)}")
+    return True
+
+
+def start_rip_pipeline(checksum: str, temp_dir: str, encode_item):
+    """
+    Builds the analyze → encode pipeline used with --pipeline.
+    encode_item(item, raw_path, confirm_overwrite) encodes or queues one
+    enabled metadata item and returns True if it was handled.
+
+    Titles are analyzed as soon as MakeMKV finishes writing them. Encoding
+    starts once the metadata layout is marked READY (it may be marked while
+    the rip is still running), so the drive and the CPU work in parallel.
+
+    Returns (pipeline, encoded_title_indexes).
+    """
+    settings = get_user_settings()
+    layout_ready = LAYOUT_WATCHER.watch(checksum)
+    encoded = set()
+    state = {"items": None}
+
+    def analyze_stage(raw_path: str) -> bool:
+        if layout_ready.is_set() or metadata_layout_is_ready(checksum):
+            # Preserve user corrections, same as analyze_and_update_metadata
+            return True
+
+        title_index = title_index_from_filename(os.path.basename(raw_path))
+        try:
+            items = fetch_metadata_items(checksum) or []
+        except Exception as e:
+            print(f"⚠️ Failed to fetch metadata items: {e}")
+            items = []
+
+        for item in items:
+            if item.get("title_index") == title_index:
+                with pipeline.reading(raw_path):
+                    analyze_metadata_item(item, temp_dir, settings)
+        return True
+
+    def encode_stage(raw_path: str) -> bool:
+        while not layout_ready.wait(5):
+            if pipeline.cancelled.is_set():
+                return False  # Disc job aborted
+
+        if state["items"] is None:
+            state["items"] = get_enabled_metadata_items(checksum)
+
+        title_index = title_index_from_filename(os.path.basename(raw_path))
+        for item in state["items"]:
+            if item.get("title_index") != title_index:
+                continue
+            with pipeline.reading(raw_path):
+                if encode_item(item, raw_path, confirm_overwrite=False):
+                    encoded.add(title_index)
+            return True
+        return False  # Title not enabled – keep raw file, nothing to do
+
+    pipeline = TitlePipeline([analyze_stage, encode_stage])
+    return pipeline, encoded
+
+
 # ==========================================================
 # CALCULATE CHECKSUM FOR UNIQUE DISC
 # ==========================================================
@@ -1909,178 +2457,186 @@ def disc_fingerprint(volume: str, disc_type: str) -> str:
     return sha256(json.dumps(fingerprint, separators=(",", ":"), sort_keys=True))
 
 
-
 # ==========================================================
-# MAIN
+# IDENTIFICATION + TITLE SCAN
 # ==========================================================
 
-def main():
-    args = parse_args()
-
-    # Health check mode
-    if args.check:
-        success = check_dependencies()
-        sys.exit(0 if success else 1)
-
-    movie = None
-    volume, disc_type = detect_disc()
-    if not volume:
-        print("❌ No disc detected")
-        sys.exit(1)
-
-    print(f"\n🎞 Disc: {volume}")
-
-    # Ensure MakeMKV is registered before ripping
-    ensure_makemkv_registered()
-
-    legacy_checksum = sha256(volume)
-    new_checksum = disc_fingerprint(volume, disc_type)
-
-    print(f"🔐 Checksum: {new_checksum}")
-
-    legacy_exists = legacy_checksum_exists(legacy_checksum)
-    if legacy_exists:
+def lookup_disc(legacy_checksum: str, new_checksum: str, legacy=None):
+    """
+    Look the disc up in the DiscFinder API, upgrading a legacy
+    (volume-name based) checksum to the fingerprint checksum if needed.
+    legacy is the result of legacy_disc_lookup() (fetched while the disc
+    was being fingerprinted). Returns the API disc dict or None.
+
+    A disc already in disc_db() is answered locally; the API copy is
+    re-checked in the background once the local one is older than
+    DISC_DB_REFRESH_SECONDS.
+    """
+    local = disc_db().lookup(new_checksum)
+    if local:
+        print("💾 Known disc (local DB)")
+        if disc_db().lookup_age(new_checksum) > DISC_DB_REFRESH_SECONDS:
+            threading.Thread(
+                target=refresh_disc_lookup,
+                args=(new_checksum,),
+                name="disc-refresh",
+                daemon=True,
+            ).start()
+        return local
+
+    if legacy:
         print(f"🧓 Legacy checksum detected: {legacy_checksum}")
 
-    api = discfinder_lookup(new_checksum)
+    try:
+        api = discfinder_lookup(new_checksum)
+    except requests.exceptions.ConnectionError:
+        print("📴 Disc Finder API unreachable – continuing offline")
+        return None
 
     # ♻️ migrate old checksum → new checksum
-    if not api and legacy_exists:
-        legacy = discfinder_lookup(legacy_checksum)
-        if legacy:
-            print("♻️ Legacy checksum detected – upgrading in place")
-
-            r = requests.put(
-                f"{DISCFINDER_API}/discs/{legacy_checksum}/checksum",
-                json={"new_checksum": new_checksum},
-                timeout=5
-            )
+    if not api and legacy:
+        print("♻️ Legacy checksum detected – upgrading in place")
 
-            if r.status_code != 200:
-                print("❌ Failed to upgrade checksum")
-                print(r.text)
-                sys.exit(1)
+        r = API.put(
+            f"/discs/{legacy_checksum}/checksum",
+            json={"new_checksum": new_checksum}
+        )
 
-            print("✅ Checksum upgraded")
-            api = discfinder_lookup(new_checksum)
+        if r.status_code != 200:
+            print("❌ Failed to upgrade checksum")
+            print(r.text)
+            sys.exit(1)
 
-    checksum = new_checksum
+        print("✅ Checksum upgraded")
+        api = discfinder_lookup(new_checksum)
 
-    # Create disc-specific temp directory (allows parallel rip + encode)
-    disc_temp_dir = os.path.join(TEMP_BASE_DIR, checksum[:16])
-    print(f"📁 Temp directory: {disc_temp_dir}")
+    if api:
+        disc_db().remember_lookup(new_checksum, api, legacy_checksum)
+    return api
 
-    # ==========================================
-    # COVERART-ONLY MODE
-    # ==========================================
-    if args.coverart:
-        print("\n🖼️ Cover art only mode enabled")
 
-        if not args.lang:
-            print("❌ --coverart requires --lang <code>")
-            sys.exit(1)
+def refresh_disc_lookup(checksum: str):
+    """
+    Re-fetch a locally known disc from the API and store the answer.
+    Keeps the local copy if the API is unreachable.
+    """
+    try:
+        api = discfinder_lookup(checksum)
+    except requests.exceptions.RequestException:
+        return
+    if api:
+        disc_db().remember_lookup(checksum, api)
 
-        status = asset_status_all(checksum)
 
-        langs = languages_with_any_assets(status)
-        if not langs:
-            print("❌ No cover art found for this disc")
-            sys.exit(1)
+def disc_name_candidate(volume: str):
+    """
+    TMDB search for the volume name plus full details of the first hit.
+    Returns (results, details); details is None if there was no hit or
+    the details fetch failed.
+    """
+    results = tmdb_search(normalize_title(volume))
+    if not results:
+        return results, None
+    return results, tmdb_get_movie(results[0].get("id"))
 
-        if args.lang not in status:
-            print(f"❌ No assets found for language: {args.lang}")
-            print("Available languages:")
-            for code in status.keys():
-                print(f"  • {code} ({lang_name(status, code)})")
-            sys.exit(1)
 
-        ensure_mount_or_die()
+def prefetch_identification(volume: str, api, known: dict = None) -> dict:
+    """
+    Start the TMDB requests identify_disc() may need, so they run while
+    the operator looks at the 10s "wrong?" prompt:
 
-        title = sanitize_filename(
-            api["title"] if api else normalize_title(volume)
-        )
-        year = api["year"] if api else "Unknown"
+      details   tmdb_find_by_imdb() for the API hit (unless already known)
+      fallback  disc_name_candidate(), used if there was no hit or it was wrong
+    """
+    pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="prefetch")
+    futures = {"fallback": pool.submit(disc_name_candidate, volume)}
 
-        movie_dir = os.path.join(MOVIES_DIR, f"{title} ({year})")
-        os.makedirs(movie_dir, exist_ok=True)
+    imdb_id = api.get("imdb_id") if api else None
+    if imdb_id and not (known and known.get("imdbID") == imdb_id):
+        futures["details"] = pool.submit(tmdb_find_by_imdb, imdb_id)
+    else:
+        futures["details"] = pool.submit(lambda: None)
 
-        downloaded = download_assets_for_language(
-            status,
-            checksum,
-            args.lang,
-            movie_dir
-        )
+    pool.shutdown(wait=False)
+    return futures
 
-        if downloaded:
-            print("\n✅ Downloaded:")
-            for language, fname in downloaded:
-                print(f"   • {language} – {fname}")
-        else:
-            print("⚠️ No assets downloaded")
 
-        print("\n🏁 Cover art download complete")
-        sys.exit(0)
+def identify_disc(volume: str, disc_type: str, checksum: str, api):
+    """
+    Interactive identification: confirm the API hit or search TMDB, then
+    post the disc (new / marked wrong) or link it to the user's account.
+    Returns (movie, disc_id).
+    """
+    movie = None
+    known = disc_db().movie(checksum)
+    prefetch = prefetch_identification(volume, api, known)
 
     # ✅ FIX: remember whether this disc was missing in API initially
     needs_post = (api is None)
 
-    # -------------------------------
-    # DO NOT CHANGE THIS LOGIC:
-    # - If API hit -> show title + 10s "wrong" window
-    # -------------------------------
-    if api:
-        print("✅ Found in Disc Finder API")
-        print(f"   Title: {api['title']} ({api['year']})")
-        if api.get("imdb_id"):
-            print(f"   IMDb:  https://www.imdb.com/title/{api['imdb_id']}/")
-
-        print("⏱ Press SPACE and ENTER within 10 seconds if this is WRONG")
-        r, _, _ = select.select([sys.stdin], [], [], 10)
-        if r:
-            sys.stdin.readline()
-            api = None
-            # ✅ FIX: user said it's wrong -> treat as missing -> should post when identified
-            needs_post = True
-        else:
-            # API might be down; if so we still continue to manual later
-            movie = tmdb_find_by_imdb(api.get("imdb_id"))
-
-    if not movie:
-        print("❌ Disc not found in Disc Finder API")
-
-        guess = normalize_title(volume)
-        print(f"\n🔎 Trying disc name: {guess}")
-        results = tmdb_search(guess)
+    # Prompts only: daemon jobs on other drives keep scanning meanwhile
+    with CONSOLE_LOCK:
+        # -------------------------------
+        # DO NOT CHANGE THIS LOGIC:
+        # - If API hit -> show title + 10s "wrong" window
+        # -------------------------------
+        if api:
+            print("✅ Found in Disc Finder API")
+            print(f"   Title: {api['title']} ({api['year']})")
+            if api.get("imdb_id"):
+                print(f"   IMDb:  https://www.imdb.com/title/{api['imdb_id']}/")
+
+            print("⏱ Press SPACE and ENTER within 10 seconds if this is WRONG")
+            r, _, _ = select.select([sys.stdin], [], [], 10)
+            if r:
+                sys.stdin.readline()
+                api = None
+                # ✅ FIX: user said it's wrong -> treat as missing -> should post when identified
+                needs_post = True
+            else:
+                # Movie identified on an earlier run, unless the API entry changed since
+                if known and api.get("imdb_id") and known.get("imdbID") == api.get("imdb_id"):
+                    movie = known
+                else:
+                    # API might be down; if so we still continue to manual later
+                    movie = prefetch["details"].result()
 
-        if results:
-            # Take first result and get full details (including IMDb ID)
-            pick = results[0]
-            movie = tmdb_get_movie(pick.get("id"))
-            if not movie:
-                # Fallback if details fetch fails
-                movie = {
-                    "Title": pick.get("title"),
-                    "Year": pick.get("release_date", "")[:4],
-                    "tmdbID": pick.get("id"),
-                    "imdbID": None,
-                    "Plot": pick.get("overview"),
-                }
-            print("\n🔍 Found via disc name:")
-            print(f"   Title: {movie['Title']} ({movie['Year']})")
-            print(f"   TMDB:  https://www.themoviedb.org/movie/{movie['tmdbID']}")
-            if movie.get('imdbID'):
-                print(f"   IMDb:  https://www.imdb.com/title/{movie['imdbID']}/")
-            resp = input("👉 Is this correct? [Y/n]: ").strip().lower()
-            if resp not in ("", "y", "yes"):
+        if not movie:
+            print("❌ Disc not found in Disc Finder API")
+
+            guess = normalize_title(volume)
+            print(f"\n🔎 Trying disc name: {guess}")
+            results, details = prefetch["fallback"].result()
+
+            if results:
+                # Take first result and get full details (including IMDb ID)
+                pick = results[0]
+                movie = details
+                if not movie:
+                    # Fallback if details fetch fails
+                    movie = {
+                        "Title": pick.get("title"),
+                        "Year": pick.get("release_date", "")[:4],
+                        "tmdbID": pick.get("id"),
+                        "imdbID": None,
+                        "Plot": pick.get("overview"),
+                    }
+                print("\n🔍 Found via disc name:")
+                print(f"   Title: {movie['Title']} ({movie['Year']})")
+                print(f"   TMDB:  https://www.themoviedb.org/movie/{movie['tmdbID']}")
+                if movie.get('imdbID'):
+                    print(f"   IMDb:  https://www.imdb.com/title/{movie['imdbID']}/")
+                resp = input("👉 Is this correct? [Y/n]: ").strip().lower()
+                if resp not in ("", "y", "yes"):
+                    movie = interactive_imdb_search()
+            else:
+                # API may be down -> interactive_imdb_search will detect and return None
                 movie = interactive_imdb_search()
-        else:
-            # API may be down -> interactive_imdb_search will detect and return None
-            movie = interactive_imdb_search()
 
-        if not movie:
-            movie = unresolved_menu()
             if not movie:
-                sys.exit(1)
+                movie = unresolved_menu()
+                if not movie:
+                    sys.exit(1)
 
     # ✅ FIX: post if (and only if) it was missing initially OR user marked API hit as wrong
     disc_id = None
@@ -2094,94 +2650,577 @@ def main():
         if api:
             disc_id = api.get("id")
 
-    title = sanitize_filename(movie["Title"])
-    year = movie["Year"]
-
-    print(f"\n▶️ Identified: {title} ({year})")
-
-    # ======================================================
-    # INIT METADATA LAYOUT (IDEMPOTENT)
-    # ======================================================
+    disc_db().remember_movie(checksum, movie, disc_id)
+    return movie, disc_id
 
-    ensure_metadata_layout(
-        checksum=checksum,
-        disc_type="movie",   # senare: tv / mixed
-        movie=movie
-    )
 
-    # ======================================================
-    # SCAN DISC TITLES (MakeMKV)
-    # ======================================================
+def ensure_metadata_titles(checksum: str, disc_spec: str, scanned=None):
+    """
+    Scan the disc's titles with MakeMKV and POST them to the metadata
+    layout, unless items already exist (then only clean up angle duplicates).
 
+    scanned (optional) returns titles scanned earlier, e.g. by a
+    speculative rip; it may return None if that scan was skipped.
+    """
     if metadata_items_exist(checksum):
         print("ℹ️ Metadata items already exist – skipping MakeMKV scan & POST")
         # Clean up any angle duplicates from previous scans
         cleanup_angle_duplicates(checksum)
     else:
-        titles = scan_titles_with_makemkv(make_mkv_path=MAKE_MKV_PATH)
+        titles = scanned() if scanned else None
+        if titles is None:
+            titles = scan_titles_with_makemkv(make_mkv_path=MAKE_MKV_PATH, disc_spec=disc_spec)
 
-        # Build auth headers for metadata items (needed for user preferences)
-        metadata_headers = {}
-        if USER_TOKEN:
-            metadata_headers["Authorization"] = f"Bearer {USER_TOKEN}"
+        post_metadata_titles(checksum, titles)
 
-        for t in titles:
-            try:
-                r = requests.post(
-                    f"{DISCFINDER_API}/metadata-layout/{checksum}/items",
-                    json=t,
-                    headers=metadata_headers,
-                    timeout=(5, 60)
-                )
-                if r.status_code not in (200, 201, 409):
-                    print(f"⚠️ Metadata POST returned {r.status_code}")
-            except requests.exceptions.ReadTimeout:
-                print("⚠️ Metadata POST timed out – continuing")
-            except requests.exceptions.RequestException as e:
-                print(f"⚠️ Metadata POST failed: {e}")
 
+def queue_metadata_titles(checksum: str, titles: list[dict]):
+    """
+    Queue title POSTs for sync_disc_db(), in title order. They replay
+    after the (also queued) metadata layout POST.
+    """
+    for title in sorted(titles, key=lambda t: t.get("title_index") or 0):
+        disc_db().queue_write("POST", f"/metadata-layout/{checksum}/items", title, auth=True)
+    print(f"📥 API unreachable – {len(titles)} title(s) queued for sync")
 
-    # ======================================================
-    # CONTINUE NORMAL FLOW
-    # ======================================================
 
-    # Ensure SMB mount before touching MOVIES_DIR
-    ensure_mount_or_die()
+def bulk_post_failures(r: requests.Response, chunk: list[dict]) -> list[dict]:
+    """
+    Titles of a chunk a 207 Multi-Status response reports as failed.
 
-    # Create destination dir early (needed for cover downloads BEFORE ripping)
-    os.makedirs(MOVIES_DIR, exist_ok=True)
-    movie_dir = os.path.join(MOVIES_DIR, f"{title} ({year})")
-    os.makedirs(movie_dir, exist_ok=True)
+    The body is a list of per-title results in chunk order (or a dict with
+    it under "results"); a result fails unless its status is 2xx or 409.
+    Results carrying a title_index are matched by it instead of position.
+    An unreadable body counts the whole chunk as failed - re-posting a
+    title that was created only answers 409.
+    """
+    try:
+        body = r.json()
+    except ValueError:
+        return list(chunk)
+    results = body.get("results") if isinstance(body, dict) else body
+    if not isinstance(results, list):
+        return list(chunk)
 
-    output = os.path.join(movie_dir, f"{title} ({year}).mkv")
+    def failed(result) -> bool:
+        if not isinstance(result, dict):
+            return True
+        status = result.get("status", result.get("status_code"))
+        if result.get("error") or not isinstance(status, int):
+            return True
+        return not (200 <= status < 300 or status == 409)
+
+    by_index = {t.get("title_index"): t for t in chunk}
+    failures = []
+    reported = set()
+    for pos, result in enumerate(results):
+        if isinstance(result, dict) and result.get("title_index") in by_index:
+            title = by_index[result["title_index"]]
+        elif pos < len(chunk):
+            title = chunk[pos]
+        else:
+            continue
+        reported.add(id(title))
+        if failed(result):
+            failures.append(title)
 
-    # ======================================================
-    # COVER ART PHASE 1 (BEFORE RIP)
-    # ======================================================
+    # Titles the server didn't mention at all are retried too
+    failures.extend(t for t in chunk if id(t) not in reported)
+    return failures
 
-    status_before = asset_status_all(checksum)
-    if disc_id:
-        show_missing_assets_prompt_if_none(status_before, disc_id)
 
-    selected_lang = choose_language_for_download(status_before, disc_id) if disc_id else None
-    if selected_lang:
-        download_assets_for_language(status_before, checksum, selected_lang, movie_dir)
+def post_metadata_title(checksum: str, title: dict, headers: dict) -> bool:
+    """
+    POST one title. Returns True if the server has it afterwards.
+    """
+    try:
+        r = API.post(
+            f"/metadata-layout/{checksum}/items",
+            json=title,
+            headers=headers
+        )
+        if r.status_code not in (200, 201, 409):
+            print(f"⚠️ Metadata POST returned {r.status_code}")
+            return False
+        return True
+    except requests.exceptions.ReadTimeout:
+        print("⚠️ Metadata POST timed out – continuing")
+    except requests.exceptions.ConnectionError:
+        disc_db().queue_write("POST", f"/metadata-layout/{checksum}/items", title, auth=True)
+        print(f"📥 API unreachable – title {title.get('title_index')} queued for sync")
+    except requests.exceptions.RequestException as e:
+        print(f"⚠️ Metadata POST failed: {e}")
+    return False
 
-    # Snapshot AFTER we did pre-rip downloads
-    initial_asset_state = asset_status_all(checksum)
 
+def post_metadata_titles(checksum: str, titles: list[dict]):
+    """
+    POST scanned titles to the metadata layout: METADATA_BULK_CHUNK titles
+    per request on the bulk route, or METADATA_WRITE_CONCURRENCY single
+    POSTs at a time if the server doesn't have it (or a chunk fails).
+    Titles that can't reach the API are queued in disc_db() for sync.
+    """
+    global METADATA_BULK_ROUTE
 
-    # ======================================================
-    # RIP + TRANSCODE
-    # ======================================================
+    # Build auth headers for metadata items (needed for user preferences)
+    metadata_headers = {}
+    if USER_TOKEN:
+        metadata_headers["Authorization"] = f"Bearer {USER_TOKEN}"
 
-    # ======================================================
+    singles = []
+    chunks = [titles[i:i + METADATA_BULK_CHUNK] for i in range(0, len(titles), METADATA_BULK_CHUNK)]
+
+    for n, chunk in enumerate(chunks):
+        if not METADATA_BULK_ROUTE:
+            singles.extend(chunk)
+            continue
+
+        try:
+            r = API.post(
+                f"/metadata-layout/{checksum}/items/bulk",
+                json=chunk,
+                headers=metadata_headers
+            )
+        except requests.exceptions.ConnectionError:
+            # Offline: this chunk and everything after it goes to the outbox
+            queue_metadata_titles(checksum, singles + [t for c in chunks[n:] for t in c])
+            return
+        except requests.exceptions.RequestException as e:
+            print(f"⚠️ Bulk metadata POST failed: {e} – posting titles one by one")
+            singles.extend(chunk)
+            continue
+
+        if r.status_code in (404, 405):
+            # Older server: remember for the rest of the run
+            METADATA_BULK_ROUTE = False
+            singles.extend(chunk)
+        elif r.status_code in (200, 201):
+            print(f"📤 Posted titles {n * METADATA_BULK_CHUNK + 1}–{n * METADATA_BULK_CHUNK + len(chunk)} of {len(titles)}")
+        elif r.status_code == 207:
+            # Multi-Status: retry the titles the server didn't take one by one
+            failed = bulk_post_failures(r, chunk)
+            print(
+                f"📤 Posted titles {n * METADATA_BULK_CHUNK + 1}–{n * METADATA_BULK_CHUNK + len(chunk)} "
+                f"of {len(titles)} ({len(failed)} to retry)"
+            )
+            singles.extend(failed)
+        else:
+            print(f"⚠️ Bulk metadata POST returned {r.status_code} – posting titles one by one")
+            singles.extend(chunk)
+
+    if not singles:
+        return
+
+    # Existing items answer 409, so re-posting part of a chunk is harmless
+    with ThreadPoolExecutor(max_workers=METADATA_WRITE_CONCURRENCY) as pool:
+        posted = sum(pool.map(lambda t: post_metadata_title(checksum, t, metadata_headers), singles))
+    if posted:
+        print(f"📤 Posted {posted} title(s) individually")
+
+
+# ==========================================================
+# DISC JOB
+# ==========================================================
+
+def clear_disc_temp_dir(disc_temp_dir: str):
+    """
+    Remove this disc's temp files (not others that may be encoding),
+    keeping the disc journal.
+    """
+    audio_cache().evict_directory(disc_temp_dir)
+    for f in os.listdir(disc_temp_dir):
+        p = os.path.join(disc_temp_dir, f)
+        if os.path.isfile(p) and f != JOURNAL_FILENAME:
+            os.remove(p)
+
+
+def select_rip_titles(checksum: str, items: list[dict] = None, log=print):
+    """
+    Title indexes to rip with --selective-rip: the enabled items once the
+    metadata layout is READY, otherwise every title at least
+    SELECTIVE_RIP_MIN_SECONDS long. items defaults to the layout's items.
+
+    Returns None (rip all titles) if there is nothing to select from or
+    nothing would be selected.
+    """
+    if items is None:
+        items = get_metadata_items(checksum)
+    if not items:
+        return None
+
+    if metadata_layout_is_ready(checksum):
+        selected = [i for i in items if i.get("enabled")]
+        reason = "enabled in the reviewed layout"
+    else:
+        selected = [i for i in items if (i.get("duration_seconds") or 0) >= SELECTIVE_RIP_MIN_SECONDS]
+        reason = f"at least {SELECTIVE_RIP_MIN_SECONDS // 60} min long"
+
+    indexes = sorted(i["title_index"] for i in selected if i.get("title_index") is not None)
+    if not indexes:
+        log(f"ℹ️ Selective rip: no title is {reason} – ripping all titles")
+        return None
+
+    log(f"🎯 Selective rip: {len(indexes)} of {len(items)} title(s), {reason}")
+    return indexes
+
+
+def rip_title_cmds(disc_spec: str, disc_temp_dir: str, title_indexes=None, profiles: dict = None) -> list[list[str]]:
+    """
+    MakeMKV commands ripping title_indexes (None = all titles), each with
+    its track selection profile from profiles ({title_index: path}) if any.
+
+    One run per title rather than "all" with --minlength: MakeMKV numbers
+    titles after its length filter, so a different minimum would shift
+    the _tXX indexes the metadata items refer to.
+    """
+    if title_indexes is None:
+        return [[MAKE_MKV_PATH, "mkv", disc_spec, "all", disc_temp_dir]]
+
+    cmds = []
+    for idx in title_indexes:
+        profile = (profiles or {}).get(idx)
+        options = [f"--profile={profile}"] if profile else []
+        cmds.append([MAKE_MKV_PATH, *options, "mkv", disc_spec, str(idx), disc_temp_dir])
+    return cmds
+
+
+def write_track_profiles(items: list[dict], title_indexes: list[int], disc_temp_dir: str, journal,
+                         log=print) -> dict:
+    """
+    For a READY layout: a MakeMKV profile per title that leaves out the
+    audio and subtitle languages without an enabled track, so they are
+    never written to temp (nor demuxed by HandBrake). The streams each
+    profile keeps are recorded in the journal (rip_tracks) for
+    tracks_as_ripped().
+
+    Returns {title_index: profile path} for the titles that lose tracks.
+    """
+    by_index = {i.get("title_index"): i for i in items}
+    profile_dir = os.path.join(disc_temp_dir, RIP_PROFILE_DIR)
+    profiles = {}
+    dropped = 0
+
+    for idx in title_indexes:
+        item = by_index.get(idx)
+        if not item:
+            continue
+        audio = item.get("audio_tracks") or []
+        subs = item.get("subtitle_tracks") or []
+        if any(t.get("stream_index") is None for t in audio + subs):
+            continue  # Can't tell which streams the file will have
+
+        rule, kept_audio, kept_subs = track_selection(audio, subs)
+        if len(kept_audio) == len(audio) and len(kept_subs) == len(subs):
+            continue
+
+        os.makedirs(profile_dir, exist_ok=True)
+        path = os.path.join(profile_dir, f"title_t{idx:02d}.mmcp.xml")
+        write_selection_profile(path, rule, name=f"Title {idx}")
+        journal.update("rip_tracks", idx, {"audio": kept_audio, "subtitle": kept_subs})
+        profiles[idx] = path
+        dropped += len(audio) + len(subs) - len(kept_audio) - len(kept_subs)
+
+    if profiles:
+        log(f"✂️  Track selection: {dropped} audio/subtitle track(s) in unused languages won't be ripped")
+    return profiles
+
+
+def selective_rip_cmds(checksum: str, disc_spec: str, disc_temp_dir: str, journal, items: list[dict] = None,
+                       done=None, log=print) -> list[list[str]]:
+    """
+    --selective-rip commands: the titles select_rip_titles() picks, minus
+    those in done (title indexes already ripped; None = fresh rip), with
+    track selection profiles once the layout is READY.
+    """
+    if items is None:
+        items = get_metadata_items(checksum)
+    if done is None:
+        journal.record("rip_tracks", {})  # Fresh rip: forget profiles of earlier attempts
+
+    selected = select_rip_titles(checksum, items, log)
+    if selected is None:
+        if done is None:
+            return rip_title_cmds(disc_spec, disc_temp_dir)
+        selected = sorted(i["title_index"] for i in items if i.get("title_index") is not None)
+    selected = [idx for idx in selected if idx not in (done or ())]
+
+    profiles = None
+    if selected and metadata_layout_is_ready(checksum):
+        profiles = write_track_profiles(items, selected, disc_temp_dir, journal, log)
+    return rip_title_cmds(disc_spec, disc_temp_dir, selected, profiles)
+
+
+def tracks_as_ripped(item: dict, raw_path: str, journal) -> dict:
+    """
+    item with its track lists cut down to the streams a track selection
+    profile kept in raw_path, so HandBrake's per-type track numbers match
+    the file. If the file still has every track (MakeMKV didn't apply the
+    profile), the item is returned unchanged. If mkvmerge sees any other
+    number of tracks than expected, the track lists are dropped instead
+    and HandBrake takes every track the file has.
+    """
+    kept = journal.get("rip_tracks", {}).get(str(item.get("title_index")))
+    if not kept:
+        return item
+
+    audio = [t for t in item.get("audio_tracks", []) if t.get("stream_index") in kept["audio"]]
+    subs = [t for t in item.get("subtitle_tracks", []) if t.get("stream_index") in kept["subtitle"]]
+
+    info = get_track_info_from_mkv(raw_path)
+    all_audio, all_subs = item.get("audio_tracks", []), item.get("subtitle_tracks", [])
+    if (len(audio), len(subs)) != (len(all_audio), len(all_subs)) and \
+            (len(info["audio"]), len(info["subtitle"])) == (len(all_audio), len(all_subs)):
+        print(f"⚠️  {os.path.basename(raw_path)}: MakeMKV ignored the track selection profile – all tracks were ripped")
+        return item
+    if info["audio"] and (len(info["audio"]) != len(audio) or len(info["subtitle"]) != len(subs)):
+        print(
+            f"⚠️  {os.path.basename(raw_path)} has {len(info['audio'])} audio / {len(info['subtitle'])} subtitle "
+            f"track(s), expected {len(audio)} / {len(subs)} – encoding all of them"
+        )
+        audio, subs = [], []
+
+    return {**item, "audio_tracks": audio, "subtitle_tracks": subs}
+
+
+def start_speculative_rip(checksum: str, disc_spec: str, disc_temp_dir: str, registration,
+                          journal, selective: bool = False) -> SpeculativeRip:
+    """
+    Scan (if the layout has no items yet) and rip all titles (only the
+    selected ones if selective) into disc_temp_dir in the background.
+    registration is the startup future of ensure_makemkv_registered().
+    """
+    os.makedirs(disc_temp_dir, exist_ok=True)
+    clear_disc_temp_dir(disc_temp_dir)
+
+    def scan():
+        if metadata_items_exist(checksum):
+            return None
+        return scan_titles_with_makemkv(make_mkv_path=MAKE_MKV_PATH, disc_spec=disc_spec)
+
+    def rip_cmds(scanned):
+        if not selective:
+            return rip_title_cmds(disc_spec, disc_temp_dir)
+        # Nothing is printed during the prompts; titles just scanned carry their durations
+        return selective_rip_cmds(checksum, disc_spec, disc_temp_dir, journal, scanned or None,
+                                  log=lambda line: None)
+
+    speculative = SpeculativeRip(scan, rip_cmds, before=registration.result)
+    speculative.start()
+    SPECULATIVE_RIPS[disc_spec] = speculative
+    print("💿 Speculative rip started in the background")
+    return speculative
+
+
+def prepare_disc(args, volume: str, disc_type: str, drive_index: int = 0) -> dict:
+    """
+    Interactive part of a disc job: identification, metadata layout,
+    title scan, cover art phase 1 and temp file validation.
+
+    Returns the job state needed by rip_and_encode_disc().
+    """
+    disc_spec = f"disc:{drive_index}"
+
+    print(f"\n🎞 Disc: {volume}")
+
+    legacy_checksum = sha256(volume)
+
+    # Steps that don't need the fingerprint run while the disc is walked;
+    # each is joined only where its result is needed
+    startup = ThreadPoolExecutor(max_workers=3, thread_name_prefix="startup")
+    registration = startup.submit(ensure_makemkv_registered)
+    legacy_lookup = startup.submit(legacy_disc_lookup, legacy_checksum)
+    startup.submit(sync_disc_db)
+    startup.shutdown(wait=False)
+
+    checksum = disc_fingerprint(volume, disc_type)
+
+    print(f"🔐 Checksum: {checksum}")
+
+    # Create disc-specific temp directory (allows parallel rip + encode)
+    disc_temp_dir = os.path.join(TEMP_BASE_DIR, checksum[:16])
+    print(f"📁 Temp directory: {disc_temp_dir}")
+
+    # Phases finished by an earlier, interrupted run for this disc
+    journal = DiscJournal(disc_temp_dir)
+    identified = None if args.coverart else journal.get("identified")
+
+    # Only a fresh disc is ripped speculatively: leftovers go through validation below
+    speculative = None
+    if (
+        args.speculative_rip
+        and not args.coverart
+        and not journal.done("rip")
+        and not journal.get("rip_titles")
+        and not (os.path.isdir(disc_temp_dir) and any(
+            f.endswith(".mkv") and not f.startswith("._") for f in os.listdir(disc_temp_dir)
+        ))
+    ):
+        speculative = start_speculative_rip(
+            checksum, disc_spec, disc_temp_dir, registration, journal, args.selective_rip
+        )
+
+    api = None
+    if not identified:
+        api = lookup_disc(legacy_checksum, checksum, legacy_lookup.result())
+
+    # ==========================================
+    # COVERART-ONLY MODE
+    # ==========================================
+    if args.coverart:
+        print("\n🖼️ Cover art only mode enabled")
+
+        if not args.lang:
+            print("❌ --coverart requires --lang <code>")
+            sys.exit(1)
+
+        status = asset_status_all(checksum)
+
+        langs = languages_with_any_assets(status)
+        if not langs:
+            print("❌ No cover art found for this disc")
+            sys.exit(1)
+
+        if args.lang not in status:
+            print(f"❌ No assets found for language: {args.lang}")
+            print("Available languages:")
+            for code in status.keys():
+                print(f"  • {code} ({lang_name(status, code)})")
+            sys.exit(1)
+
+        ensure_mount_or_die()
+
+        title = sanitize_filename(
+            api["title"] if api else normalize_title(volume)
+        )
+        year = api["year"] if api else "Unknown"
+
+        movie_dir = os.path.join(MOVIES_DIR, f"{title} ({year})")
+        os.makedirs(movie_dir, exist_ok=True)
+
+        downloaded = download_assets_for_language(
+            status,
+            checksum,
+            args.lang,
+            movie_dir
+        )
+
+        if downloaded:
+            print("\n✅ Downloaded:")
+            for language, fname in downloaded:
+                print(f"   • {language} – {fname}")
+        else:
+            print("⚠️ No assets downloaded")
+
+        print("\n🏁 Cover art download complete")
+        sys.exit(0)
+
+    if identified:
+        print("⏭️  Resuming: identification already done (disc journal)")
+        movie = identified["movie"]
+        disc_id = identified["disc_id"]
+    else:
+        movie, disc_id = identify_disc(volume, disc_type, checksum, api)
+        journal.record("identified", {"movie": movie, "disc_id": disc_id})
+
+    title = sanitize_filename(movie["Title"])
+    year = movie["Year"]
+
+    print(f"\n▶️ Identified: {title} ({year})")
+
+    # ======================================================
+    # INIT METADATA LAYOUT (IDEMPOTENT)
+    # ======================================================
+
+    if not journal.done("layout"):
+        if not disc_db().flag(checksum, "layout_created"):
+            try:
+                ensure_metadata_layout(
+                    checksum=checksum,
+                    disc_type="movie",   # senare: tv / mixed
+                    movie=movie
+                )
+            except requests.exceptions.ConnectionError:
+                disc_db().queue_write(
+                    "POST", f"/metadata-layout/{checksum}", metadata_layout_payload("movie", movie)
+                )
+                print("📥 API unreachable – metadata layout queued for sync")
+            disc_db().set_flag(checksum, "layout_created")
+        journal.record("layout")
+
+    # ======================================================
+    # SCAN DISC TITLES (MakeMKV)
+    # ======================================================
+
+    # MakeMKV must be registered before its first use
+    registration.result()
+
+    if not journal.done("titles"):
+        ensure_metadata_titles(checksum, disc_spec, speculative.titles if speculative else None)
+        journal.record("titles")
+
+
+    # ======================================================
+    # CONTINUE NORMAL FLOW
+    # ======================================================
+
+    # Ensure SMB mount before touching MOVIES_DIR
+    ensure_mount_or_die()
+
+    # Create destination dir early (needed for cover downloads BEFORE ripping)
+    os.makedirs(MOVIES_DIR, exist_ok=True)
+    movie_dir = os.path.join(MOVIES_DIR, f"{title} ({year})")
+    os.makedirs(movie_dir, exist_ok=True)
+
+    output = os.path.join(movie_dir, f"{title} ({year}).mkv")
+
+    # ======================================================
+    # COVER ART PHASE 1 (BEFORE RIP)
+    # ======================================================
+
+    cover_art = journal.get("cover_art")
+    if cover_art is not None:
+        initial_asset_state = cover_art["initial_asset_state"]
+    else:
+        status_before = asset_status_all(checksum)
+        with CONSOLE_LOCK:
+            if disc_id:
+                show_missing_assets_prompt_if_none(status_before, disc_id)
+
+            selected_lang = choose_language_for_download(status_before, disc_id) if disc_id else None
+        if selected_lang:
+            download_assets_for_language(status_before, checksum, selected_lang, movie_dir)
+
+        # Snapshot AFTER we did pre-rip downloads
+        initial_asset_state = asset_status_all(checksum)
+        journal.record("cover_art", {"initial_asset_state": initial_asset_state})
+
+
+    # ======================================================
+    # RIP + TRANSCODE
+    # ======================================================
+
+    # ======================================================
     # CHECK IF TEMP FILES ALREADY EXIST (SKIP MAKEMKV)
     # ======================================================
 
     os.makedirs(disc_temp_dir, exist_ok=True)
-    existing_temp_files = [f for f in os.listdir(disc_temp_dir) if f.endswith('.mkv') and not f.startswith('._')]
+    ripped_titles = journal.get("rip_titles", {})
     skip_makemkv = False
+    existing_temp_files = []
+
+    if speculative:
+        # Adopt the running rip instead of validating / starting a new one
+        state = "still running" if speculative.running() else "finished"
+        print(f"\n💿 Speculative rip {state} – adopting it")
+    elif journal.done("rip"):
+        print("\n⏭️  Rip already completed (disc journal) – skipping MakeMKV")
+        skip_makemkv = True
+        eject_disc(volume)
+    elif ripped_titles:
+        # Interrupted mid-rip: only the missing titles get ripped
+        print(f"\n⏭️  Resuming rip: {len(ripped_titles)} title(s) already ripped (disc journal)")
+    else:
+        existing_temp_files = [f for f in os.listdir(disc_temp_dir) if f.endswith('.mkv') and not f.startswith('._')]
 
     if existing_temp_files:
         print(f"\n📀 Found existing temp files in: {disc_temp_dir}")
@@ -2193,12 +3232,7 @@ def main():
         metadata_items = get_enabled_metadata_items(checksum)
         if not metadata_items:
             # Try to get ALL items (not just enabled) for validation
-            try:
-                r = requests.get(f"{DISCFINDER_API}/metadata-layout/{checksum}/items", timeout=10)
-                if r.status_code == 200:
-                    metadata_items = r.json()
-            except Exception:
-                pass
+            metadata_items = get_metadata_items(checksum)
 
         if metadata_items:
             # Validate temp files against metadata
@@ -2234,8 +3268,9 @@ def main():
                 skip_makemkv = True
                 eject_disc(volume)
             else:
-                print("\n⚠️  Some temp files don't match metadata.")
-                answer = input("   Re-rip disc? [y/N]: ").strip().lower()
+                with CONSOLE_LOCK:
+                    print("\n⚠️  Some temp files don't match metadata.")
+                    answer = input("   Re-rip disc? [y/N]: ").strip().lower()
                 if answer == 'y':
                     skip_makemkv = False
                 else:
@@ -2244,11 +3279,12 @@ def main():
                     eject_disc(volume)
         else:
             # No metadata available - ask user what to do
-            print("\n⚠️  No metadata found for this disc - cannot validate temp files.")
-            print("   Options:")
-            print("   [u] Use existing temp files (skip MakeMKV)")
-            print("   [r] Re-rip the disc (overwrite temp files)")
-            answer = input("   Choice [u/R]: ").strip().lower()
+            with CONSOLE_LOCK:
+                print("\n⚠️  No metadata found for this disc - cannot validate temp files.")
+                print("   Options:")
+                print("   [u] Use existing temp files (skip MakeMKV)")
+                print("   [r] Re-rip the disc (overwrite temp files)")
+                answer = input("   Choice [u/R]: ").strip().lower()
             if answer == 'u':
                 print("   Using existing temp files...")
                 skip_makemkv = True
@@ -2257,31 +3293,232 @@ def main():
                 print("   Will re-rip the disc...")
                 skip_makemkv = False
 
-    if not skip_makemkv:
-        # ======================================================
-        # RIP ALL TITLES (ONCE)
-        # ======================================================
+    return {
+        "volume": volume,
+        "disc_type": disc_type,
+        "disc_spec": disc_spec,
+        "checksum": checksum,
+        "disc_id": disc_id,
+        "title": title,
+        "year": year,
+        "movie_dir": movie_dir,
+        "disc_temp_dir": disc_temp_dir,
+        "initial_asset_state": initial_asset_state,
+        "skip_makemkv": skip_makemkv,
+        "speculative": speculative,
+        "journal": journal,
+    }
+
+
+def rip_and_encode_disc(args, job: dict):
+    """
+    Non-interactive part of a disc job: rip, audio analysis, wait for the
+    metadata layout to be READY, encode, cover art phase 2.
+
+    With --defer-review the disc is parked after the analysis instead and
+    REVIEW_WATCHER runs the encode once the layout is READY.
+    """
+    volume = job["volume"]
+    disc_type = job["disc_type"]
+    checksum = job["checksum"]
+    disc_id = job["disc_id"]
+    title = job["title"]
+    year = job["year"]
+    movie_dir = job["movie_dir"]
+    disc_temp_dir = job["disc_temp_dir"]
+    skip_makemkv = job["skip_makemkv"]
+    speculative = job.get("speculative")
+    journal = job["journal"]
+
+    preset = HANDBRAKE_PRESET_BD if disc_type == "BLURAY" else HANDBRAKE_PRESET_DVD
+
+    if args.queue:
+        # Hand encodes to --encode-worker; this console is free for the next disc
+        encode_queue = EncodeQueue(ENCODE_QUEUE_DB)
+
+        def encode_now(item, raw_path, confirm_overwrite=True):
+            return enqueue_metadata_item(
+                encode_queue, item, raw_path, movie_dir, preset, disc_type,
+                checksum, f"{title} ({year})", confirm_overwrite
+            )
+    else:
+        def encode_now(item, raw_path, confirm_overwrite=True):
+            return encode_metadata_item(item, raw_path, movie_dir, preset, disc_type, confirm_overwrite)
+
+    def encode_item(item, raw_path, confirm_overwrite=True):
+        item = tracks_as_ripped(item, raw_path, journal)
+        if not encode_now(item, raw_path, confirm_overwrite):
+            return False
+        journal.update("encoded", item["title_index"], build_output_path(movie_dir, item))
+        return True
+
+    pipeline = None
+    pipelined_titles = set()
 
-        # Clean only this disc's temp directory (not others that may be encoding)
+    def resume_rip_cmds():
+        # Only titles missing from the journal; partially written files are re-ripped
+        ripped_titles = journal.get("rip_titles", {})
         for f in os.listdir(disc_temp_dir):
-            p = os.path.join(disc_temp_dir, f)
-            if os.path.isfile(p):
-                os.remove(p)
+            if f.endswith(".mkv") and f not in ripped_titles:
+                os.remove(os.path.join(disc_temp_dir, f))
+
+        done_indexes = {title_index_from_filename(f) for f in ripped_titles}
+        items = get_metadata_items(checksum)
+        if args.selective_rip:
+            return selective_rip_cmds(checksum, job["disc_spec"], disc_temp_dir, journal, items, done_indexes)
+        missing = sorted(
+            i["title_index"] for i in items
+            if i.get("title_index") not in done_indexes
+        )
+        return rip_title_cmds(job["disc_spec"], disc_temp_dir, missing)
 
-        run_makemkv([MAKE_MKV_PATH, "mkv", "disc:0", "all", disc_temp_dir], volume_name=volume)
+    if not skip_makemkv:
+        if speculative:
+            # ======================================================
+            # ADOPT SPECULATIVE RIP (started before the prompts)
+            # ======================================================
+            rip_cmds = []
+        elif journal.get("rip_titles"):
+            # ======================================================
+            # RESUME RIP (only titles missing from the journal)
+            # ======================================================
+            rip_cmds = resume_rip_cmds()
+        else:
+            # ======================================================
+            # RIP ALL TITLES (ONCE) - or only the selected ones
+            # ======================================================
+            clear_disc_temp_dir(disc_temp_dir)
+            if args.selective_rip:
+                rip_cmds = selective_rip_cmds(checksum, job["disc_spec"], disc_temp_dir, journal)
+            else:
+                rip_cmds = rip_title_cmds(job["disc_spec"], disc_temp_dir)
+
+        if args.pipeline:
+            # Analyze + encode each title while MakeMKV keeps ripping the rest
+            print("🚀 Pipelined mode: titles are processed as soon as they are ripped")
+            pipeline, pipelined_titles = start_rip_pipeline(checksum, disc_temp_dir, encode_item)
+            job["pipeline"] = pipeline
+
+        def title_ripped(path: str):
+            journal.update("rip_titles", os.path.basename(path))
+            if pipeline:
+                pipeline.submit(path)
+
+        watcher = TitleFileWatcher(disc_temp_dir, title_ripped)
+
+        def before_retry(rip_cmd, pending):
+            """
+            Returns the command MakeMKV is restarted with.
+            """
+            if pipeline and rip_cmd[-2] == "all" and get_metadata_items(checksum):
+                # Retrying "all" would rewrite titles the pipeline may be reading:
+                # rip only the unfinished ones instead, one run each
+                watcher.poll()
+                watcher.reset()
+                resumed = resume_rip_cmds()
+                if resumed:
+                    pending[:0] = resumed[1:]
+                    return resumed[0]
+
+            # MakeMKV rewrites the titles of this run - pause reading them until it's done
+            watcher.reset()
+            if pipeline:
+                if rip_cmd[-2] == "all":
+                    pipeline.hold()
+                else:
+                    path = find_raw_title_file(disc_temp_dir, int(rip_cmd[-2]))
+                    pipeline.hold([path] if path else [])
+            return rip_cmd
+
+        watcher.start()
+        try:
+            if speculative:
+                if speculative.running():
+                    print("⏳ Waiting for the speculative rip to finish…")
+                ok = speculative.wait()
+                SPECULATIVE_RIPS.pop(job["disc_spec"], None)
+                if not ok:
+                    print(f"⚠️  Speculative rip failed ({speculative.error}):")
+                    for line in list(speculative.output)[-10:]:
+                        print(f"   {line}")
+                    # Titles it finished are kept; the rest is ripped the normal way
+                    watcher.poll()
+                    watcher.reset()
+                    if get_metadata_items(checksum):
+                        rip_cmds = resume_rip_cmds()
+                    else:
+                        clear_disc_temp_dir(disc_temp_dir)
+                        rip_cmds = rip_title_cmds(job["disc_spec"], disc_temp_dir)
+
+            pending = list(rip_cmds)
+            while pending:
+                current = [pending.pop(0)]
+
+                def retry(current=current):
+                    current[0] = before_retry(current[0], pending)
+                    return current[0]
+
+                run_makemkv(current[0], volume_name=volume, on_retry=retry)
+                if pipeline:
+                    pipeline.release()
+        except SystemExit:
+            watcher.stop()
+            raise
+        shutil.rmtree(os.path.join(disc_temp_dir, RIP_PROFILE_DIR), ignore_errors=True)
+        if pipeline:
+            pipeline.release()
+        watcher.finish()
+        journal.record("rip")
         eject_disc(volume)
 
     # ======================================================
     # AUDIO ANALYSIS (Commentary Detection)
     # ======================================================
-    analyze_and_update_metadata(checksum, disc_temp_dir)
+    if not pipeline and not journal.done("analysis"):
+        analyze_and_update_metadata(checksum, disc_temp_dir)
+        journal.record("analysis")
 
-    ensure_preview_server(disc_temp_dir)
+    # Daemon / deferred review serve every disc's temp dir from one preview server
+    ensure_preview_server(TEMP_BASE_DIR if args.daemon or args.defer_review else disc_temp_dir)
     print("🛠 Metadata ready to edit:")
     print(f"   {KEEPEDIA_WEB}/metadata/{disc_id}")
+
+    def encode_reviewed():
+        try:
+            encode_reviewed_disc(args, job, encode_item, pipeline, pipelined_titles)
+        finally:
+            # A READY seen for this run must not release the disc's next run
+            LAYOUT_WATCHER.unwatch(checksum)
+
+    if args.defer_review:
+        print("🅿️  Parked for review – encodes start once the layout is READY")
+        REVIEW_WATCHER.park(checksum, f"{title} ({year})", encode_reviewed)
+        return
+
     print("⏳ Waiting for metadata to be marked READY…")
     wait_for_metadata_layout_ready(checksum)
 
+    encode_reviewed()
+
+
+def encode_reviewed_disc(args, job: dict, encode_item, pipeline, pipelined_titles: set):
+    """
+    Second half of a disc job, once the metadata layout is READY: encode
+    the enabled titles, clean up, cover art phase 2, notify.
+    """
+    checksum = job["checksum"]
+    title = job["title"]
+    year = job["year"]
+    movie_dir = job["movie_dir"]
+    disc_temp_dir = job["disc_temp_dir"]
+    initial_asset_state = job["initial_asset_state"]
+    journal = job["journal"]
+
+    if pipeline:
+        print("⏳ Waiting for pipelined encodes to finish…")
+        pipeline.close()
+        journal.record("analysis")
+
     # ======================================================
     # TRANSCODE ACCORDING TO METADATA LAYOUT
     # ======================================================
@@ -2291,56 +3528,39 @@ def main():
         print("❌ No enabled metadata items – cannot continue")
         sys.exit(1)
 
-    preset = HANDBRAKE_PRESET_BD if disc_type == "BLURAY" else HANDBRAKE_PRESET_DVD
+    already_encoded = journal.get("encoded", {})
 
     for item in enabled_items:
         title_index = item["title_index"]
 
+        # Already encoded while ripping
+        if title_index in pipelined_titles:
+            continue
+
+        if str(title_index) in already_encoded:
+            print(f"⏭️  Title {title_index:02d} already encoded (disc journal)")
+            continue
+
         # Find MKV file matching this title_index (MakeMKV names files *_tXX.mkv)
-        pattern = f"_t{title_index:02d}.mkv"
-        matches = [
-            f for f in os.listdir(disc_temp_dir)
-            if f.endswith(pattern)
-        ]
+        raw_path = find_raw_title_file(disc_temp_dir, title_index)
 
-        if not matches:
+        if not raw_path:
             print(f"❌ No MKV found for title_index {title_index:02d}")
             print("   Available files:")
             for f in os.listdir(disc_temp_dir):
                 print(f"   - {f}")
+            if args.selective_rip and journal.done("rip"):
+                # Enabled after a selective rip skipped it: the next run rips what's missing
+                journal.record("rip", False)
+                print("   Skipped by --selective-rip – insert the disc and run again to rip it")
             sys.exit(1)
 
-        raw_path = os.path.join(disc_temp_dir, matches[0])
-
-        out_path = build_output_path(movie_dir, item)
-
-        # Ask before overwriting if output file already exists
-        if os.path.isfile(out_path):
-            print(f"\n⚠️  Output file already exists: {os.path.basename(out_path)}")
-            answer = input("   Overwrite? [y/N]: ").strip().lower()
-            if answer != 'y':
-                print("   ⏭️  Skipping...")
-                continue
-            print("   🗑️  Will overwrite existing file")
+        encode_item(item, raw_path)
 
-        print(f"\n🎬 Transcoding: {os.path.basename(raw_path)}")
-        print(f"   → {out_path}")
-
-        audio_tracks = item.get("audio_tracks", [])
-        subtitle_tracks = item.get("subtitle_tracks", [])
-
-        transcode(raw_path, out_path, preset, disc_type, audio_tracks, subtitle_tracks)
-
-        # Apply track metadata (language, commentary labels) to final MKV
-        # Only pass enabled tracks since those are the ones in the output
-        enabled_audio = [t for t in audio_tracks if t.get("enabled", True)]
-        enabled_subs = [t for t in subtitle_tracks if t.get("enabled", True)]
-        apply_track_metadata(out_path, enabled_audio, enabled_subs)
-
-        try:
-            os.remove(raw_path)
-        except FileNotFoundError:
-            pass
+    # All phases done - nothing left to resume
+    journal.clear()
+    audio_cache().evict_directory(disc_temp_dir)
+    forget_clean_items(checksum)
 
     # Clean up empty disc-specific temp directory
     try:
@@ -2351,6 +3571,9 @@ def main():
     except Exception:
         pass  # Not critical if cleanup fails
 
+    # Anything queued while offline (this disc or earlier ones)
+    sync_disc_db()
+
     # ======================================================
     # COVER ART PHASE 2 (AFTER ENCODE)
     # ======================================================
@@ -2367,6 +3590,12 @@ def main():
                 print(f"   • {language} – {fname}")
             print("\n🙏 Was it you? If so – thank you so much for contributing to the community!")
 
+    if args.queue:
+        # The encode worker finishes the job and sends the notification
+        print(f"\n📥 Encodes queued → {movie_dir}")
+        print("   Run: python3 moviedisc_ripper.py --encode-worker")
+        return
+
     print(f"\n🎉 DONE → {movie_dir}")
 
     # Send completion notification
@@ -2376,6 +3605,474 @@ def main():
         success=True
     )
 
+
+def process_disc(args, volume: str, disc_type: str, drive_index: int = 0):
+    """
+    Runs the full flow for one disc. Concurrent drive jobs (daemon mode)
+    scan and identify in parallel and only take turns at the prompts
+    (CONSOLE_LOCK).
+    """
+    try:
+        job = prepare_disc(args, volume, disc_type, drive_index)
+    except BaseException:
+        # Don't leave a speculative rip running for an aborted job
+        speculative = SPECULATIVE_RIPS.pop(f"disc:{drive_index}", None)
+        if speculative:
+            speculative.cancel()
+        raise
+
+    try:
+        rip_and_encode_disc(args, job)
+    except BaseException:
+        # Pipelined stages would otherwise wait for a READY that never comes
+        if job.get("pipeline"):
+            job["pipeline"].cancel()
+        LAYOUT_WATCHER.unwatch(job["checksum"])
+        raise
+
+
+# ==========================================================
+# DAEMON (one job per optical drive)
+# ==========================================================
+
+def run_disc_job(args, volume: str, disc_type: str, drive_index: int):
+    try:
+        process_disc(args, volume, disc_type, drive_index)
+    except SystemExit as e:
+        if e.code:
+            print(f"\n❌ Job for {volume} (disc:{drive_index}) stopped")
+    except Exception as e:
+        print(f"\n❌ Job for {volume} (disc:{drive_index}) crashed: {e}")
+
+
+def run_daemon(args):
+    """
+    Long-running mode: watch /Volumes for inserted discs and start one job
+    per disc, on the MakeMKV drive the disc is in. Jobs rip independently
+    and share ENCODE_SLOTS for HandBrake.
+    """
+    print(f"\n🛰  Daemon mode – watching for discs (encode slots: {ENCODE_CONCURRENCY})")
+    print("   (Press Ctrl+C to stop)\n")
+
+    jobs = {}        # volume -> thread
+    finished = set() # volumes whose job ended but disc is still mounted
+
+    try:
+        while True:
+            discs = dict(detect_discs())
+
+            # Forget finished volumes once they're gone (ejected)
+            finished &= set(discs)
+
+            for volume, thread in list(jobs.items()):
+                if not thread.is_alive():
+                    del jobs[volume]
+                    finished.add(volume)
+
+            for volume, disc_type in discs.items():
+                if volume in jobs or volume in finished:
+                    continue
+
+                drive_index = makemkv_drive_index_for_volume(MAKE_MKV_PATH, volume)
+                if drive_index is None:
+                    print(f"⚠️  Could not map {volume} to a MakeMKV drive – skipping")
+                    finished.add(volume)
+                    continue
+
+                print(f"\n📀 New disc in drive disc:{drive_index}: {volume}")
+                t = threading.Thread(
+                    target=run_disc_job,
+                    args=(args, volume, disc_type, drive_index),
+                    name=f"disc-{drive_index}",
+                    daemon=True,
+                )
+                jobs[volume] = t
+                t.start()
+
+            time.sleep(DAEMON_POLL_SECONDS)
+    except KeyboardInterrupt:
+        print("\n👋 Daemon stopped")
+        wait_for_parked_reviews()
+
+
+# ==========================================================
+# DEFERRED REVIEW (park discs, encode once READY)
+# ==========================================================
+
+def wait_for_parked_reviews():
+    """
+    Keep the process alive until every parked disc was reviewed and encoded.
+    """
+    if not REVIEW_WATCHER.pending():
+        return
+
+    parked = REVIEW_WATCHER.parked()
+    print(f"\n🅿️  {len(parked)} disc(s) still waiting for review:")
+    for label in parked:
+        print(f"   • {label}")
+    print("   Encodes start as soon as each layout is READY")
+    print("   (Press Ctrl+C to quit – re-insert a parked disc later to resume it)")
+
+    try:
+        REVIEW_WATCHER.wait()
+        print("\n🎉 All parked discs done")
+    except KeyboardInterrupt:
+        print("\n👋 Stopped with discs still parked")
+
+
+def run_review_batch(args):
+    """
+    --defer-review with a single drive: rip one disc after the other
+    without waiting for the metadata review in between. Parked discs are
+    encoded in the background as their layouts turn READY.
+    """
+    print("\n🅿️  Deferred review – insert discs one after another")
+    print("   (Press Ctrl+C when there are no more discs)\n")
+
+    last_volume = None
+    try:
+        while True:
+            volume, disc_type = detect_disc()
+
+            if volume is None:
+                last_volume = None
+            elif volume != last_volume:
+                run_disc_job(args, volume, disc_type, 0)
+                last_volume = volume
+                print("\n📀 Ready for the next disc…")
+                continue
+
+            time.sleep(DAEMON_POLL_SECONDS)
+    except KeyboardInterrupt:
+        print("\n👋 No more discs")
+
+    wait_for_parked_reviews()
+
+
+# ==========================================================
+# ENCODE WORKER (persistent queue)
+# ==========================================================
+
+def run_queued_encode(encode_queue: EncodeQueue, job: dict):
+    """
+    Runs one claimed queue job and records the outcome.
+    """
+    print(f"\n▶️ Job #{job['id']} ({job['label'] or job['checksum'][:16]}), attempt {job['attempts']}")
+
+    if not os.path.isfile(job["raw_path"]):
+        print(f"❌ Raw file missing: {job['raw_path']}")
+        encode_queue.fail(job["id"], "raw file missing")
+        return
+
+    try:
+        os.makedirs(os.path.dirname(job["output_path"]), exist_ok=True)
+        encode_raw_file(
+            job["raw_path"], job["output_path"], job["preset"], job["disc_type"],
+            job["audio_tracks"], job["subtitle_tracks"]
+        )
+    except Exception as e:
+        print(f"❌ Job #{job['id']} failed: {e}")
+        encode_queue.fail(job["id"], str(e))
+        return
+
+    encode_queue.complete(job["id"])
+    finish_queued_job(encode_queue, job)
+
+
+def finish_queued_job(encode_queue: EncodeQueue, job: dict):
+    """
+    Bookkeeping after a queued job succeeded (locally or on a remote
+    worker): drop the raw file, and once the disc has no jobs left, tidy
+    its temp dir and send the completion notification.
+    """
+    print(f"✅ Job #{job['id']} done → {job['output_path']}")
+
+    try:
+        os.remove(job["raw_path"])
+    except FileNotFoundError:
+        pass
+
+    if encode_queue.pending_for_checksum(job["checksum"]) == 0:
+        disc_temp_dir = os.path.dirname(job["raw_path"])
+        try:
+            if not os.listdir(disc_temp_dir):
+                os.rmdir(disc_temp_dir)
+                print(f"🧹 Cleaned up temp directory: {disc_temp_dir}")
+        except Exception:
+            pass  # Not critical if cleanup fails
+
+        send_notification(
+            title="Rip Complete",
+            message=f"{job['label']} is ready in your library",
+            success=True
+        )
+
+
+def run_encode_worker(concurrency: int):
+    """
+    Drains the persistent encode queue (--encode-worker). Jobs left RUNNING
+    by a worker that died are re-queued on startup. Keeps polling for new
+    jobs until Ctrl+C.
+    """
+    global ENCODE_SLOTS
+    ENCODE_SLOTS = threading.BoundedSemaphore(concurrency)
+
+    encode_queue = EncodeQueue(ENCODE_QUEUE_DB)
+
+    recovered = encode_queue.recover_orphaned()
+    if recovered:
+        print(f"♻️ Resumed {recovered} unfinished encode job(s)")
+
+    counts = encode_queue.counts()
+    print(f"\n🧵 Encode worker – {concurrency} slot(s), {counts.get('queued', 0)} job(s) queued")
+    print(f"   Queue: {ENCODE_QUEUE_DB}")
+    print("   (Press Ctrl+C to stop)\n")
+
+    def worker_loop():
+        while True:
+            job = encode_queue.claim()
+            if job is None:
+                time.sleep(WORKER_POLL_SECONDS)
+                continue
+            run_queued_encode(encode_queue, job)
+
+    for i in range(concurrency):
+        threading.Thread(target=worker_loop, name=f"encode-{i}", daemon=True).start()
+
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        # Running jobs stay RUNNING and are resumed by the next worker
+        print("\n👋 Encode worker stopped")
+
+
+# ==========================================================
+# DISTRIBUTED ENCODING (job server + remote workers)
+# ==========================================================
+
+def start_job_server() -> JobServer:
+    """
+    Expose the persistent encode queue to LAN workers (--job-server).
+    """
+    encode_queue = EncodeQueue(ENCODE_QUEUE_DB)
+    server = JobServer(
+        encode_queue,
+        port=JOB_SERVER_PORT,
+        lease_seconds=JOB_LEASE_SECONDS,
+        token=JOB_SERVER_TOKEN,
+        on_complete=lambda job: finish_queued_job(encode_queue, job),
+    )
+    server.start()
+    print(f"🌐 Encode job server listening on {server.host}:{server.port}")
+    if not JOB_SERVER_TOKEN:
+        print("   ⚠️ JOB_SERVER_TOKEN is not set – only workers on this machine can connect")
+    return server
+
+
+def run_remote_encode(session: requests.Session, server_url: str, worker: str, job: dict):
+    """
+    Encode one leased job. Reads the raw MKV from its path if this machine
+    sees the same share, otherwise downloads it. The output is always
+    encoded into the local work dir; once the lease is confirmed still
+    held it is moved into its final path when that directory is reachable,
+    otherwise uploaded to the job server. Sends heartbeats while working.
+    """
+    job_url = f"{server_url}/jobs/{job['id']}"
+    work_dir = os.path.join(WORKER_WORK_DIR, f"job-{job['id']}")
+
+    stop = threading.Event()
+    lease_lost = threading.Event()
+
+    def heartbeat():
+        while not stop.wait(job["lease_seconds"] / 3):
+            try:
+                r = session.post(f"{job_url}/heartbeat", json={"worker": worker}, timeout=10)
+                if r.status_code == 409:
+                    lease_lost.set()
+                    return
+            except requests.exceptions.RequestException:
+                pass  # Server busy/unreachable - try again next beat
+
+    def renew_lease() -> bool:
+        r = session.post(f"{job_url}/heartbeat", json={"worker": worker}, timeout=10)
+        if r.status_code == 409:
+            lease_lost.set()
+            return False
+        r.raise_for_status()
+        return True
+
+    threading.Thread(target=heartbeat, name=f"heartbeat-{job['id']}", daemon=True).start()
+
+    try:
+        os.makedirs(work_dir, exist_ok=True)
+        raw_path = job["raw_path"]
+        if not os.path.isfile(raw_path):
+            raw_path = os.path.join(work_dir, os.path.basename(job["raw_path"]))
+            print(f"⬇️  Fetching {os.path.basename(raw_path)}...")
+            with session.get(f"{job_url}/raw", params={"worker": worker}, stream=True, timeout=(5, 60)) as r:
+                r.raise_for_status()
+                with open(raw_path, "wb") as f:
+                    for chunk in r.iter_content(chunk_size=1024 * 1024):
+                        f.write(chunk)
+
+        out_dir = os.path.dirname(job["output_path"])
+        shared_output = os.path.isdir(out_dir) and os.access(out_dir, os.W_OK)
+        out_path = os.path.join(work_dir, os.path.basename(job["output_path"]))
+
+        print(f"\n🎬 Transcoding job #{job['id']}: {os.path.basename(job['raw_path'])}")
+        transcode(raw_path, out_path, job["preset"], job["disc_type"],
+                  job["audio_tracks"], job["subtitle_tracks"])
+
+        enabled_audio = [t for t in job["audio_tracks"] if t.get("enabled", True)]
+        enabled_subs = [t for t in job["subtitle_tracks"] if t.get("enabled", True)]
+        apply_track_metadata(out_path, enabled_audio, enabled_subs)
+
+        # Another worker may own the job by now; don't touch its output
+        if lease_lost.is_set() or not renew_lease():
+            print(f"⚠️  Lease for job #{job['id']} was lost – result discarded")
+            return
+
+        if shared_output:
+            # Copy next to the final path first so the rename is atomic
+            part_path = os.path.join(out_dir, f".{os.path.basename(out_path)}.part")
+            shutil.move(out_path, part_path)
+            if not renew_lease():
+                os.remove(part_path)
+                print(f"⚠️  Lease for job #{job['id']} was lost – result discarded")
+                return
+            os.replace(part_path, job["output_path"])
+        else:
+            print(f"⬆️  Uploading {os.path.basename(out_path)}...")
+            with open(out_path, "rb") as f:
+                r = session.put(f"{job_url}/output", params={"worker": worker}, data=f, timeout=(5, 600))
+            r.raise_for_status()
+
+        r = session.post(f"{job_url}/complete", json={"worker": worker}, timeout=30)
+        r.raise_for_status()
+        print(f"✅ Job #{job['id']} done")
+
+    except Exception as e:
+        print(f"❌ Job #{job['id']} failed: {e}")
+        try:
+            session.post(f"{job_url}/fail", json={"worker": worker, "error": str(e)}, timeout=10)
+        except requests.exceptions.RequestException:
+            pass  # Lease expiry re-queues it
+    finally:
+        stop.set()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def run_remote_worker(server_url: str, concurrency: int):
+    """
+    Lease jobs from a ripper's job server and encode them on this machine
+    (--remote-worker URL). Several workers can run on one machine.
+    """
+    server_url = server_url.rstrip("/")
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+
+    global ENCODE_SLOTS
+    ENCODE_SLOTS = threading.BoundedSemaphore(concurrency)
+
+    print(f"\n🛠  Remote encode worker {worker_id} → {server_url} ({concurrency} slot(s))")
+    print("   (Press Ctrl+C to stop)\n")
+
+    def worker_loop(slot: int):
+        session = requests.Session()
+        if JOB_SERVER_TOKEN:
+            session.headers["Authorization"] = f"Bearer {JOB_SERVER_TOKEN}"
+        worker = f"{worker_id}/{slot}"
+
+        while True:
+            try:
+                r = session.post(f"{server_url}/jobs/lease", json={"worker": worker}, timeout=10)
+            except requests.exceptions.RequestException as e:
+                print(f"⚠️  Job server unreachable: {e}")
+                time.sleep(WORKER_POLL_SECONDS)
+                continue
+
+            if r.status_code != 200:
+                time.sleep(WORKER_POLL_SECONDS)
+                continue
+
+            run_remote_encode(session, server_url, worker, r.json())
+
+    for i in range(concurrency):
+        threading.Thread(target=worker_loop, args=(i,), name=f"remote-encode-{i}", daemon=True).start()
+
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        # Leases run out and the server re-queues our jobs
+        print("\n👋 Remote worker stopped")
+
+
+# ==========================================================
+# MAIN
+# ==========================================================
+
+def main():
+    args = parse_args()
+
+    if args.api_stats:
+        # atexit runs last-registered first
+        atexit.register(print_tmdb_cache_report)
+        atexit.register(API.print_report)
+
+    # Health check mode
+    if args.check:
+        success = check_dependencies()
+        sys.exit(0 if success else 1)
+
+    if args.segments:
+        global SEGMENT_WORKERS
+        SEGMENT_WORKERS = args.segments
+
+    if COMMENTARY_DETECTOR == "pcm" and not commentary_detector.available():
+        print("⚠️ COMMENTARY_DETECTOR=pcm needs numpy – using volumedetect")
+
+    if not args.coverart and not args.remote_worker:
+        # Rips, the encode queue and the local stores all live here
+        ensure_temp_base_dir()
+
+    if args.encode_worker:
+        run_encode_worker(args.workers)
+        return
+
+    if args.remote_worker:
+        run_remote_worker(args.remote_worker, args.workers)
+        return
+
+    if args.job_server:
+        start_job_server()
+        if not args.daemon:
+            # Standalone: just serve the queue
+            try:
+                while True:
+                    time.sleep(1)
+            except KeyboardInterrupt:
+                print("\n👋 Job server stopped")
+            return
+
+    if args.daemon:
+        if args.coverart:
+            print("❌ --coverart can't be combined with --daemon")
+            sys.exit(1)
+        run_daemon(args)
+        return
+
+    if args.defer_review:
+        run_review_batch(args)
+        return
+
+    volume, disc_type = detect_disc()
+    if not volume:
+        print("❌ No disc detected")
+        sys.exit(1)
+
+    process_disc(args, volume, disc_type)
+
 # ==========================================================
 # ENTRY
 # ==========================================================